@@ -1,3 +1,33 @@
+import array
+import asyncio
+import bisect
+import calendar
+import collections
+import concurrent.futures
+import contextlib
+import csv
+import datetime
+import functools
+import gc
+import hashlib
+import io
+import itertools
+import json
+import math
+import mmap
+import operator
+import os
+import random
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import weakref
+
+
 class AddressBook:
     """
     Class to represent an address book entry.
@@ -38,6 +68,9 @@ class AddressBook:
         display_info(): Prints all contact information in a formatted way
     """
     
+    # Whether __repr__ may reuse the string it built last time
+    cache_repr = True
+    
     def __init__(self, first_name, last_name, birthday, email, street_address, city, state, zip_code, phone):
         """
         Initialize an AddressBook object with contact information.
@@ -62,6 +95,52 @@ class AddressBook:
         self._state = state
         self._zip = zip_code
         self._phone = phone
+        
+        # Collections (such as AddressBookStore) that must be told when a
+        # field changes so they can keep their indexes up to date
+        self._listeners = []
+        
+        # Cached content hash and repr; cleared whenever a field changes
+        self._fingerprint = None
+        self._repr_cache = None
+        
+        # Bitmap of fields changed through set_* since clear_dirty()
+        self._dirty = 0
+        
+        # Lock of the ConcurrentAddressBookStore holding this entry, if any;
+        # set_* methods take it in write mode
+        self._write_lock = None
+    
+    def _update(self, attribute, value):
+        """
+        Assign a new value to a field and notify any listening collections.
+        
+        All set_* methods go through this helper so that stores holding this
+        entry can move it between index buckets without rescanning. If the
+        entry is held by a ConcurrentAddressBookStore, the change is made
+        under that store's write lock.
+        
+        Args:
+            attribute (str): Name of the private attribute (e.g. "_email")
+            value (str): The new value for the attribute
+        """
+        if self._write_lock is None:
+            self._apply_update(attribute, value)
+        else:
+            with self._write_lock.write_locked():
+                self._apply_update(attribute, value)
+    
+    def _apply_update(self, attribute, value):
+        """Assigns a field and notifies listeners; the caller holds any write lock."""
+        old_value = getattr(self, attribute)
+        setattr(self, attribute, value)
+        if old_value == value:
+            return
+        self._fingerprint = None
+        self._repr_cache = None
+        self._dirty |= _FIELD_BITS[attribute]
+        for listener in self._listeners:
+            listener._entry_changed(self, attribute, old_value, value)
     
     # Getter and Setter methods for first_name
     def get_first_name(self):
@@ -70,7 +149,7 @@ class AddressBook:
     
     def set_first_name(self, name):
         """Sets the first name."""
-        self._first_name = name
+        self._update("_first_name", name)
     
     # Getter and Setter methods for last_name
     def get_last_name(self):
@@ -79,7 +158,7 @@ class AddressBook:
     
     def set_last_name(self, name):
         """Sets the last name."""
-        self._last_name = name
+        self._update("_last_name", name)
     
     # Getter and Setter methods for birthday
     def get_birthday(self):
@@ -88,7 +167,7 @@ class AddressBook:
     
     def set_birthday(self, date):
         """Sets the birthday."""
-        self._birthday = date
+        self._update("_birthday", date)
     
     # Getter and Setter methods for email
     def get_email(self):
@@ -97,7 +176,7 @@ class AddressBook:
     
     def set_email(self, email):
         """Sets the email address."""
-        self._email = email
+        self._update("_email", email)
     
     # Getter and Setter methods for street_address
     def get_street_address(self):
@@ -106,7 +185,7 @@ class AddressBook:
     
     def set_street_address(self, address):
         """Sets the street address."""
-        self._street_address = address
+        self._update("_street_address", address)
     
     # Getter and Setter methods for city
     def get_city(self):
@@ -115,7 +194,7 @@ class AddressBook:
     
     def set_city(self, city):
         """Sets the city."""
-        self._city = city
+        self._update("_city", city)
     
     # Getter and Setter methods for state
     def get_state(self):
@@ -124,7 +203,7 @@ class AddressBook:
     
     def set_state(self, state):
         """Sets the state."""
-        self._state = state
+        self._update("_state", state)
     
     # Getter and Setter methods for zip
     def get_zip(self):
@@ -133,7 +212,7 @@ class AddressBook:
     
     def set_zip(self, zip_code):
         """Sets the zip code."""
-        self._zip = zip_code
+        self._update("_zip", zip_code)
     
     # Getter and Setter methods for phone
     def get_phone(self):
@@ -142,7 +221,45 @@ class AddressBook:
     
     def set_phone(self, phone):
         """Sets the phone number."""
-        self._phone = phone
+        self._update("_phone", phone)
+    
+    def dirty_fields(self):
+        """
+        Returns the fields changed through set_* methods since clear_dirty().
+        
+        Returns:
+            list: Field names in CONTACT_FIELD_NAMES order, e.g. ["email", "phone"]
+        """
+        return _fields_in_mask(self._dirty)
+    
+    def clear_dirty(self):
+        """Marks every field as unchanged, e.g. after syncing the entry."""
+        self._dirty = 0
+    
+    def _compute_fingerprint(self):
+        """Hashes the types and values of all nine fields into a 16-byte digest."""
+        values = (getattr(self, attribute) for attribute in ADDRESS_BOOK_FIELDS)
+        content = "\x1f".join(f"{type(value).__name__}:{value}" for value in values)
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+    
+    def fingerprint(self):
+        """
+        Returns a content hash of the entry's fields.
+        
+        Each value is hashed together with its type name, so 12345 and
+        "12345" (or None and "None") give different fingerprints. That also
+        separates values that == treats as equal, such as 1 and 1.0, so equal
+        fingerprints imply equal entries but not the other way round. The
+        digest is computed once and cached until one of the set_* methods
+        changes a field, so it can be used as a cheap dictionary key for
+        deduplication.
+        
+        Returns:
+            bytes: A 16-byte BLAKE2b digest
+        """
+        if self._fingerprint is None:
+            self._fingerprint = self._compute_fingerprint()
+        return self._fingerprint
     
     def display_info(self):
         """
@@ -177,9 +294,20 @@ class AddressBook:
         """
         Returns an official string representation of the AddressBook object.
         
+        The string is cached (when cache_repr is True) until a set_*
+        method changes a field.
+        
         Returns:
             str: A detailed string representation suitable for debugging
         """
+        if not self.cache_repr:
+            return self._compute_repr()
+        if self._repr_cache is None:
+            self._repr_cache = self._compute_repr()
+        return self._repr_cache
+    
+    def _compute_repr(self):
+        """Builds the __repr__ string from the current field values."""
         return f"AddressBook(first_name='{self._first_name}', last_name='{self._last_name}', birthday='{self._birthday}', email='{self._email}', street_address='{self._street_address}', city='{self._city}', state='{self._state}', zip='{self._zip}', phone='{self._phone}')"
     
     def __eq__(self, other):
@@ -208,67 +336,3713 @@ class AddressBook:
                 self._phone == other._phone)
 
 
-def main():
+class _HashIndex:
     """
-    Main function to demonstrate the AddressBook class functionality.
+    Hash index mapping a key derived from an entry to the entries that have it.
     
-    Creates four sample AddressBook instances and displays their information
-    to demonstrate the class features.
+    The index remembers the key it filed each entry under, so when a field
+    changes the entry can be moved to its new bucket without recomputing
+    the old key.
+    
+    Attributes:
+        key_func (callable): Function returning the index key for an entry
+        attributes (frozenset): Private attribute names the key depends on
     """
-    # Create four instances of AddressBook
-    person1 = AddressBook("John", "Doe", "01/01/1990", "john.doe@example.com", 
-                         "123 Main St", "Anytown", "NY", "12345", "555-555-5555")
     
-    person2 = AddressBook("Jane", "Smith", "02/02/1985", "jane.smith@example.com", 
-                         "456 Elm St", "Othertown", "CA", "67890", "555-555-1234")
+    def __init__(self, key_func, attributes):
+        """
+        Initialize an empty hash index.
+        
+        Args:
+            key_func (callable): Function returning the index key for an entry
+            attributes (iterable): Private attribute names the key depends on
+        """
+        self.key_func = key_func
+        self.attributes = frozenset(attributes)
+        self._buckets = {}
+        self._keys = {}
     
-    person3 = AddressBook("Emily", "Johnson", "03/03/1975", "emily.johnson@example.com", 
-                         "789 Oak St", "Sometown", "TX", "11111", "555-555-6789")
+    def add(self, entry):
+        """Files an entry under its current key."""
+        key = self.key_func(entry)
+        self._keys[id(entry)] = key
+        self._buckets.setdefault(key, {})[id(entry)] = entry
     
-    person4 = AddressBook("Michael", "Brown", "04/04/1965", "michael.brown@example.com", 
-                         "101 Pine St", "Anycity", "FL", "22222", "555-555-2468")
+    def remove(self, entry):
+        """Removes an entry from the bucket it was filed under."""
+        key = self._keys.pop(id(entry))
+        bucket = self._buckets[key]
+        del bucket[id(entry)]
+        if not bucket:
+            del self._buckets[key]
     
-    # Display information for each person
-    print("Address Book Entries:")
-    print("=" * 50)
+    def update(self, entry, attribute, old_value, new_value):
+        """Re-files an entry if the changed attribute is part of its key."""
+        if attribute in self.attributes:
+            self.remove(entry)
+            self.add(entry)
     
-    person1.display_info()
-    person2.display_info()
-    person3.display_info()
-    person4.display_info()
+    def lookup(self, key):
+        """Returns a list of the entries filed under a key."""
+        return list(self._buckets.get(key, {}).values())
     
-    # Demonstrate magic methods
-    print("Demonstrating Magic Methods:")
-    print("=" * 50)
+    def counts(self):
+        """Returns a dictionary mapping each key to its number of entries."""
+        return {key: len(bucket) for key, bucket in self._buckets.items()}
     
-    print("String representation (__str__):")
-    print(person1)
-    print()
+    def groups(self):
+        """Returns a dictionary mapping each key to a list of its entries."""
+        return {key: list(bucket.values()) for key, bucket in self._buckets.items()}
+
+
+class AddressBookStore:
+    """
+    Collection of AddressBook entries with constant-time lookups.
     
-    print("Official representation (__repr__):")
-    print(repr(person1))
-    print()
+    The store keeps hash indexes on email, phone and (last_name, first_name).
+    It registers itself as a listener on every entry it holds, so changes
+    made through the entries' set_* methods keep the indexes correct.
     
-    print("Equality comparison (__eq__):")
-    person1_copy = AddressBook("John", "Doe", "01/01/1990", "john.doe@example.com", 
-                              "123 Main St", "Anytown", "NY", "12345", "555-555-5555")
-    print(f"person1 == person1_copy: {person1 == person1_copy}")
-    print(f"person1 == person2: {person1 == person2}")
-    print()
+    Additional indexes can be attached with add_index(); any object with
+    add(entry), remove(entry) and update(entry, attribute, old, new)
+    methods will be kept in step with the store. An index may also define
+    attach(entries) to take the entries already in the store some other
+    way than one add() call each.
     
-    # Demonstrate getter and setter methods
-    print("Demonstrating Getter and Setter Methods:")
-    print("=" * 50)
+    Methods:
+        add(entry): Adds an entry to the store
+        remove(entry): Removes an entry from the store
+        add_index(index): Attaches an extra index to the store
+        find_by_email(email): Returns entries with the given email
+        find_by_phone(phone): Returns entries with the given phone number
+        find_by_name(last_name, first_name): Returns entries with the given name
+    """
     
-    print(f"Original email: {person1.get_email()}")
-    person1.set_email("john.doe.updated@example.com")
-    print(f"Updated email: {person1.get_email()}")
-    print()
+    def __init__(self, entries=()):
+        """
+        Initialize the store, optionally with some entries.
+        
+        Args:
+            entries (iterable): AddressBook objects to add to the store
+        """
+        self._entries = {}
+        self._email_index = _HashIndex(lambda entry: entry._email, ["_email"])
+        self._phone_index = _HashIndex(lambda entry: entry._phone, ["_phone"])
+        self._name_index = _HashIndex(lambda entry: (entry._last_name, entry._first_name),
+                                      ["_last_name", "_first_name"])
+        self._indexes = [self._email_index, self._phone_index, self._name_index]
+        for entry in entries:
+            self.add(entry)
     
-    print(f"Original phone: {person1.get_phone()}")
-    person1.set_phone("555-123-4567")
-    print(f"Updated phone: {person1.get_phone()}")
+    def add(self, entry):
+        """
+        Adds an entry to the store and all of its indexes.
+        
+        If any index rejects the entry, the indexes that already took it
+        are rolled back and the store is left as it was.
+        
+        Args:
+            entry (AddressBook): The entry to add
+        
+        Raises:
+            ValueError: If the entry is already in the store
+        """
+        if id(entry) in self._entries:
+            raise ValueError("Entry is already in the store")
+        added = []
+        try:
+            for index in self._indexes:
+                index.add(entry)
+                added.append(index)
+        except BaseException:
+            for index in reversed(added):
+                index.remove(entry)
+            raise
+        self._entries[id(entry)] = entry
+        entry._listeners.append(self)
+    
+    def remove(self, entry):
+        """
+        Removes an entry from the store and all of its indexes.
+        
+        Args:
+            entry (AddressBook): The entry to remove
+        
+        Raises:
+            KeyError: If the entry is not in the store
+        """
+        if id(entry) not in self._entries:
+            raise KeyError("Entry is not in the store")
+        del self._entries[id(entry)]
+        for index in self._indexes:
+            index.remove(entry)
+        entry._listeners.remove(self)
+    
+    def extend(self, records):
+        """
+        Creates and adds an AddressBook entry for each record.
+        
+        Args:
+            records (iterable): Tuples of the nine AddressBook field values
+        """
+        for record in records:
+            self.add(AddressBook(*record))
+    
+    def add_index(self, index):
+        """
+        Attaches an extra index and fills it with the current entries.
+        
+        The current entries are passed to index.attach() if the index has
+        one, and to index.add() one at a time otherwise.
+        
+        Args:
+            index: Object with add, remove and update methods
+        """
+        attach = getattr(index, "attach", None)
+        if attach is not None:
+            attach(list(self._entries.values()))
+        else:
+            for entry in self._entries.values():
+                index.add(entry)
+        self._indexes.append(index)
+    
+    def _entry_changed(self, entry, attribute, old_value, new_value):
+        """Called by an entry's set_* methods; keeps every index in step."""
+        for index in self._indexes:
+            index.update(entry, attribute, old_value, new_value)
+    
+    def find_by_email(self, email):
+        """Returns a list of the entries with the given email address."""
+        return self._email_index.lookup(email)
+    
+    def find_by_phone(self, phone):
+        """Returns a list of the entries with the given phone number."""
+        return self._phone_index.lookup(phone)
+    
+    def find_by_name(self, last_name, first_name):
+        """Returns a list of the entries with the given last and first name."""
+        return self._name_index.lookup((last_name, first_name))
+    
+    def __len__(self):
+        """Returns the number of entries in the store."""
+        return len(self._entries)
+    
+    def __iter__(self):
+        """Iterates over the entries in insertion order."""
+        return iter(list(self._entries.values()))
+    
+    def __contains__(self, entry):
+        """Returns True if this exact entry object is in the store."""
+        return id(entry) in self._entries
+
+
+class ReadWriteLock:
+    """
+    Lock that lets many readers in at once but gives writers exclusive access.
+    
+    Waiting writers take priority over new readers, so a steady stream of
+    lookups cannot starve updates. Because of that the lock is not
+    reentrant: a thread that took the read lock a second time could wait
+    forever behind a writer that is itself waiting for the first read to
+    end. Nested acquisition by the same thread raises RuntimeError instead.
+    
+    Methods:
+        read_locked(): Context manager held while reading
+        write_locked(): Context manager held while writing
+    """
+    
+    def __init__(self):
+        """Initialize an unlocked lock."""
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+        self._holders = threading.local()
+    
+    def _check_not_held(self):
+        """Raises RuntimeError if the calling thread already holds the lock."""
+        if getattr(self._holders, "held", False):
+            raise RuntimeError("ReadWriteLock is not reentrant; "
+                               "this thread already holds it")
+    
+    @contextlib.contextmanager
+    def read_locked(self):
+        """Holds the lock for reading; other readers may hold it at the same time."""
+        self._check_not_held()
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        self._holders.held = True
+        try:
+            yield
+        finally:
+            self._holders.held = False
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+    
+    @contextlib.contextmanager
+    def write_locked(self):
+        """Holds the lock for writing, excluding all readers and other writers."""
+        self._check_not_held()
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        self._holders.held = True
+        try:
+            yield
+        finally:
+            self._holders.held = False
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class GlobalLock:
+    """
+    Single mutex with the same interface as ReadWriteLock.
+    
+    Readers exclude each other as well as writers. It is mainly useful as
+    a baseline when measuring ReadWriteLock.
+    """
+    
+    def __init__(self):
+        """Initialize an unlocked lock."""
+        self._lock = threading.Lock()
+    
+    def read_locked(self):
+        """Holds the lock; readers are serialized too."""
+        return self._lock
+    
+    def write_locked(self):
+        """Holds the lock."""
+        return self._lock
+
+
+class ConcurrentAddressBookStore:
+    """
+    Thread-safe wrapper around an AddressBookStore.
+    
+    Lookups take the lock in shared (read) mode, so they do not block each
+    other, and return copies of the matching entries so a caller never sees
+    a contact that a writer is halfway through changing. Writers take the
+    lock in exclusive mode, and update() applies all of its field changes
+    to an entry as one atomic step. The set_* methods of a held entry take
+    the write lock too, so an entry can only be held by one concurrent
+    store at a time.
+    
+    Methods:
+        add(entry): Adds an entry
+        remove(entry): Removes an entry
+        update(entry, **fields): Changes several fields of an entry atomically
+        find_by_email(email): Returns copies of entries with the given email
+        find_by_phone(phone): Returns copies of entries with the given phone number
+        find_by_name(last_name, first_name): Returns copies of entries with the given name
+        reading(): Context manager giving uncopied read access to the store
+    """
+    
+    def __init__(self, entries=(), lock=None):
+        """
+        Initialize the store, optionally with some entries.
+        
+        Args:
+            entries (iterable): AddressBook objects to add to the store
+            lock: ReadWriteLock (the default) or GlobalLock instance
+        """
+        self._lock = ReadWriteLock() if lock is None else lock
+        self._store = AddressBookStore()
+        for entry in entries:
+            self.add(entry)
+    
+    @staticmethod
+    def _copy(entry):
+        """Returns an independent AddressBook with the same field values."""
+        return AddressBook(*(getattr(entry, attribute) for attribute in ADDRESS_BOOK_FIELDS))
+    
+    # Writers
+    
+    def add(self, entry):
+        """
+        Adds an entry to the store.
+        
+        Args:
+            entry (AddressBook): The entry to add
+        
+        Raises:
+            ValueError: If the entry is already in this or another concurrent store
+        """
+        if entry._write_lock is not None:
+            raise ValueError("Entry is already in a concurrent store")
+        with self._lock.write_locked():
+            self._store.add(entry)
+            entry._write_lock = self._lock
+    
+    def remove(self, entry):
+        """Removes an entry from the store."""
+        with self._lock.write_locked():
+            self._store.remove(entry)
+            entry._write_lock = None
+    
+    def add_index(self, index):
+        """Attaches an extra index to the underlying store."""
+        with self._lock.write_locked():
+            self._store.add_index(index)
+    
+    def update(self, entry, **fields):
+        """
+        Change several fields of an entry as one atomic update.
+        
+        Args:
+            entry (AddressBook): An entry held by this store
+            **fields: New values keyed by field name, e.g. email="a@b.com", phone="555-0100"
+        
+        Raises:
+            ValueError: If a field name is not one of CONTACT_FIELD_NAMES
+            KeyError: If the entry is not in the store
+        """
+        unknown = set(fields) - set(CONTACT_FIELD_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        with self._lock.write_locked():
+            if entry not in self._store:
+                raise KeyError("Entry is not in the store")
+            for name, value in fields.items():
+                entry._apply_update(ADDRESS_BOOK_FIELDS[CONTACT_FIELD_NAMES.index(name)], value)
+    
+    # Readers
+    
+    @contextlib.contextmanager
+    def reading(self):
+        """
+        Holds the read lock and yields the underlying AddressBookStore.
+        
+        Use it for several lookups against one consistent state without
+        copying. Entries must not be changed inside the block. Look entries
+        up through the yielded store: the lock is not reentrant, so calling
+        this wrapper's own methods inside the block raises RuntimeError.
+        """
+        with self._lock.read_locked():
+            yield self._store
+    
+    def find_by_email(self, email):
+        """Returns copies of the entries with the given email address."""
+        with self._lock.read_locked():
+            return [self._copy(entry) for entry in self._store.find_by_email(email)]
+    
+    def find_by_phone(self, phone):
+        """Returns copies of the entries with the given phone number."""
+        with self._lock.read_locked():
+            return [self._copy(entry) for entry in self._store.find_by_phone(phone)]
+    
+    def find_by_name(self, last_name, first_name):
+        """Returns copies of the entries with the given last and first name."""
+        with self._lock.read_locked():
+            return [self._copy(entry) for entry in self._store.find_by_name(last_name, first_name)]
+    
+    def __len__(self):
+        """Returns the number of entries in the store."""
+        with self._lock.read_locked():
+            return len(self._store)
+
+
+# Private attribute names of an AddressBook entry, in constructor order
+ADDRESS_BOOK_FIELDS = ("_first_name", "_last_name", "_birthday", "_email",
+                       "_street_address", "_city", "_state", "_zip", "_phone")
+
+# Bit used for each field in dirty-field bitmaps
+_FIELD_BITS = {attribute: 1 << position for position, attribute in enumerate(ADDRESS_BOOK_FIELDS)}
+_ALL_FIELDS_MASK = (1 << len(ADDRESS_BOOK_FIELDS)) - 1
+
+
+def _fields_in_mask(mask):
+    """Returns the public names of the fields whose bits are set in mask."""
+    return [name for position, name in enumerate(CONTACT_FIELD_NAMES) if mask >> position & 1]
+
+
+# Fields whose values repeat across many contacts; these are interned so
+# that every contact in the same city or state shares one string object
+_SHARED_VALUE_FIELDS = frozenset(["_first_name", "_last_name", "_birthday",
+                                  "_city", "_state", "_zip"])
+
+
+def _column_property(attribute):
+    """
+    Build a property that reads and writes one column of a columnar store.
+    
+    Args:
+        attribute (str): Private attribute name, e.g. "_email"
+    
+    Returns:
+        property: Property bound to the matching column of the row's store
+    """
+    def getter(self):
+        return self._store._columns[attribute][self._row]
+    
+    def setter(self, value):
+        self._store._set_value(attribute, self._row, value)
+    
+    return property(getter, setter)
+
+
+class AddressBookRow(AddressBook):
+    """
+    Lightweight view of one row in a ColumnarAddressBookStore.
+    
+    The row holds no contact data itself; each private field is a property
+    that reads from (and writes to) the store's columns. Because it is an
+    AddressBook subclass, every get_*/set_* method, display_info(),
+    __repr__ and __eq__ behave exactly as they do for a regular entry.
+    
+    Rows are created on demand by the store and can be discarded freely.
+    While a view is alive the store hands out that same object for its
+    row, so listeners registered on it (for example by an AddressBookStore
+    holding the row) see changes made through any lookup of the row.
+    """
+    
+    # Another view of the same row may change it, so nothing is cached
+    cache_repr = False
+    
+    _first_name = _column_property("_first_name")
+    _last_name = _column_property("_last_name")
+    _birthday = _column_property("_birthday")
+    _email = _column_property("_email")
+    _street_address = _column_property("_street_address")
+    _city = _column_property("_city")
+    _state = _column_property("_state")
+    _zip = _column_property("_zip")
+    _phone = _column_property("_phone")
+    
+    def __init__(self, store, row):
+        """
+        Initialize a view of a single row.
+        
+        Args:
+            store (ColumnarAddressBookStore): The store holding the data
+            row (int): Index of the row within the store
+        """
+        self._store = store
+        self._row = row
+        self._listeners = []
+        self._fingerprint = None
+        self._repr_cache = None
+        self._dirty = 0
+        self._write_lock = None
+    
+    def fingerprint(self):
+        """
+        Returns a content hash of the row's fields.
+        
+        Unlike AddressBook.fingerprint() the result is not cached, since
+        another view of the same row may change it.
+        """
+        return self._compute_fingerprint()
+
+
+class ColumnarAddressBookStore:
+    """
+    Memory-compact store that keeps each AddressBook field in its own column.
+    
+    Instead of one object with a per-instance __dict__ for every contact,
+    the store holds nine lists (one per field). Repeated values such as
+    names, cities, states and zip codes are interned so they are stored
+    once. Rows are exposed as AddressBookRow views.
+    
+    Methods:
+        append(...): Adds a contact from its nine field values
+        add(entry): Copies an existing AddressBook entry into the store
+        to_address_book(row): Materializes a regular AddressBook object
+    """
+    
+    def __init__(self, entries=()):
+        """
+        Initialize an empty store, optionally copying in some entries.
+        
+        Args:
+            entries (iterable): AddressBook objects to copy into the store
+        """
+        self._columns = {attribute: [] for attribute in ADDRESS_BOOK_FIELDS}
+        # The live AddressBookRow of each row, so every lookup of a row
+        # returns the view that carries its listeners
+        self._views = weakref.WeakValueDictionary()
+        for entry in entries:
+            self.add(entry)
+    
+    @staticmethod
+    def _compact(attribute, value):
+        """Returns the shared copy of a value if its field is interned."""
+        if attribute in _SHARED_VALUE_FIELDS and type(value) is str:
+            return sys.intern(value)
+        return value
+    
+    def _set_value(self, attribute, row, value):
+        """Stores a single value; used by AddressBookRow setters."""
+        self._columns[attribute][row] = self._compact(attribute, value)
+    
+    def append(self, first_name, last_name, birthday, email, street_address, city, state, zip_code, phone):
+        """
+        Adds a contact using the same arguments as AddressBook.__init__.
+        
+        Returns:
+            int: The row number of the new contact
+        """
+        values = (first_name, last_name, birthday, email, street_address,
+                  city, state, zip_code, phone)
+        for attribute, value in zip(ADDRESS_BOOK_FIELDS, values):
+            self._columns[attribute].append(self._compact(attribute, value))
+        return len(self) - 1
+    
+    def extend(self, records):
+        """
+        Appends many contacts at once, one column at a time.
+        
+        This avoids a Python-level call per contact, which makes it the
+        fast path for bulk imports.
+        
+        Args:
+            records (list): Tuples of the nine AddressBook field values
+        """
+        records = list(records)
+        if not records:
+            return
+        if set(map(len, records)) != {len(ADDRESS_BOOK_FIELDS)}:
+            raise ValueError(f"Every record must have {len(ADDRESS_BOOK_FIELDS)} fields")
+        intern = sys.intern
+        for attribute, values in zip(ADDRESS_BOOK_FIELDS, zip(*records)):
+            if attribute in _SHARED_VALUE_FIELDS:
+                # Same rule as _compact(): only strings can be interned
+                values = [intern(value) if type(value) is str else value for value in values]
+            self._columns[attribute].extend(values)
+    
+    def records(self):
+        """Yields each row as a tuple of its nine field values."""
+        return zip(*(self._columns[attribute] for attribute in ADDRESS_BOOK_FIELDS))
+    
+    def add(self, entry):
+        """
+        Copies the fields of an AddressBook entry into a new row.
+        
+        Args:
+            entry (AddressBook): The entry to copy
+        
+        Returns:
+            int: The row number of the new contact
+        """
+        return self.append(*(getattr(entry, attribute) for attribute in ADDRESS_BOOK_FIELDS))
+    
+    def to_address_book(self, row):
+        """Returns a regular, independent AddressBook object for a row."""
+        return AddressBook(*(self._columns[attribute][row] for attribute in ADDRESS_BOOK_FIELDS))
+    
+    def __len__(self):
+        """Returns the number of contacts in the store."""
+        return len(self._columns["_first_name"])
+    
+    def _view(self, row):
+        """Returns the live AddressBookRow of a row, creating it if needed."""
+        view = self._views.get(row)
+        if view is None:
+            view = self._views[row] = AddressBookRow(self, row)
+        return view
+    
+    def __getitem__(self, row):
+        """
+        Returns the AddressBookRow view of a row, or a list of views for a slice.
+        
+        Raises:
+            IndexError: If the row is out of range
+            TypeError: If row is neither an integer nor a slice
+        """
+        if isinstance(row, slice):
+            return [self._view(number) for number in range(*row.indices(len(self)))]
+        row = operator.index(row)
+        if not -len(self) <= row < len(self):
+            raise IndexError("Row out of range")
+        return self._view(row % len(self))
+    
+    def __iter__(self):
+        """Iterates over AddressBookRow views of every row."""
+        for row in range(len(self)):
+            yield self._view(row)
+
+
+def _sample_contact_values(count):
+    """
+    Generate field values for synthetic contacts.
+    
+    Every value is built with an f-string, so each contact gets its own
+    string objects just as it would when loaded from a file.
+    
+    Args:
+        count (int): Number of contacts to generate
+    
+    Yields:
+        tuple: The nine constructor arguments for one contact
+    """
+    first_names = ["John", "Jane", "Emily", "Michael", "Sarah", "David", "Laura", "James"]
+    last_names = ["Doe", "Smith", "Johnson", "Brown", "Lee", "Garcia", "Miller", "Davis"]
+    cities = ["Anytown", "Othertown", "Sometown", "Anycity", "Springfield", "Riverside"]
+    states = ["NY", "CA", "TX", "FL", "WA", "IL"]
+    for number in range(count):
+        first = first_names[number % len(first_names)]
+        last = last_names[number // len(first_names) % len(last_names)]
+        yield (f"{first}",
+               f"{last}",
+               f"{number % 12 + 1:02d}/{number % 28 + 1:02d}/{1950 + number % 50}",
+               f"{first.lower()}.{last.lower()}{number}@example.com",
+               f"{number % 9999 + 1} Main St",
+               f"{cities[number % len(cities)]}",
+               f"{states[number % len(states)]}",
+               f"{10000 + number % 500}",
+               f"555-{number // 10000 % 1000:03d}-{number % 10000:04d}")
+
+
+def measure_memory_per_contact(count=100000):
+    """
+    Compare the memory used per contact by AddressBook objects and the columnar store.
+    
+    The AddressBook figure includes each object's empty _listeners list,
+    which the columnar store does not need; that part is also reported on
+    its own so the saving from the column layout alone can be seen.
+    
+    Args:
+        count (int): Number of synthetic contacts to load into each representation
+    
+    Returns:
+        tuple: (bytes per AddressBook object, bytes of that spent on the
+            _listeners list, bytes per columnar row)
+    """
+    tracemalloc.start()
+    
+    baseline = tracemalloc.get_traced_memory()[0]
+    objects = [AddressBook(*values) for values in _sample_contact_values(count)]
+    object_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    listener_bytes = sum(sys.getsizeof(entry._listeners) for entry in objects)
+    del objects
+    
+    baseline = tracemalloc.get_traced_memory()[0]
+    columnar = ColumnarAddressBookStore()
+    for values in _sample_contact_values(count):
+        columnar.append(*values)
+    columnar_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    del columnar
+    
+    tracemalloc.stop()
+    return object_bytes / count, listener_bytes / count, columnar_bytes / count
+
+
+# Column names used by the CSV and JSON Lines formats, in the same order
+# that display_info() prints the fields
+CONTACT_FIELD_NAMES = ("first_name", "last_name", "birthday", "email",
+                       "street_address", "city", "state", "zip", "phone")
+
+
+def iter_csv_records(file):
+    """
+    Stream contact records from a CSV file one row at a time.
+    
+    A header row matching CONTACT_FIELD_NAMES is skipped if present, and
+    so are blank lines.
+    
+    Args:
+        file: Text file object opened with newline=""
+    
+    Yields:
+        list: The nine field values of one contact
+    
+    Raises:
+        ValueError: If a row does not have nine fields; the message names
+            the line number
+    """
+    reader = csv.reader(file)
+    field_count = len(CONTACT_FIELD_NAMES)
+    for row in reader:
+        if len(row) == field_count:
+            if reader.line_num == 1 and tuple(row) == CONTACT_FIELD_NAMES:
+                continue
+            yield row
+        elif row:
+            raise ValueError(f"Line {reader.line_num}: expected {field_count} fields, got {len(row)}")
+
+
+def iter_jsonl_records(file):
+    """
+    Stream contact records from a JSON Lines file, one line at a time.
+    
+    Blank lines are skipped.
+    
+    Args:
+        file: Text file object with one JSON object per line
+    
+    Yields:
+        tuple: The nine field values of one contact
+    
+    Raises:
+        ValueError: If a line is not valid JSON or is missing a field; the
+            message names the line number
+    """
+    get_fields = operator.itemgetter(*CONTACT_FIELD_NAMES)
+    decode = json.JSONDecoder().decode
+    for line_number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            yield get_fields(decode(line))
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Line {line_number}: invalid JSON: {error}") from None
+        except KeyError as error:
+            raise ValueError(f"Line {line_number}: contact is missing field {error}") from None
+        except TypeError:
+            raise ValueError(f"Line {line_number}: expected a JSON object") from None
+
+
+def iter_entry_records(entries):
+    """
+    Yield the field values of AddressBook entries in CONTACT_FIELD_NAMES order.
+    
+    Args:
+        entries: Iterable of AddressBook objects, or a ColumnarAddressBookStore
+    
+    Yields:
+        tuple: The nine field values of one contact
+    """
+    if isinstance(entries, ColumnarAddressBookStore):
+        yield from entries.records()
+        return
+    for entry in entries:
+        yield tuple(getattr(entry, attribute) for attribute in ADDRESS_BOOK_FIELDS)
+
+
+def chunked(records, chunk_size=10000):
+    """
+    Group a stream of records into lists of at most chunk_size records.
+    
+    Args:
+        records (iterable): Any stream of records
+        chunk_size (int): Maximum number of records per chunk
+    
+    Yields:
+        list: The next chunk of records
+    """
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_records(records, store=None, chunk_size=10000):
+    """
+    Load a stream of records into a store, chunk by chunk.
+    
+    Only one chunk is held in memory at a time besides the store itself.
+    
+    Args:
+        records (iterable): Tuples of the nine AddressBook field values
+        store: Store with an extend() method (default: new ColumnarAddressBookStore)
+        chunk_size (int): Number of records to load per chunk
+    
+    Returns:
+        The store the records were loaded into
+    """
+    if store is None:
+        store = ColumnarAddressBookStore()
+    # A columnar store only appends strings to its columns, so loading it
+    # creates no reference cycles and the cyclic garbage collector can be
+    # paused while the records pour in. An AddressBookStore builds
+    # AddressBook objects whose _listeners lists refer back to the store,
+    # so every entry is part of a cycle; those loads keep the collector on.
+    pause_collector = isinstance(store, ColumnarAddressBookStore)
+    collector_was_enabled = gc.isenabled()
+    if pause_collector:
+        gc.disable()
+    try:
+        for chunk in chunked(records, chunk_size):
+            store.extend(chunk)
+    finally:
+        if pause_collector and collector_was_enabled:
+            gc.enable()
+    return store
+
+
+def import_csv(path, store=None, chunk_size=10000):
+    """Loads contacts from a CSV file; see load_records() for the arguments."""
+    with open(path, newline="", encoding="utf-8") as file:
+        return load_records(iter_csv_records(file), store, chunk_size)
+
+
+def import_jsonl(path, store=None, chunk_size=10000):
+    """Loads contacts from a JSON Lines file; see load_records() for the arguments."""
+    with open(path, encoding="utf-8") as file:
+        return load_records(iter_jsonl_records(file), store, chunk_size)
+
+
+def export_csv(entries, path, chunk_size=10000):
+    """
+    Write contacts to a CSV file with a header row, streaming chunk by chunk.
+    
+    Args:
+        entries: Iterable of AddressBook objects, or a ColumnarAddressBookStore
+        path (str): Destination file path
+        chunk_size (int): Number of records written per call to writerows()
+    """
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(CONTACT_FIELD_NAMES)
+        for chunk in chunked(iter_entry_records(entries), chunk_size):
+            writer.writerows(chunk)
+
+
+def export_jsonl(entries, path, chunk_size=10000):
+    """
+    Write contacts to a JSON Lines file, streaming chunk by chunk.
+    
+    Args:
+        entries: Iterable of AddressBook objects, or a ColumnarAddressBookStore
+        path (str): Destination file path
+        chunk_size (int): Number of lines written per call to write()
+    """
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    with open(path, "w", encoding="utf-8") as file:
+        for chunk in chunked(iter_entry_records(entries), chunk_size):
+            file.write("".join(encode(dict(zip(CONTACT_FIELD_NAMES, record))) + "\n"
+                               for record in chunk))
+
+
+# Location fields covered by LocationIndex, by their CONTACT_FIELD_NAMES names
+LOCATION_FIELDS = ("state", "city", "zip")
+
+# Number of digits in a zip code, not counting a ZIP+4 extension
+_ZIP_LENGTH = 5
+
+
+def _zip_slot(zip_code):
+    """Returns the numeric value of a zip code's first five digits, or None."""
+    digits = str(zip_code)[:_ZIP_LENGTH]
+    if len(digits) == _ZIP_LENGTH and digits.isdigit():
+        return int(digits)
+    return None
+
+
+class LocationIndex:
+    """
+    Group-by and count reports over state, city and zip code.
+    
+    Every location field has an inverted index (value -> entries). Zip
+    codes are also tallied in one flat counter array per prefix length
+    (10 counters for one digit up to 100,000 for all five), kept current
+    as entries come and go. A rollup by zip prefix therefore only picks
+    out the non-zero counters of one array, which itertools.compress does
+    in C, instead of looping over contacts or over every zip code. Report
+    results are cached per field and the cache is cleared when that field
+    changes through set_state(), set_city() or set_zip().
+    
+    Fields are named as in CONTACT_FIELD_NAMES: "state", "city" and "zip".
+    
+    Attach the index to an AddressBookStore with add_index().
+    
+    Methods:
+        count_by(field): Number of entries for each value of a field
+        group_by(field): Entries for each value of a field
+        entries_with(field, value): Entries with a given value
+        zip_prefix_counts(length): Number of entries for each zip prefix
+    """
+    
+    def __init__(self):
+        """Initialize an empty location index."""
+        self._indexes = {"_" + field: _HashIndex(operator.attrgetter("_" + field), ["_" + field])
+                         for field in LOCATION_FIELDS}
+        # _prefix_counts[length][prefix] counts the zip codes starting with prefix
+        counter_size = array.array("L").itemsize
+        self._prefix_counts = [None] + [array.array("L", bytes(10 ** length * counter_size))
+                                        for length in range(1, _ZIP_LENGTH + 1)]
+        self._other_zip_count = 0
+        self._cache = {attribute: {} for attribute in self._indexes}
+    
+    def _count_zip(self, zip_code, change):
+        """Adds change (+1 or -1) to the counters for every prefix of a zip code."""
+        slot = _zip_slot(zip_code)
+        if slot is None:
+            self._other_zip_count += change
+            return
+        for length in range(_ZIP_LENGTH, 0, -1):
+            self._prefix_counts[length][slot] += change
+            slot //= 10
+    
+    # Index protocol used by AddressBookStore
+    
+    def add(self, entry):
+        """Adds an entry to every location index."""
+        for attribute, index in self._indexes.items():
+            index.add(entry)
+            self._cache[attribute].clear()
+        self._count_zip(entry.get_zip(), 1)
+    
+    def remove(self, entry):
+        """Removes an entry from every location index."""
+        for attribute, index in self._indexes.items():
+            index.remove(entry)
+            self._cache[attribute].clear()
+        self._count_zip(entry.get_zip(), -1)
+    
+    def update(self, entry, attribute, old_value, new_value):
+        """Re-files an entry and clears cached reports when a location field changes."""
+        index = self._indexes.get(attribute)
+        if index is None:
+            return
+        index.update(entry, attribute, old_value, new_value)
+        self._cache[attribute].clear()
+        if attribute == "_zip":
+            self._count_zip(old_value, -1)
+            self._count_zip(new_value, 1)
+    
+    # Reports
+    
+    def _field_index(self, field):
+        """Returns the index for a field name, checking that it is a location field."""
+        if field not in LOCATION_FIELDS:
+            raise ValueError(f"Field {field!r} is not a location field; "
+                             f"expected one of {', '.join(LOCATION_FIELDS)}")
+        return self._indexes["_" + field]
+    
+    def _cached(self, field, report, build):
+        """Returns a cached report, building it with build() if needed."""
+        cache = self._cache[field]
+        if report not in cache:
+            cache[report] = build()
+        return cache[report]
+    
+    def count_by(self, field):
+        """
+        Count entries for each value of a location field.
+        
+        Args:
+            field (str): "state", "city" or "zip"
+        
+        Returns:
+            dict: Value -> number of entries, largest groups first
+        """
+        index = self._field_index(field)
+        counts = self._cached("_" + field, "count_by", lambda: dict(
+            sorted(index.counts().items(), key=lambda item: (-item[1], str(item[0])))))
+        return dict(counts)
+    
+    def group_by(self, field):
+        """
+        Group entries by the value of a location field.
+        
+        Args:
+            field (str): "state", "city" or "zip"
+        
+        Returns:
+            dict: Value -> list of entries; the dictionary and lists are
+            the caller's own copies
+        """
+        index = self._field_index(field)
+        groups = self._cached("_" + field, "group_by", index.groups)
+        return {value: list(entries) for value, entries in groups.items()}
+    
+    def entries_with(self, field, value):
+        """Returns a list of the entries whose location field ("state", "city" or "zip") equals value."""
+        return self._field_index(field).lookup(value)
+    
+    def zip_prefix_counts(self, length=3):
+        """
+        Count entries by the first digits of their zip code.
+        
+        Args:
+            length (int): Number of leading digits to group by (1 to 5)
+        
+        Returns:
+            dict: Zip prefix -> number of entries, for prefixes with any
+            entries; zip codes that are not five digits are counted under "other"
+        """
+        if not 1 <= length <= _ZIP_LENGTH:
+            raise ValueError(f"Prefix length must be between 1 and {_ZIP_LENGTH}")
+        
+        def build():
+            counts = self._prefix_counts[length]
+            # compress() skips the empty counters without a Python-level loop
+            rollup = {f"{prefix:0{length}d}": counts[prefix]
+                      for prefix in itertools.compress(range(len(counts)), counts)}
+            if self._other_zip_count:
+                rollup["other"] = self._other_zip_count
+            return rollup
+        
+        return dict(self._cached("_zip", ("zip_prefix_counts", length), build))
+
+
+# Day of the year on which each month starts, counted in a leap year so
+# that February 29 always has its own day (60)
+_MONTH_STARTS = (None, 1, 32, 61, 92, 122, 153, 183, 214, 245, 275, 306, 336, 367)
+_DAYS_IN_YEAR = 366
+
+
+def birthday_day_of_year(month, day):
+    """
+    Convert a month and day into a day of the year from 1 to 366.
+    
+    Args:
+        month (int): Month from 1 to 12
+        day (int): Day of the month
+    
+    Returns:
+        int: Day of the year, counted as in a leap year
+    
+    Raises:
+        ValueError: If the month or day is out of range
+    """
+    if not 1 <= month <= 12 or not 1 <= day <= _MONTH_STARTS[month + 1] - _MONTH_STARTS[month]:
+        raise ValueError(f"Invalid month/day: {month}/{day}")
+    return _MONTH_STARTS[month] + day - 1
+
+
+# Birthday strings are M/D/YYYY or MM/DD/YYYY
+_BIRTHDAY_PATTERN = re.compile(r"(\d{1,2})/(\d{1,2})/(\d+)")
+
+
+def split_birthday(birthday):
+    """
+    Split a birthday string into its month, day and year.
+    
+    Args:
+        birthday (str): Birthday in M/D/YYYY or MM/DD/YYYY format
+    
+    Returns:
+        tuple: (month, day, year) as ints
+    
+    Raises:
+        ValueError: If the string is not in the expected format
+    """
+    match = _BIRTHDAY_PATTERN.fullmatch(birthday.strip())
+    if match is None:
+        raise ValueError(f"Invalid birthday: {birthday!r}")
+    return tuple(map(int, match.groups()))
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_birthday(birthday):
+    """
+    Parse an MM/DD/YYYY birthday into its day of the year.
+    
+    Results are cached, since many contacts share the same birthday string.
+    
+    Args:
+        birthday (str): Birthday in MM/DD/YYYY format
+    
+    Returns:
+        int: Day of the year from 1 to 366, or None if the string cannot be parsed
+    """
+    try:
+        month, day, _ = split_birthday(birthday)
+        return birthday_day_of_year(month, day)
+    except (AttributeError, ValueError):
+        return None
+
+
+class BirthdayIndex:
+    """
+    Index of contacts by birthday, for "upcoming birthdays" style queries.
+    
+    Each birthday is parsed once into a day of the year. The days are kept
+    in a sorted compact integer array with a parallel list of entries, so a
+    date range is found with two bisections. Entries whose birthday cannot
+    be parsed are left out of the index.
+    
+    New entries are buffered and merged into the sorted array the next time
+    the index is queried, which keeps bulk loading at O(n log n). Removal is
+    lazy and O(1): each slot carries a serial number, a slot only counts
+    while its entry's current serial matches, and stale slots are dropped
+    once they make up more than half of the index.
+    
+    Attach the index to an AddressBookStore with add_index(); set_birthday()
+    calls then keep it up to date.
+    
+    Methods:
+        upcoming(days, today): Entries with a birthday in the next N days
+        in_month(month): Entries with a birthday in the given month
+        between(first_day, last_day): Entries with a birthday in a day-of-year range
+    """
+    
+    def __init__(self):
+        """Initialize an empty birthday index."""
+        self._days = array.array("H")
+        self._serials = array.array("Q")
+        self._entries = []
+        self._pending = []
+        # Serial number of the live slot of each indexed entry
+        self._live = {}
+        self._serial_counter = itertools.count()
+        self._stale = 0
+    
+    # Index protocol used by AddressBookStore
+    
+    def add(self, entry):
+        """Adds an entry if its birthday can be parsed."""
+        day = parse_birthday(entry.get_birthday())
+        if day is not None:
+            serial = self._live[id(entry)] = next(self._serial_counter)
+            self._pending.append((day, serial, entry))
+    
+    def remove(self, entry):
+        """Removes an entry from the index, leaving its slot to be skipped."""
+        if self._live.pop(id(entry), None) is not None:
+            self._stale += 1
+    
+    def update(self, entry, attribute, old_value, new_value):
+        """Re-files an entry when its birthday changes."""
+        if attribute == "_birthday":
+            self.remove(entry)
+            self.add(entry)
+    
+    def _is_live(self, serial, entry):
+        """Returns True if a slot is the current one for its entry."""
+        return self._live.get(id(entry)) == serial
+    
+    def _merge_pending(self):
+        """Merges buffered additions into the sorted arrays, dropping stale slots."""
+        slots = itertools.chain(zip(self._days, self._serials, self._entries), self._pending)
+        if self._stale * 2 > len(self._entries) + len(self._pending):
+            merged = [slot for slot in slots if self._is_live(slot[1], slot[2])]
+            self._stale = 0
+        elif len(self._pending) >= 32:
+            merged = list(slots)
+        else:
+            # A few insertions are cheaper than rebuilding the arrays
+            for day, serial, entry in self._pending:
+                position = bisect.bisect_right(self._days, day)
+                self._days.insert(position, day)
+                self._serials.insert(position, serial)
+                self._entries.insert(position, entry)
+            self._pending = []
+            return
+        merged.sort(key=operator.itemgetter(0))
+        self._days = array.array("H", map(operator.itemgetter(0), merged))
+        self._serials = array.array("Q", map(operator.itemgetter(1), merged))
+        self._entries = list(map(operator.itemgetter(2), merged))
+        self._pending = []
+    
+    # Queries
+    
+    def between(self, first_day, last_day):
+        """
+        Returns entries with a birthday from first_day to last_day inclusive.
+        
+        If last_day is before first_day, the range wraps around the end of
+        the year (for example 360 to 5).
+        
+        Args:
+            first_day (int): First day of the year in the range (1-366)
+            last_day (int): Last day of the year in the range (1-366)
+        
+        Returns:
+            list: Matching entries, in calendar order starting at first_day
+        """
+        self._merge_pending()
+        if last_day < first_day:
+            return self.between(first_day, _DAYS_IN_YEAR) + self.between(1, last_day)
+        low = bisect.bisect_left(self._days, first_day)
+        high = bisect.bisect_right(self._days, last_day, low)
+        if not self._stale:
+            return self._entries[low:high]
+        return [entry for serial, entry in zip(self._serials[low:high], self._entries[low:high])
+                if self._is_live(serial, entry)]
+    
+    def upcoming(self, days, today=None):
+        """
+        Returns entries whose birthday falls within the next N days.
+        
+        The window follows the real calendar, so in a common year the day
+        after February 28 is March 1. February 29 birthdays are celebrated
+        on March 1 in common years: they are included whenever the window
+        contains March 1.
+        
+        Args:
+            days (int): Number of days to look ahead; 0 means today only
+            today (datetime.date): The starting date (default: today)
+        
+        Returns:
+            list: Matching entries, soonest birthday first
+        """
+        if today is None:
+            today = datetime.date.today()
+        first_day = birthday_day_of_year(today.month, today.day)
+        if days >= 365:
+            # A year or more ahead covers every birthday
+            return self.between(first_day, (first_day - 2) % _DAYS_IN_YEAR + 1)
+        end = today + datetime.timedelta(days=days)
+        last_day = birthday_day_of_year(end.month, end.day)
+        if (today.month, today.day) == (3, 1) and not calendar.isleap(today.year):
+            first_day -= 1
+        return self.between(first_day, last_day)
+    
+    def in_month(self, month):
+        """
+        Returns entries with a birthday in the given month.
+        
+        Args:
+            month (int): Month from 1 to 12
+        
+        Returns:
+            list: Matching entries, in calendar order
+        """
+        if not 1 <= month <= 12:
+            raise ValueError(f"Invalid month: {month}")
+        return self.between(_MONTH_STARTS[month], _MONTH_STARTS[month + 1] - 1)
+    
+    def __len__(self):
+        """Returns the number of indexed entries."""
+        return len(self._live)
+
+
+# A change reported by ChangeJournal.changes_since(): the entry, what
+# happened to it ("added", "updated" or "removed") and the changed fields
+ContactChange = collections.namedtuple("ContactChange", ["entry", "kind", "fields"])
+
+_ADDED, _UPDATED, _REMOVED = 0, 1, 2
+_CHANGE_KINDS = ("added", "updated", "removed")
+
+
+class ChangeJournal:
+    """
+    Append-only journal of changes made to the entries of an AddressBookStore.
+    
+    Every add, remove and field change is recorded with an increasing
+    sequence number. A sync consumer remembers the last sequence number it
+    processed (its checkpoint) and asks for changes_since(checkpoint), which
+    costs time proportional to the number of changes rather than the number
+    of contacts. The journal is stored as two compact arrays and a list of
+    weak references to the entries, so it does not keep removed entries
+    alive.
+    
+    Attach the journal to an AddressBookStore with add_index(). The entries
+    already in the store are the journal's baseline and are not recorded;
+    a consumer copies them from the store and then reads
+    changes_since(journal.sequence).
+    
+    Methods:
+        changes_since(checkpoint): Changes recorded after a checkpoint
+        truncate(checkpoint): Discards changes up to a checkpoint
+    """
+    
+    def __init__(self):
+        """Initialize an empty journal."""
+        self._first_sequence = 1
+        self._kinds = array.array("B")
+        self._masks = array.array("H")
+        self._entries = []
+        # One shared weak reference per entry in the store, so all the
+        # changes to an entry can be matched up by reference
+        self._references = {}
+    
+    def _record(self, kind, reference, mask):
+        """Appends one change to the journal."""
+        self._kinds.append(kind)
+        self._masks.append(mask)
+        self._entries.append(reference)
+    
+    def _reference(self, entry):
+        """Returns the weak reference shared by all changes to an entry."""
+        reference = self._references.get(id(entry))
+        if reference is None:
+            reference = self._references[id(entry)] = weakref.ref(entry)
+        return reference
+    
+    # Index protocol used by AddressBookStore
+    
+    def attach(self, entries):
+        """Takes the entries already in the store as the baseline, recording nothing."""
+        for entry in entries:
+            self._reference(entry)
+    
+    def add(self, entry):
+        """Records that an entry was added."""
+        self._record(_ADDED, self._reference(entry), _ALL_FIELDS_MASK)
+    
+    def remove(self, entry):
+        """Records that an entry was removed."""
+        self._record(_REMOVED, self._references.pop(id(entry)), 0)
+    
+    def update(self, entry, attribute, old_value, new_value):
+        """Records that one field of an entry changed."""
+        self._record(_UPDATED, self._reference(entry), _FIELD_BITS[attribute])
+    
+    # Consumer API
+    
+    @property
+    def sequence(self):
+        """Sequence number of the most recent change (0 if there are none)."""
+        return self._first_sequence + len(self._entries) - 1
+    
+    def changes_since(self, checkpoint=0):
+        """
+        Collect the changes recorded after a checkpoint, one per entry.
+        
+        Several changes to the same entry are merged: their fields are
+        combined, an entry added after the checkpoint is reported as
+        "added", and an entry removed at the end is reported as "removed".
+        The journal does not keep removed entries alive: once nothing else
+        references one, its removal is reported with entry None, and an
+        entry that was added and removed after the checkpoint is left out.
+        
+        Args:
+            checkpoint (int): Last sequence number already processed
+        
+        Returns:
+            tuple: (new checkpoint, list of ContactChange in order of first change)
+        
+        Raises:
+            ValueError: If changes after the checkpoint have been truncated
+        """
+        if checkpoint < self._first_sequence - 1:
+            raise ValueError(f"Changes after {checkpoint} have been truncated; resync from scratch")
+        start = max(checkpoint - self._first_sequence + 1, 0)
+        merged = {}
+        for position in range(start, len(self._entries)):
+            reference = self._entries[position]
+            kind = self._kinds[position]
+            change = merged.get(id(reference))
+            if change is None:
+                merged[id(reference)] = [reference, kind, self._masks[position], kind == _ADDED]
+                continue
+            change[2] |= self._masks[position]
+            if kind == _REMOVED or change[1] == _REMOVED:
+                # A removal (or re-adding after one) replaces what came before
+                change[1] = kind
+            elif kind == _ADDED:
+                change[1] = _ADDED
+        changes = []
+        for reference, kind, mask, added in merged.values():
+            entry = reference()
+            if entry is None and added:
+                # Added and removed since the checkpoint, and gone since
+                continue
+            changes.append(ContactChange(entry, _CHANGE_KINDS[kind], _fields_in_mask(mask)))
+        return self.sequence, changes
+    
+    def truncate(self, checkpoint):
+        """
+        Discard changes up to and including a checkpoint every consumer has reached.
+        
+        Args:
+            checkpoint (int): Sequence number to truncate through
+        """
+        count = min(max(checkpoint - self._first_sequence + 1, 0), len(self._entries))
+        del self._kinds[:count]
+        del self._masks[:count]
+        del self._entries[:count]
+        self._first_sequence += count
+    
+    def __len__(self):
+        """Returns the number of changes held in the journal."""
+        return len(self._entries)
+
+
+# On-disk layout of AddressBookDatabase
+#
+# Data file:  8-byte magic, then records appended one after another. Each
+#             record is a header (record id, payload length) followed by the
+#             payload: nine 16-bit field lengths and the UTF-8 field bytes.
+# Index file: header (magic, next record id, live count, garbage bytes),
+#             then one 64-bit data file offset per record id (0 = deleted).
+_DATA_MAGIC = b"ABDATA01"
+_INDEX_MAGIC = b"ABINDX01"
+_INDEX_HEADER = struct.Struct("<8sQQQ")
+_RECORD_HEADER = struct.Struct("<QI")
+_FIELD_LENGTHS = struct.Struct(f"<{len(ADDRESS_BOOK_FIELDS)}H")
+_OFFSET = struct.Struct("<Q")
+
+
+def _encode_record(record_id, values):
+    """
+    Encode a record (header and payload) for the data file.
+    
+    Args:
+        record_id (int): The record's id
+        values (iterable): The nine field values
+    
+    Returns:
+        bytes: The encoded record
+    
+    Raises:
+        ValueError: If a field is longer than 65535 bytes once encoded
+    """
+    encoded = [str(value).encode("utf-8") for value in values]
+    try:
+        lengths = _FIELD_LENGTHS.pack(*map(len, encoded))
+    except struct.error:
+        raise ValueError("Field values must be shorter than 65536 bytes") from None
+    payload = lengths + b"".join(encoded)
+    return _RECORD_HEADER.pack(record_id, len(payload)) + payload
+
+
+def _decode_record(buffer, offset):
+    """
+    Decode the field values of the record stored at offset.
+    
+    Args:
+        buffer: Bytes-like object holding the data file
+        offset (int): Position of the record header
+    
+    Returns:
+        list: The nine field values as strings
+    """
+    position = offset + _RECORD_HEADER.size
+    lengths = _FIELD_LENGTHS.unpack_from(buffer, position)
+    position += _FIELD_LENGTHS.size
+    values = []
+    for length in lengths:
+        values.append(str(buffer[position:position + length], "utf-8"))
+        position += length
+    return values
+
+
+class AddressBookDatabase:
+    """
+    Persistent store of AddressBook records backed by memory-mapped files.
+    
+    Records live in an append-only data file; a separate index file maps
+    each record id to the record's offset. Both files are memory-mapped,
+    so opening a database reads only the index header and a lookup touches
+    only the pages holding that record. AddressBook objects are created
+    lazily, when a record is read.
+    
+    Updates and deletes never rewrite records in place: an update appends
+    a new copy and a delete clears the index slot. The space taken by stale
+    copies is reclaimed by compact(), which runs automatically once stale
+    bytes exceed compaction_ratio of the data file.
+    
+    Methods:
+        append(entry): Stores an entry and returns its record id
+        update(record_id, entry): Replaces the record with an entry's values
+        delete(record_id): Deletes a record
+        get(record_id): Returns the record as a new AddressBook object
+        compact(): Rewrites the data file without stale records
+        close(): Flushes and closes the files
+    """
+    
+    def __init__(self, path, compaction_ratio=0.5, min_compaction_bytes=1 << 20):
+        """
+        Open a database, creating its files if they do not exist.
+        
+        Args:
+            path (str): Path of the data file; the index is stored at path + ".idx"
+            compaction_ratio (float): Stale fraction of the data file that triggers
+                automatic compaction (None to compact only on request)
+            min_compaction_bytes (int): Data file size below which automatic
+                compaction is skipped
+        
+        Raises:
+            ValueError: If existing files are not AddressBook database files
+        """
+        self._data_path = path
+        self._index_path = path + ".idx"
+        self.compaction_ratio = compaction_ratio
+        self.min_compaction_bytes = min_compaction_bytes
+        if not os.path.exists(self._data_path):
+            with open(self._data_path, "wb") as file:
+                file.write(_DATA_MAGIC)
+            with open(self._index_path, "wb") as file:
+                file.write(_INDEX_HEADER.pack(_INDEX_MAGIC, 0, 0, 0))
+        self._open_files()
+    
+    def _open_files(self):
+        """Opens and maps the data and index files and reads the index header."""
+        self._data_file = open(self._data_path, "r+b")
+        self._index_file = open(self._index_path, "r+b")
+        self._data_map = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index_map = mmap.mmap(self._index_file.fileno(), 0)
+        if self._data_map[:len(_DATA_MAGIC)] != _DATA_MAGIC:
+            self.close()
+            raise ValueError(f"{self._data_path} is not an AddressBook database")
+        magic, self._next_id, self._live_count, self._garbage_bytes = \
+            _INDEX_HEADER.unpack_from(self._index_map)
+        if magic != _INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"{self._index_path} is not an AddressBook database index")
+        self._data_file.seek(0, os.SEEK_END)
+        self._data_size = self._data_file.tell()
+    
+    # Index file helpers
+    
+    def _save_header(self):
+        """Writes the counters back to the index header."""
+        _INDEX_HEADER.pack_into(self._index_map, 0, _INDEX_MAGIC, self._next_id,
+                                self._live_count, self._garbage_bytes)
+    
+    def _slot(self, record_id):
+        """Returns the position of a record id's offset in the index file."""
+        return _INDEX_HEADER.size + record_id * _OFFSET.size
+    
+    def _offset(self, record_id):
+        """
+        Returns the data file offset of a live record.
+        
+        Raises:
+            KeyError: If there is no live record with this id
+        """
+        if not 0 <= record_id < self._next_id:
+            raise KeyError(record_id)
+        offset = _OFFSET.unpack_from(self._index_map, self._slot(record_id))[0]
+        if offset == 0:
+            raise KeyError(record_id)
+        return offset
+    
+    def _set_offset(self, record_id, offset):
+        """Stores a record's offset, growing the index file when it is full."""
+        end = self._slot(record_id) + _OFFSET.size
+        if end > len(self._index_map):
+            # Grow by doubling so that appends stay amortized O(1)
+            self._index_map.close()
+            self._index_file.truncate(max(end, 2 * self._slot(self._next_id)))
+            self._index_map = mmap.mmap(self._index_file.fileno(), 0)
+        _OFFSET.pack_into(self._index_map, end - _OFFSET.size, offset)
+    
+    # Data file helpers
+    
+    def _write_record(self, record_id, entry):
+        """Appends a record to the data file and returns its offset."""
+        values = [getattr(entry, attribute) for attribute in ADDRESS_BOOK_FIELDS]
+        record = _encode_record(record_id, values)
+        offset = self._data_size
+        self._data_file.seek(offset)
+        self._data_file.write(record)
+        self._data_size += len(record)
+        return offset
+    
+    def _record_size(self, offset):
+        """Returns the total size of the record stored at offset."""
+        return _RECORD_HEADER.size + _RECORD_HEADER.unpack_from(self._data_view(offset), offset)[1]
+    
+    def _data_view(self, offset):
+        """Returns a map of the data file that covers offset, remapping if it has grown."""
+        if offset >= len(self._data_map):
+            self._data_file.flush()
+            self._data_map.close()
+            self._data_map = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._data_map
+    
+    # Public API
+    
+    def append(self, entry):
+        """
+        Stores an AddressBook entry as a new record.
+        
+        Args:
+            entry (AddressBook): The entry to store
+        
+        Returns:
+            int: The new record's id
+        """
+        record_id = self._next_id
+        offset = self._write_record(record_id, entry)
+        self._next_id += 1
+        self._set_offset(record_id, offset)
+        self._live_count += 1
+        self._save_header()
+        return record_id
+    
+    def extend(self, entries):
+        """
+        Stores many entries.
+        
+        Returns:
+            list: The new records' ids
+        """
+        return [self.append(entry) for entry in entries]
+    
+    def update(self, record_id, entry):
+        """
+        Replaces a record with the values of an AddressBook entry.
+        
+        The new copy is written before the old one is counted as stale, so
+        a record that cannot be encoded leaves the database unchanged.
+        
+        Raises:
+            KeyError: If there is no live record with this id
+            ValueError: If a field is too long to store
+        """
+        old_offset = self._offset(record_id)
+        new_offset = self._write_record(record_id, entry)
+        self._garbage_bytes += self._record_size(old_offset)
+        self._set_offset(record_id, new_offset)
+        self._save_header()
+        self._maybe_compact()
+    
+    def delete(self, record_id):
+        """
+        Deletes a record.
+        
+        Raises:
+            KeyError: If there is no live record with this id
+        """
+        old_offset = self._offset(record_id)
+        self._garbage_bytes += self._record_size(old_offset)
+        self._set_offset(record_id, 0)
+        self._live_count -= 1
+        self._save_header()
+        self._maybe_compact()
+    
+    def get(self, record_id):
+        """
+        Reads a record and materializes it as an AddressBook object.
+        
+        Raises:
+            KeyError: If there is no live record with this id
+        """
+        offset = self._offset(record_id)
+        return AddressBook(*_decode_record(self._data_view(offset), offset))
+    
+    def __getitem__(self, record_id):
+        """Same as get()."""
+        return self.get(record_id)
+    
+    def __contains__(self, record_id):
+        """Returns True if a live record has this id."""
+        try:
+            self._offset(record_id)
+        except KeyError:
+            return False
+        return True
+    
+    def __len__(self):
+        """Returns the number of live records."""
+        return self._live_count
+    
+    def record_ids(self):
+        """Yields the ids of all live records in ascending order."""
+        for record_id in range(self._next_id):
+            if record_id in self:
+                yield record_id
+    
+    def items(self):
+        """Yields (record id, AddressBook) pairs, materializing one record at a time."""
+        for record_id in self.record_ids():
+            yield record_id, self.get(record_id)
+    
+    @property
+    def garbage_bytes(self):
+        """Number of bytes in the data file taken by stale records."""
+        return self._garbage_bytes
+    
+    def _maybe_compact(self):
+        """Compacts the data file if enough of it is stale."""
+        if (self.compaction_ratio is not None and
+                self._data_size >= self.min_compaction_bytes and
+                self._garbage_bytes > self.compaction_ratio * self._data_size):
+            self.compact()
+    
+    def compact(self):
+        """
+        Rewrites the data file so it holds only live records.
+        
+        Records are copied as raw bytes without being decoded. Record ids
+        do not change.
+        """
+        self._data_file.flush()
+        data = self._data_view(self._data_size - 1)
+        temporary_data = self._data_path + ".compact"
+        temporary_index = self._index_path + ".compact"
+        offsets = []
+        with open(temporary_data, "wb") as file:
+            file.write(_DATA_MAGIC)
+            position = len(_DATA_MAGIC)
+            for record_id in range(self._next_id):
+                offset = _OFFSET.unpack_from(self._index_map, self._slot(record_id))[0]
+                if offset:
+                    size = self._record_size(offset)
+                    file.write(data[offset:offset + size])
+                    offsets.append(position)
+                    position += size
+                else:
+                    offsets.append(0)
+        with open(temporary_index, "wb") as file:
+            file.write(_INDEX_HEADER.pack(_INDEX_MAGIC, self._next_id, self._live_count, 0))
+            file.write(b"".join(map(_OFFSET.pack, offsets)))
+        
+        self.close()
+        os.replace(temporary_data, self._data_path)
+        os.replace(temporary_index, self._index_path)
+        self._open_files()
+    
+    def flush(self):
+        """Writes buffered changes to disk."""
+        self._data_file.flush()
+        self._index_map.flush()
+    
+    def close(self):
+        """Flushes and closes the database files."""
+        for resource in (self._data_map, self._index_map, self._data_file, self._index_file):
+            if not resource.closed:
+                if resource is self._index_map:
+                    resource.flush()
+                resource.close()
+    
+    def __enter__(self):
+        """Returns the database for use in a with statement."""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Closes the database at the end of a with statement."""
+        self.close()
+
+
+# Labels printed by display_info(), in field order
+DISPLAY_LABELS = ("First Name", "Last Name", "Birthday", "Email", "Street Address",
+                  "City", "State", "Zip", "Phone")
+
+# Minimum column widths used by the "table" output format (the last
+# column, phone, is left unpadded)
+TABLE_WIDTHS = (12, 12, 10, 30, 20, 12, 5, 5)
+
+
+def _text_template():
+    """Returns a format string that renders one record like display_info()."""
+    lines = [f"{label}: {{{position}}}\n" for position, label in enumerate(DISPLAY_LABELS)]
+    return "".join(lines) + "\n"
+
+
+def _table_template():
+    """Returns a format string that renders one record as a table row."""
+    cells = [f"{{{position}!s:<{width}}}" for position, width in enumerate(TABLE_WIDTHS)]
+    cells.append(f"{{{len(TABLE_WIDTHS)}}}")
+    return " | ".join(cells) + "\n"
+
+
+def _json_record(record, encode=json.JSONEncoder(ensure_ascii=False).encode):
+    """Returns one record encoded as a JSON object."""
+    return encode(dict(zip(CONTACT_FIELD_NAMES, record)))
+
+
+def render_contacts(entries, file=None, output_format="text", chunk_size=1000):
+    """
+    Write many contacts to a file-like object in a single buffered pass.
+    
+    Records are formatted a chunk at a time and each chunk is sent with one
+    write() call, instead of the nine print() calls per contact made by
+    display_info().
+    
+    Args:
+        entries: Iterable of AddressBook objects, or a ColumnarAddressBookStore
+        file: Object with a write() method (default: sys.stdout)
+        output_format (str): "text" (like display_info), "table" or "json"
+        chunk_size (int): Number of contacts formatted per write() call
+    
+    Raises:
+        ValueError: If output_format is not recognised
+    """
+    if file is None:
+        file = sys.stdout
+    records = iter_entry_records(entries)
+    
+    if output_format == "text":
+        template = _text_template()
+        for chunk in chunked(records, chunk_size):
+            file.write("".join(template.format(*record) for record in chunk))
+    elif output_format == "table":
+        template = _table_template()
+        header = template.format(*DISPLAY_LABELS)
+        # The rule runs under every column; the unpadded phone column is
+        # as wide as a typical number rather than its label
+        widths = TABLE_WIDTHS + (len("555-555-5555"),)
+        file.write(header + "-+-".join("-" * width for width in widths) + "\n")
+        for chunk in chunked(records, chunk_size):
+            file.write("".join(template.format(*record) for record in chunk))
+    elif output_format == "json":
+        # Stream a JSON array without building it in memory first
+        separator = "[\n"
+        for chunk in chunked(records, chunk_size):
+            file.write(separator + ",\n".join(_json_record(record) for record in chunk))
+            separator = ",\n"
+        file.write("[]\n" if separator == "[\n" else "\n]\n")
+    else:
+        raise ValueError(f"Unknown output format: {output_format!r}")
+
+
+def normalize_email(email):
+    """Returns an email address with surrounding spaces removed, case-folded."""
+    return email.strip().casefold()
+
+
+def normalize_phone(phone):
+    """
+    Returns only the digits of a phone number, without a leading US country code.
+    
+    Example:
+        >>> normalize_phone("+1 (555) 555-1234")
+        '5555551234'
+    """
+    digits = "".join(character for character in phone if character.isdigit())
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits
+
+
+def _normalize_text(text):
+    """Returns text case-folded with runs of whitespace collapsed."""
+    return " ".join(text.split()).casefold()
+
+
+# Blocking keys for near-duplicate detection. Entries that share the value
+# of any one key are considered candidates for being the same person;
+# empty key values never match.
+DEFAULT_BLOCKING_KEYS = {
+    "email": lambda entry: normalize_email(entry.get_email()),
+    "phone": lambda entry: normalize_phone(entry.get_phone()),
+    "name_and_birthday": lambda entry: (_normalize_text(entry.get_last_name()),
+                                        _normalize_text(entry.get_first_name())[:1],
+                                        entry.get_birthday().strip()),
+}
+
+
+def find_exact_duplicates(entries):
+    """
+    Group entries whose fields are all identical, in a single pass.
+    
+    Entries are bucketed by fingerprint and each bucket is then confirmed
+    with ==, so a fingerprint collision never reports unequal entries as
+    duplicates.
+    
+    Args:
+        entries (iterable): AddressBook objects
+    
+    Returns:
+        list: Lists of two or more entries that are equal to each other
+    """
+    groups = {}
+    for entry in entries:
+        groups.setdefault(entry.fingerprint(), []).append(entry)
+    duplicates = []
+    for group in groups.values():
+        while len(group) > 1:
+            first = group[0]
+            equal = [entry for entry in group if entry == first]
+            if len(equal) > 1:
+                duplicates.append(equal)
+            group = [entry for entry in group if not entry == first]
+    return duplicates
+
+
+def find_near_duplicates(entries, blocking_keys=None):
+    """
+    Group entries that probably describe the same person.
+    
+    Each entry is filed under the normalized value of every blocking key
+    (by default: email, digit-only phone, and last name + first initial +
+    birthday). Entries that share any key value end up in the same group,
+    so no pair of entries has to be compared directly.
+    
+    Args:
+        entries (iterable): AddressBook objects
+        blocking_keys (dict): Name -> function returning a key value for an entry
+    
+    Returns:
+        list: Lists of two or more entries that are likely duplicates
+    """
+    entries = list(entries)
+    if blocking_keys is None:
+        blocking_keys = DEFAULT_BLOCKING_KEYS
+    
+    # Union-find over entry positions
+    parents = list(range(len(entries)))
+    
+    def find(position):
+        while parents[position] != position:
+            parents[position] = parents[parents[position]]
+            position = parents[position]
+        return position
+    
+    for key_func in blocking_keys.values():
+        first_seen = {}
+        for position, entry in enumerate(entries):
+            key = key_func(entry)
+            if not key or (isinstance(key, tuple) and not all(key)):
+                continue
+            other = first_seen.setdefault(key, position)
+            if other != position:
+                parents[find(position)] = find(other)
+    
+    groups = {}
+    for position, entry in enumerate(entries):
+        groups.setdefault(find(position), []).append(entry)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+# Precompiled patterns for validating contact fields
+_EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[A-Za-z]{2,}")
+_ZIP_PATTERN = re.compile(r"\d{5}(?:-\d{4})?")
+
+# Positions of the validated fields within a record
+_EMAIL, _BIRTHDAY, _ZIP, _PHONE = (CONTACT_FIELD_NAMES.index(name)
+                                  for name in ("email", "birthday", "zip", "phone"))
+
+
+@functools.lru_cache(maxsize=65536)
+def normalize_birthday(birthday):
+    """
+    Validate a birthday and return it as zero-padded MM/DD/YYYY.
+    
+    Results are cached, since many contacts share the same birthday.
+    
+    Args:
+        birthday (str): Birthday in M/D/YYYY or MM/DD/YYYY format
+    
+    Returns:
+        str: The normalized birthday, or None if it is not a real past date
+    """
+    if parse_birthday(birthday) is None:
+        return None
+    month, day, year = split_birthday(birthday)
+    try:
+        date = datetime.date(year, month, day)
+    except ValueError:
+        return None
+    if year < 1900 or date > datetime.date.today():
+        return None
+    return f"{month:02d}/{day:02d}/{year}"
+
+
+def _validate_record(record):
+    """
+    Validate and normalize the email, birthday, zip code and phone of one record.
+    
+    A field that is not a string (None, for example) is flagged as
+    invalid like any other malformed value.
+    
+    Args:
+        record (tuple): The nine field values of a contact
+    
+    Returns:
+        tuple: (normalized record, bitmask of invalid fields)
+    """
+    values = list(record)
+    mask = 0
+    
+    email = values[_EMAIL]
+    email = normalize_email(email) if isinstance(email, str) else None
+    if email is not None and _EMAIL_PATTERN.fullmatch(email):
+        values[_EMAIL] = email
+    else:
+        mask |= 1 << _EMAIL
+    
+    birthday = values[_BIRTHDAY]
+    birthday = normalize_birthday(birthday) if isinstance(birthday, str) else None
+    if birthday is not None:
+        values[_BIRTHDAY] = birthday
+    else:
+        mask |= 1 << _BIRTHDAY
+    
+    zip_code = values[_ZIP]
+    zip_code = zip_code.strip() if isinstance(zip_code, str) else None
+    if zip_code is not None and _ZIP_PATTERN.fullmatch(zip_code):
+        values[_ZIP] = zip_code
+    else:
+        mask |= 1 << _ZIP
+    
+    phone = values[_PHONE]
+    phone = normalize_phone(phone) if isinstance(phone, str) else ""
+    if len(phone) == 10:
+        values[_PHONE] = f"{phone[:3]}-{phone[3:6]}-{phone[6:]}"
+    else:
+        mask |= 1 << _PHONE
+    
+    return tuple(values), mask
+
+
+def validate_batch(records):
+    """
+    Validate a batch of records; this is the unit of work sent to each worker process.
+    
+    Args:
+        records (list): Tuples of the nine field values
+    
+    Returns:
+        tuple: (list of normalized records, array of per-record error bitmasks)
+    """
+    normalized = []
+    masks = array.array("H")
+    for record in records:
+        values, mask = _validate_record(record)
+        normalized.append(values)
+        masks.append(mask)
+    return normalized, masks
+
+
+class ValidationReport:
+    """
+    Compact summary of a validation run.
+    
+    Only invalid records are stored: their positions and a bitmask of the
+    fields that failed, each in a compact integer array.
+    
+    Attributes:
+        total (int): Number of records validated
+        invalid_rows (array): Positions of the invalid records
+        error_masks (array): Bitmask of failed fields for each invalid record
+    """
+    
+    def __init__(self):
+        """Initialize an empty report."""
+        self.total = 0
+        self.invalid_rows = array.array("Q")
+        self.error_masks = array.array("H")
+    
+    def _add_batch(self, masks):
+        """Adds the error masks of the next batch of records."""
+        for position, mask in enumerate(masks, self.total):
+            if mask:
+                self.invalid_rows.append(position)
+                self.error_masks.append(mask)
+        self.total += len(masks)
+    
+    @property
+    def invalid_count(self):
+        """Number of records with at least one invalid field."""
+        return len(self.invalid_rows)
+    
+    def errors(self):
+        """Yields (record position, list of invalid field names) for each invalid record."""
+        for position, mask in zip(self.invalid_rows, self.error_masks):
+            yield position, _fields_in_mask(mask)
+    
+    def field_counts(self):
+        """Returns a dictionary mapping each field name to its number of invalid values."""
+        counts = collections.Counter()
+        for mask in self.error_masks:
+            counts.update(_fields_in_mask(mask))
+        return dict(counts)
+    
+    def __str__(self):
+        """Returns a one-line summary of the report."""
+        return f"{self.invalid_count} of {self.total} records invalid {self.field_counts()}"
+
+
+def validate_records(records, workers=None, batch_size=10000, executor=None):
+    """
+    Validate and normalize records in batches across a pool of processes.
+    
+    Batches are streamed to the workers and results are collected in the
+    original order. At most two batches per worker are in flight at a
+    time, so a large or lazy input is never read into memory up front.
+    
+    Args:
+        records (iterable): Tuples of the nine AddressBook field values
+        workers (int): Number of worker processes (default: one per CPU);
+            1 validates in the current process unless an executor is given
+        batch_size (int): Number of records sent to a worker at a time
+        executor (concurrent.futures.Executor): Executor to run the batches
+            on (default: a ProcessPoolExecutor with workers processes, shut
+            down when validation ends)
+    
+    Returns:
+        tuple: (list of normalized records, ValidationReport)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if executor is None and workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            return validate_records(records, workers, batch_size, executor)
+    normalized = []
+    report = ValidationReport()
+    batches = chunked(records, batch_size)
+    
+    if executor is None:
+        results = map(validate_batch, batches)
+        for batch_records, masks in results:
+            normalized.extend(batch_records)
+            report._add_batch(masks)
+        return normalized, report
+    
+    pending = collections.deque()
+    for batch in batches:
+        pending.append(executor.submit(validate_batch, batch))
+        if len(pending) >= 2 * workers:
+            batch_records, masks = pending.popleft().result()
+            normalized.extend(batch_records)
+            report._add_batch(masks)
+    while pending:
+        batch_records, masks = pending.popleft().result()
+        normalized.extend(batch_records)
+        report._add_batch(masks)
+    return normalized, report
+
+
+# Fields covered by ContactSearchIndex, by their CONTACT_FIELD_NAMES names
+SEARCH_FIELDS = ("first_name", "last_name", "city")
+
+
+def _trigrams(term):
+    """
+    Split a term into overlapping three-character n-grams.
+    
+    The term is padded with boundary markers so that short terms and the
+    start and end of a word still produce n-grams.
+    
+    Args:
+        term (str): A case-folded search term
+    
+    Returns:
+        set: The term's n-grams
+    """
+    padded = f"^^{term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TermIndex:
+    """
+    Search index over the values of a single field.
+    
+    Entries are grouped by their case-folded value (the "term"). Because
+    there are far fewer distinct names and cities than contacts, the
+    prefix and n-gram structures are built over distinct terms only:
+    
+    - a sorted list of terms, searched by bisection for prefix queries
+    - an n-gram -> terms mapping for typo-tolerant fuzzy queries
+    """
+    
+    def __init__(self):
+        """Initialize an empty term index."""
+        self._postings = {}
+        self._sorted_terms = []
+        self._ngrams = {}
+    
+    def add(self, term, entry):
+        """Adds an entry under a term."""
+        postings = self._postings.get(term)
+        if postings is None:
+            postings = self._postings[term] = {}
+            bisect.insort(self._sorted_terms, term)
+            for gram in _trigrams(term):
+                self._ngrams.setdefault(gram, set()).add(term)
+        postings[id(entry)] = entry
+    
+    def remove(self, term, entry):
+        """Removes an entry from a term, dropping the term once it is unused."""
+        postings = self._postings[term]
+        del postings[id(entry)]
+        if postings:
+            return
+        del self._postings[term]
+        del self._sorted_terms[bisect.bisect_left(self._sorted_terms, term)]
+        for gram in _trigrams(term):
+            terms = self._ngrams[gram]
+            terms.discard(term)
+            if not terms:
+                del self._ngrams[gram]
+    
+    def prefix_terms(self, prefix):
+        """Yields the terms starting with prefix, in alphabetical order."""
+        position = bisect.bisect_left(self._sorted_terms, prefix)
+        while position < len(self._sorted_terms) and self._sorted_terms[position].startswith(prefix):
+            yield self._sorted_terms[position]
+            position += 1
+    
+    def fuzzy_terms(self, text, min_similarity):
+        """
+        Returns the terms similar to text, best first.
+        
+        Similarity is the Dice coefficient of the two terms' n-gram sets.
+        
+        Returns:
+            list: (similarity, term) pairs sorted by descending similarity
+        """
+        grams = _trigrams(text)
+        shared = {}
+        for gram in grams:
+            for term in self._ngrams.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+        scored = []
+        for term, count in shared.items():
+            similarity = 2 * count / (len(grams) + len(_trigrams(term)))
+            if similarity >= min_similarity:
+                scored.append((similarity, term))
+        scored.sort(key=lambda pair: (-pair[0], pair[1]))
+        return scored
+    
+    def entries(self, term):
+        """Returns the entries filed under a term."""
+        return self._postings.get(term, {}).values()
+
+
+class ContactSearchIndex:
+    """
+    Type-ahead search over first name, last name and city.
+    
+    Attach the index to an AddressBookStore with add_index(); the store
+    then keeps it up to date as entries are added, removed or changed
+    through their set_* methods. Queries are case-insensitive.
+    
+    Methods:
+        search_prefix(prefix, field, limit, time_budget): Prefix search
+        search_fuzzy(text, field, limit, min_similarity, time_budget): Typo-tolerant search
+    """
+    
+    def __init__(self, fields=SEARCH_FIELDS):
+        """
+        Initialize an empty search index.
+        
+        Args:
+            fields (iterable): Names from CONTACT_FIELD_NAMES to index
+        
+        Raises:
+            ValueError: If a field is not one of CONTACT_FIELD_NAMES
+        """
+        unknown = set(fields) - set(CONTACT_FIELD_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        # Keyed by private attribute name, as used by entries and their listeners
+        self._fields = {"_" + field: _TermIndex() for field in fields}
+    
+    # Index protocol used by AddressBookStore
+    
+    def add(self, entry):
+        """Indexes every searchable field of an entry."""
+        # Every term is computed before any is filed, so an entry with a
+        # missing value is rejected without being half indexed
+        terms = [(index, getattr(entry, attribute).casefold())
+                 for attribute, index in self._fields.items()]
+        for index, term in terms:
+            index.add(term, entry)
+    
+    def remove(self, entry):
+        """Removes an entry from every field index."""
+        for attribute, index in self._fields.items():
+            index.remove(getattr(entry, attribute).casefold(), entry)
+    
+    def update(self, entry, attribute, old_value, new_value):
+        """Moves an entry to its new term when a searchable field changes."""
+        index = self._fields.get(attribute)
+        if index is not None:
+            index.remove(old_value.casefold(), entry)
+            index.add(new_value.casefold(), entry)
+    
+    # Queries
+    
+    def _field_indexes(self, field):
+        """Returns the term indexes to search; field None means all of them."""
+        if field is None:
+            return list(self._fields.values())
+        index = self._fields.get("_" + field) if isinstance(field, str) else None
+        if index is None:
+            raise ValueError(f"Field {field!r} is not indexed")
+        return [index]
+    
+    @staticmethod
+    def _collect(ranked_terms, limit, time_budget):
+        """
+        Gather up to limit distinct entries from terms in ranked order.
+        
+        Args:
+            ranked_terms (iterable): (term index, term) pairs, best first
+            limit (int): Maximum number of entries to return
+            time_budget (float): Seconds allowed before returning early (None for no limit)
+        
+        Returns:
+            list: The matching entries
+        """
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        results = {}
+        for index, term in ranked_terms:
+            for entry in index.entries(term):
+                results.setdefault(id(entry), entry)
+                if len(results) >= limit:
+                    return list(results.values())
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+        return list(results.values())
+    
+    def search_prefix(self, prefix, field=None, limit=10, time_budget=None):
+        """
+        Find entries whose field value starts with prefix.
+        
+        Args:
+            prefix (str): The text typed so far
+            field (str): Field name, e.g. "city", or None for all indexed fields
+            limit (int): Maximum number of entries to return
+            time_budget (float): Seconds allowed before returning early (None for no limit)
+        
+        Returns:
+            list: Up to limit matching entries, in alphabetical order of the matched value
+        """
+        prefix = prefix.casefold()
+        matches = sorted((term, position, index)
+                         for position, index in enumerate(self._field_indexes(field))
+                         for term in itertools.islice(index.prefix_terms(prefix), limit))
+        return self._collect(((index, term) for term, _, index in matches), limit, time_budget)
+    
+    def search_fuzzy(self, text, field=None, limit=10, min_similarity=0.3, time_budget=None):
+        """
+        Find entries whose field value is similar to text, tolerating typos.
+        
+        Args:
+            text (str): The (possibly misspelled) search text
+            field (str): Field name, e.g. "city", or None for all indexed fields
+            limit (int): Maximum number of entries to return
+            min_similarity (float): Lowest n-gram similarity (0 to 1) accepted
+            time_budget (float): Seconds allowed before returning early (None for no limit)
+        
+        Returns:
+            list: Up to limit matching entries, most similar first
+        """
+        text = text.casefold()
+        matches = sorted(((-similarity, term, position, index)
+                          for position, index in enumerate(self._field_indexes(field))
+                          for similarity, term in index.fuzzy_terms(text, min_similarity)),
+                         key=lambda match: match[:3])
+        return self._collect(((index, term) for _, term, _, index in matches), limit, time_budget)
+
+
+def _contact_to_dict(entry):
+    """Returns an entry's fields as a dictionary keyed by CONTACT_FIELD_NAMES."""
+    return {name: getattr(entry, attribute)
+            for name, attribute in zip(CONTACT_FIELD_NAMES, ADDRESS_BOOK_FIELDS)}
+
+
+def _percentile(sorted_samples, fraction):
+    """Returns the nearest-rank percentile of an already sorted list (None if empty)."""
+    if not sorted_samples:
+        return None
+    rank = max(math.ceil(fraction * len(sorted_samples)) - 1, 0)
+    return sorted_samples[rank]
+
+
+def _require_email(email):
+    """
+    Check that a requested email is a string before it is queued for lookup.
+    
+    Raises:
+        TypeError: If the email is not a string
+    """
+    if not isinstance(email, str):
+        raise TypeError(f"email must be a string, not {type(email).__name__}")
+    return email
+
+
+class AddressBookService:
+    """
+    Asyncio line-protocol server that exposes an AddressBookStore on localhost.
+    
+    Clients send one JSON object per line and receive one JSON response per
+    line, in the same order. Requests may be pipelined: a client can send
+    many before reading any responses.
+    
+    Requests (the optional "id" is echoed back):
+        {"op": "get", "email": ...}              -> {"ok": true, "contacts": [...]}
+        {"op": "get_many", "emails": [...]}      -> {"ok": true, "results": [[...], ...]}
+        {"op": "put", "contact": {...}}          -> {"ok": true, "created": bool}
+        {"op": "put_many", "contacts": [...]}    -> {"ok": true, "created": int}
+        {"op": "stats"}                          -> counters and latency percentiles
+    
+    Lookups that arrive during the same event-loop iteration are collected
+    and answered together in one pass over the email index. Each connection
+    may have at most max_in_flight requests outstanding; beyond that the
+    server stops reading from the socket, which pushes back on the client.
+    
+    Methods:
+        start(host, port): Starts listening and returns the bound address
+        close(): Stops the server
+        stats(): Returns request counters and latency percentiles
+    """
+    
+    def __init__(self, store=None, max_in_flight=64, max_batch=1024, latency_samples=100000):
+        """
+        Initialize the service.
+        
+        Args:
+            store (AddressBookStore): Contacts to serve (default: a new empty store)
+            max_in_flight (int): Outstanding requests allowed per connection
+            max_batch (int): Lookups answered per index pass at most
+            latency_samples (int): Number of recent request latencies kept for percentiles
+        """
+        self.store = AddressBookStore() if store is None else store
+        self.max_in_flight = max_in_flight
+        self.max_batch = max_batch
+        self._pending_lookups = []
+        self._flush_scheduled = False
+        self._latencies = collections.deque(maxlen=latency_samples)
+        self._request_count = 0
+        self._batch_count = 0
+        self._server = None
+        self._connections = set()
+    
+    async def start(self, host="127.0.0.1", port=0):
+        """
+        Start listening for connections.
+        
+        Args:
+            host (str): Interface to bind (default: localhost only)
+            port (int): Port to bind (0 picks a free port)
+        
+        Returns:
+            tuple: The (host, port) the server is bound to
+        """
+        self._server = await asyncio.start_server(self._handle_connection, host, port, limit=1 << 22)
+        return self._server.sockets[0].getsockname()[:2]
+    
+    async def serve_forever(self):
+        """Serves connections until cancelled."""
+        await self._server.serve_forever()
+    
+    async def close(self):
+        """Stops accepting connections and waits for open connections to finish."""
+        self._server.close()
+        await self._server.wait_closed()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+    
+    # Batched lookups
+    
+    def _lookup(self, email):
+        """
+        Queue an email lookup to be answered with the current batch.
+        
+        Returns:
+            asyncio.Future: Resolves to a list of contact dictionaries
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending_lookups.append((email, future))
+        if len(self._pending_lookups) >= self.max_batch:
+            self._flush_lookups()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush_lookups)
+        return future
+    
+    def _flush_lookups(self):
+        """Answers every queued lookup with one pass over the distinct emails."""
+        self._flush_scheduled = False
+        pending, self._pending_lookups = self._pending_lookups, []
+        if not pending:
+            return
+        self._batch_count += 1
+        try:
+            results = {email: [_contact_to_dict(entry) for entry in self.store.find_by_email(email)]
+                       for email in {email for email, _ in pending}}
+        except Exception:
+            # The batch has already been taken off the queue, so answer each
+            # lookup on its own: a bad one fails without stalling the others
+            for email, future in pending:
+                if future.done():
+                    continue
+                try:
+                    future.set_result([_contact_to_dict(entry)
+                                       for entry in self.store.find_by_email(email)])
+                except Exception as error:
+                    future.set_exception(error)
+            return
+        for email, future in pending:
+            if not future.done():
+                future.set_result(results[email])
+    
+    # Writes
+    
+    def _put(self, contact):
+        """
+        Add a contact, or update the existing contact with the same email.
+        
+        Returns:
+            bool: True if a new contact was created
+        """
+        try:
+            values = [contact[name] for name in CONTACT_FIELD_NAMES]
+        except KeyError as error:
+            raise ValueError(f"Contact is missing field {error}") from None
+        existing = self.store.find_by_email(contact["email"])
+        if not existing:
+            self.store.add(AddressBook(*values))
+            return True
+        for attribute, value in zip(ADDRESS_BOOK_FIELDS, values):
+            existing[0]._update(attribute, value)
+        return False
+    
+    # Request handling
+    
+    async def _execute(self, request):
+        """Runs one decoded request and returns the response dictionary."""
+        operation = request.get("op")
+        if operation == "get":
+            return {"contacts": await self._lookup(_require_email(request["email"]))}
+        if operation == "get_many":
+            emails = [_require_email(email) for email in request["emails"]]
+            return {"results": list(await asyncio.gather(*map(self._lookup, emails)))}
+        if operation == "put":
+            return {"created": self._put(request["contact"])}
+        if operation == "put_many":
+            return {"created": sum(self._put(contact) for contact in request["contacts"])}
+        if operation == "stats":
+            return self.stats()
+        raise ValueError(f"Unknown operation: {operation!r}")
+    
+    async def _respond(self, line, started):
+        """Decodes a request line, executes it and returns the encoded response."""
+        request = {}
+        try:
+            request = json.loads(line)
+            response = await self._execute(request)
+            response["ok"] = True
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            response = {"ok": False, "error": str(error)}
+        if isinstance(request, dict) and "id" in request:
+            response["id"] = request["id"]
+        self._request_count += 1
+        self._latencies.append(time.perf_counter() - started)
+        return json.dumps(response).encode("utf-8") + b"\n"
+    
+    async def _handle_connection(self, reader, writer):
+        """Reads pipelined requests from one client and writes responses in order."""
+        connection = asyncio.current_task()
+        self._connections.add(connection)
+        connection.add_done_callback(self._connections.discard)
+        responses = asyncio.Queue(self.max_in_flight)
+        writer_task = asyncio.create_task(self._write_responses(responses, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.ensure_future(self._respond(line, time.perf_counter()))
+                # Waits here once max_in_flight responses are outstanding,
+                # so the client is slowed down instead of the server queueing
+                await responses.put(task)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            await responses.put(None)
+            await writer_task
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+    
+    @staticmethod
+    async def _write_responses(responses, writer):
+        """Writes each response as soon as it and all earlier ones are ready."""
+        broken = False
+        while True:
+            task = await responses.get()
+            if task is None:
+                return
+            response = await task
+            if broken:
+                continue
+            try:
+                writer.write(response)
+                await writer.drain()
+            except ConnectionError:
+                broken = True
+    
+    def stats(self):
+        """
+        Returns request counters and latency percentiles.
+        
+        Returns:
+            dict: Request and batch counts, and p50/p90/p99 latency in milliseconds
+        """
+        samples = sorted(self._latencies)
+        stats = {"requests": self._request_count,
+                 "lookup_batches": self._batch_count,
+                 "contacts": len(self.store)}
+        for name, fraction in [("p50_ms", 0.50), ("p90_ms", 0.90), ("p99_ms", 0.99)]:
+            value = _percentile(samples, fraction)
+            stats[name] = None if value is None else value * 1000
+        return stats
+
+
+async def run_load_test(host, port, emails, clients=50, requests_per_client=2000, pipeline_depth=32):
+    """
+    Load generator: many clients send pipelined lookups to an AddressBookService.
+    
+    Each client keeps up to pipeline_depth requests in flight and measures
+    the time from sending each request to reading its response.
+    
+    Args:
+        host (str): Server host
+        port (int): Server port
+        emails (list): Email addresses to look up
+        clients (int): Number of concurrent client connections
+        requests_per_client (int): Lookups sent by each client
+        pipeline_depth (int): Requests each client keeps in flight
+    
+    Returns:
+        dict: Request count, requests per second and p50/p99 latency in milliseconds
+    """
+    latencies = []
+    
+    async def client(number):
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 22)
+        sent_times = collections.deque()
+        sent = 0
+        for _ in range(requests_per_client):
+            while sent < requests_per_client and len(sent_times) < pipeline_depth:
+                email = emails[(number * 7919 + sent) % len(emails)]
+                writer.write(json.dumps({"op": "get", "email": email}).encode("utf-8") + b"\n")
+                sent_times.append(time.perf_counter())
+                sent += 1
+            await writer.drain()
+            await reader.readline()
+            latencies.append(time.perf_counter() - sent_times.popleft())
+        writer.close()
+        await writer.wait_closed()
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(client(number) for number in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {"requests": len(latencies),
+            "requests/s": len(latencies) / elapsed,
+            "p50 (ms)": _percentile(latencies, 0.50) * 1000,
+            "p99 (ms)": _percentile(latencies, 0.99) * 1000}
+
+
+async def _serve(port):
+    """Serves the demo contacts on localhost until interrupted."""
+    store = AddressBookStore(AddressBook(*values) for values in _sample_contact_values(1000))
+    service = AddressBookService(store)
+    host, port = await service.start(port=port)
+    print(f"AddressBookService listening on {host}:{port} (Ctrl+C to stop)")
+    await service.serve_forever()
+
+
+async def _load_test(count=100000, clients=100):
+    """Starts a service in this process and runs the load generator against it."""
+    store = AddressBookStore(AddressBook(*values) for values in _sample_contact_values(count))
+    emails = [entry.get_email() for entry in store]
+    service = AddressBookService(store)
+    host, port = await service.start()
+    try:
+        results = await run_load_test(host, port, emails, clients=clients)
+    finally:
+        await service.close()
+    return results, service.stats()
+
+
+def benchmark_bulk_import(count=1000000):
+    """
+    Time exporting and re-importing synthetic contacts through CSV and JSON Lines.
+    
+    Args:
+        count (int): Number of contacts in the generated files
+    
+    Returns:
+        dict: Seconds taken by each step, keyed by step name
+    """
+    timings = {}
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "contacts.csv")
+        jsonl_path = os.path.join(directory, "contacts.jsonl")
+        source = load_records(_sample_contact_values(count))
+        
+        for name, action in [("export_csv", lambda: export_csv(source, csv_path)),
+                             ("import_csv", lambda: import_csv(csv_path)),
+                             ("export_jsonl", lambda: export_jsonl(source, jsonl_path)),
+                             ("import_jsonl", lambda: import_jsonl(jsonl_path))]:
+            start = time.perf_counter()
+            action()
+            timings[name] = time.perf_counter() - start
+    return timings
+
+
+def benchmark_search(count=1000000, queries=1000):
+    """
+    Time building a ContactSearchIndex and running prefix and fuzzy queries.
+    
+    Names and cities are replaced with random made-up words, so the index
+    holds a realistically large vocabulary instead of a handful of terms.
+    Queries are prefixes of those words and copies with two letters swapped.
+    
+    Args:
+        count (int): Number of synthetic contacts to index
+        queries (int): Number of queries of each kind to run
+    
+    Returns:
+        dict: Build time in seconds and average query latency in milliseconds
+    """
+    rng = random.Random(0)
+    syllables = ["an", "bel", "cor", "dan", "el", "fin", "gar", "hol", "is", "jo", "ken",
+                 "lo", "mar", "ner", "os", "per", "quin", "ros", "sal", "tor", "vin", "wes"]
+    vocabulary = ["".join(rng.choices(syllables, k=rng.randint(2, 4))).capitalize()
+                  for _ in range(max(count // 10, 100))]
+    cities = vocabulary[:max(len(vocabulary) // 20, 10)]
+    entries = [AddressBook(rng.choice(vocabulary), rng.choice(vocabulary), *values[2:5],
+                           rng.choice(cities), *values[6:])
+               for values in _sample_contact_values(count)]
+    index = ContactSearchIndex()
+    
+    start = time.perf_counter()
+    for entry in entries:
+        index.add(entry)
+    timings = {"build_search_index (s)": time.perf_counter() - start}
+    
+    prefixes = []
+    typos = []
+    for _ in range(queries):
+        word = rng.choice(vocabulary).lower()
+        prefixes.append(word[:rng.randint(1, 4)])
+        swap = rng.randrange(len(word) - 1)
+        typos.append(word[:swap] + word[swap + 1] + word[swap] + word[swap + 2:])
+    for name, search, texts in [("prefix_query (ms)", index.search_prefix, prefixes),
+                                ("fuzzy_query (ms)", index.search_fuzzy, typos)]:
+        start = time.perf_counter()
+        for number in range(queries):
+            search(texts[number % len(texts)], limit=10)
+        timings[name] = (time.perf_counter() - start) / queries * 1000
+    return timings
+
+
+def benchmark_rendering(count=500000):
+    """
+    Compare looping over display_info() with render_contacts().
+    
+    Output goes to os.devnull so that only formatting and write calls are timed.
+    
+    Args:
+        count (int): Number of synthetic contacts to render
+    
+    Returns:
+        dict: Seconds taken by each approach
+    """
+    entries = [AddressBook(*values) for values in _sample_contact_values(count)]
+    timings = {}
+    with open(os.devnull, "w") as devnull:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(devnull):
+            for entry in entries:
+                entry.display_info()
+        timings["display_info loop (s)"] = time.perf_counter() - start
+        
+        for output_format in ("text", "table", "json"):
+            start = time.perf_counter()
+            render_contacts(entries, devnull, output_format)
+            timings[f"render_contacts {output_format} (s)"] = time.perf_counter() - start
+    return timings
+
+
+def benchmark_database(count=1000000, reads=10000):
+    """
+    Time writing an AddressBookDatabase, reopening it and reading random records.
+    
+    Args:
+        count (int): Number of synthetic contacts to store
+        reads (int): Number of random records to read after reopening
+    
+    Returns:
+        dict: Seconds taken by each step
+    """
+    entries = [AddressBook(*values) for values in _sample_contact_values(count)]
+    timings = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "contacts.db")
+        start = time.perf_counter()
+        with AddressBookDatabase(path) as database:
+            database.extend(entries)
+        timings["write (s)"] = time.perf_counter() - start
+        del entries
+        
+        start = time.perf_counter()
+        database = AddressBookDatabase(path)
+        timings["cold open (s)"] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for number in range(reads):
+            database.get(number * 7919 % count)
+        timings[f"{reads} random reads (s)"] = time.perf_counter() - start
+        database.close()
+    return timings
+
+
+def benchmark_birthdays(count=1000000, queries=100):
+    """
+    Compare BirthdayIndex range queries with re-parsing every birthday string.
+    
+    Args:
+        count (int): Number of synthetic contacts
+        queries (int): Number of "next 30 days" queries to run with the index
+    
+    Returns:
+        dict: Seconds taken by each step
+    """
+    entries = [AddressBook(*values) for values in _sample_contact_values(count)]
+    today = datetime.date(2024, 12, 20)
+    timings = {}
+    
+    start = time.perf_counter()
+    first_day = birthday_day_of_year(today.month, today.day)
+    wanted = {(first_day + offset - 1) % _DAYS_IN_YEAR + 1 for offset in range(31)}
+    matches = []
+    for entry in entries:
+        month, day, _ = entry.get_birthday().split("/")
+        if birthday_day_of_year(int(month), int(day)) in wanted:
+            matches.append(entry)
+    timings["full scan query (s)"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    index = BirthdayIndex()
+    for entry in entries:
+        index.add(entry)
+    index.in_month(1)
+    timings["build index (s)"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for _ in range(queries):
+        index.upcoming(30, today)
+    timings["indexed query (s)"] = (time.perf_counter() - start) / queries
+    return timings
+
+
+def benchmark_concurrency(count=100000, readers=4, duration=2.0):
+    """
+    Measure lookups per second with ReadWriteLock and with GlobalLock.
+    
+    Reader threads look up random contacts by email while one writer
+    thread keeps changing email and phone numbers.
+    
+    Args:
+        count (int): Number of synthetic contacts in the store
+        readers (int): Number of reader threads
+        duration (float): Seconds to run each configuration
+    
+    Returns:
+        dict: Reads per second and writes per second for each lock type
+    """
+    results = {}
+    for lock_name, lock in [("ReadWriteLock", ReadWriteLock()), ("GlobalLock", GlobalLock())]:
+        entries = [AddressBook(*values) for values in _sample_contact_values(count)]
+        emails = [entry.get_email() for entry in entries]
+        store = ConcurrentAddressBookStore(entries, lock=lock)
+        stop = threading.Event()
+        read_counts = [0] * readers
+        write_count = [0]
+        
+        def read(slot):
+            number = slot
+            while not stop.is_set():
+                store.find_by_email(emails[number % count])
+                number += 7919
+                read_counts[slot] += 1
+        
+        def write():
+            number = 0
+            while not stop.is_set():
+                store.update(entries[number % count], phone=f"555-{number:07d}")
+                number += 1
+                write_count[0] += 1
+        
+        threads = [threading.Thread(target=read, args=(slot,)) for slot in range(readers)]
+        threads.append(threading.Thread(target=write))
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        results[f"{lock_name} reads/s"] = sum(read_counts) / duration
+        results[f"{lock_name} writes/s"] = write_count[0] / duration
+    return results
+
+
+def benchmark_validation(count=1000000):
+    """
+    Time validating synthetic contacts in one process and across a process pool.
+    
+    Args:
+        count (int): Number of synthetic contacts to validate
+    
+    Returns:
+        dict: Seconds taken by each configuration
+    """
+    records = list(_sample_contact_values(count))
+    timings = {}
+    for label, workers in [("1 process", 1), (f"{os.cpu_count()} processes", None)]:
+        start = time.perf_counter()
+        validate_records(records, workers=workers)
+        timings[label] = time.perf_counter() - start
+    return timings
+
+
+def run_benchmarks(count=1000000):
+    """
+    Run the performance benchmarks and print their results.
+    
+    Args:
+        count (int): Number of synthetic contacts each benchmark uses
+    """
+    print(f"AddressBook Benchmarks ({count} contacts):")
+    print("=" * 50)
+    
+    for step, seconds in benchmark_bulk_import(count).items():
+        print(f"{step}: {seconds:.2f} s")
+    for step, value in benchmark_search(count).items():
+        print(f"{step}: {value:.3f}")
+    for step, seconds in benchmark_rendering(count // 2).items():
+        print(f"{step}: {seconds:.2f}")
+    for step, seconds in benchmark_database(count).items():
+        print(f"database {step}: {seconds:.4f}")
+    for step, seconds in benchmark_birthdays(count).items():
+        print(f"birthdays {step}: {seconds:.4f}")
+    for step, rate in benchmark_concurrency(count // 10).items():
+        print(f"{step}: {rate:.0f}")
+    for step, seconds in benchmark_validation(count).items():
+        print(f"validation with {step}: {seconds:.2f} s")
+
+
+def test_service_rejects_bad_lookups():
+    """A malformed lookup fails on its own without stalling other requests in its batch."""
+    async def scenario():
+        entry = AddressBook("John", "Doe", "01/01/1980", "john.doe@example.com",
+                            "123 Main St", "Anytown", "CA", "12345", "555-555-1234")
+        service = AddressBookService(AddressBookStore([entry]))
+        started = time.perf_counter()
+        good, bad = await asyncio.wait_for(asyncio.gather(
+            service._respond(b'{"op": "get", "email": "john.doe@example.com"}', started),
+            service._respond(b'{"op": "get", "email": ["x"]}', started)), timeout=5)
+        assert json.loads(good)["contacts"][0]["first_name"] == "John"
+        assert json.loads(bad)["ok"] is False
+        
+        # Even a bad lookup that reaches the batch only fails its own request
+        futures = [service._lookup("john.doe@example.com"), service._lookup(["x"])]
+        await asyncio.wait_for(asyncio.wait(futures), timeout=5)
+        assert futures[0].result()[0]["email"] == "john.doe@example.com"
+        assert futures[1].exception() is not None
+    
+    asyncio.run(scenario())
+
+
+def test_validate_records_bounded_window():
+    """Parallel validation keeps at most two batches per worker in flight, in order."""
+    in_flight = []
+    
+    class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+        def submit(self, function, *args):
+            in_flight.append(1)
+            future = super().submit(function, *args)
+            future.add_done_callback(lambda _: in_flight.pop())
+            return future
+    
+    records = [("John", "Doe", f"1/{day % 28 + 1}/1980", f"john{day}@example.com",
+                "123 Main St", "Anytown", "CA", "12345", "555-555-1234") for day in range(50)]
+    peak = 0
+    
+    def lazy_records():
+        nonlocal peak
+        for record in records:
+            peak = max(peak, len(in_flight))
+            yield record
+    
+    with CountingExecutor(max_workers=2) as executor:
+        normalized, report = validate_records(lazy_records(), workers=2, batch_size=3,
+                                              executor=executor)
+    assert peak <= 4
+    assert [record[2] for record in normalized] == [
+        f"01/{day % 28 + 1:02d}/1980" for day in range(50)]
+    assert report.invalid_count == 0
+
+
+def test_normalize_birthday_matches_parse_birthday():
+    """normalize_birthday accepts exactly the month/day pairs parse_birthday accepts."""
+    assert normalize_birthday("2/29/2000") == "02/29/2000"
+    assert normalize_birthday(" 7/4/1976 ") == "07/04/1976"
+    for birthday in ("13/01/1980", "02/30/1980", "1-1-1980", "01/01/80", "01/01/1899"):
+        assert normalize_birthday(birthday) is None
+    assert normalize_birthday("02/29/2001") is None
+    assert parse_birthday("02/29/2001") == 60
+    assert split_birthday("3/5/1999") == (3, 5, 1999)
+
+
+def test_exact_duplicates_distinguish_types():
+    """Values that only look alike as strings are not reported as duplicates."""
+    fields = ["John", "Doe", "01/01/1980", "john.doe@example.com",
+              "123 Main St", "Anytown", "CA", "12345", None]
+    first = AddressBook(*fields)
+    second = AddressBook(*fields[:7], 12345, None)
+    third = AddressBook(*fields[:8], "None")
+    assert len({first.fingerprint(), second.fingerprint(), third.fingerprint()}) == 3
+    assert find_exact_duplicates([first, second, third]) == []
+    
+    copy = AddressBook(*fields)
+    assert find_exact_duplicates([first, second, copy, third]) == [[first, copy]]
+
+
+def test_upcoming_birthdays_follow_the_calendar():
+    """upcoming() counts real days, and leap-day birthdays move to March 1 in common years."""
+    def contact(first_name, birthday):
+        return AddressBook(first_name, "Doe", birthday, f"{first_name.lower()}@example.com",
+                           "123 Main St", "Anytown", "CA", "12345", "555-555-1234")
+    
+    index = BirthdayIndex()
+    for name, birthday in (("Feb", "02/28/1980"), ("Leap", "02/29/1980"),
+                           ("Mar", "03/01/1980"), ("New", "01/01/1980")):
+        index.add(contact(name, birthday))
+    names = lambda entries: [entry.get_first_name() for entry in entries]
+    assert names(index.upcoming(1, today=datetime.date(2023, 2, 28))) == ["Feb", "Leap", "Mar"]
+    assert names(index.upcoming(0, today=datetime.date(2023, 2, 28))) == ["Feb"]
+    assert names(index.upcoming(0, today=datetime.date(2023, 3, 1))) == ["Leap", "Mar"]
+    assert names(index.upcoming(1, today=datetime.date(2024, 2, 28))) == ["Feb", "Leap"]
+    assert names(index.upcoming(0, today=datetime.date(2024, 3, 1))) == ["Mar"]
+    assert names(index.upcoming(2, today=datetime.date(2022, 12, 30))) == ["New"]
+    assert names(index.upcoming(400, today=datetime.date(2023, 3, 1))) == ["Mar", "New", "Feb", "Leap"]
+
+
+def test_jsonl_errors_name_the_line():
+    """JSON Lines input is decoded per line and errors report the line number."""
+    good = json.dumps(dict(zip(CONTACT_FIELD_NAMES, next(_sample_contact_values(1)))))
+    records = list(iter_jsonl_records(io.StringIO(good + "\n\n" + good + "\n")))
+    assert len(records) == 2 and records[0] == records[1]
+    for bad, message in (("{not json", "Line 3: invalid JSON"),
+                         ('{"first_name": "John"}', "Line 3: contact is missing field"),
+                         ("[1, 2]", "Line 3: expected a JSON object")):
+        try:
+            list(iter_jsonl_records(io.StringIO(good + "\n\n" + bad + "\n")))
+        except ValueError as error:
+            assert str(error).startswith(message), error
+        else:
+            raise AssertionError(f"{bad!r} was accepted")
+
+
+def test_csv_errors_name_the_line():
+    """A CSV row with the wrong number of fields is reported with its line number."""
+    header = ",".join(CONTACT_FIELD_NAMES)
+    good = ",".join(next(_sample_contact_values(1)))
+    records = list(iter_csv_records(io.StringIO(f"{header}\n{good}\n\n{good}\n")))
+    assert len(records) == 2 and records[0] == records[1] == good.split(",")
+    for bad in ("John,Doe", good + ",extra"):
+        try:
+            load_records(iter_csv_records(io.StringIO(f"{header}\n{good}\n\n{bad}\n")))
+        except ValueError as error:
+            assert str(error).startswith("Line 4: expected 9 fields"), error
+        else:
+            raise AssertionError(f"{bad!r} was accepted")
+
+
+def test_load_records_keeps_collector_for_object_stores():
+    """The garbage collector is only paused while loading a columnar store."""
+    states = []
+    
+    class RecordingStore(AddressBookStore):
+        def extend(self, records):
+            states.append(gc.isenabled())
+            super().extend(records)
+    
+    class RecordingColumnarStore(ColumnarAddressBookStore):
+        def extend(self, records):
+            states.append(gc.isenabled())
+            super().extend(records)
+    
+    assert gc.isenabled()
+    load_records(_sample_contact_values(3), RecordingStore())
+    load_records(_sample_contact_values(3), RecordingColumnarStore())
+    assert states == [True, False] and gc.isenabled()
+
+
+def test_table_rule_matches_columns():
+    """The table underline lines up with the header's column separators."""
+    entry = AddressBook("John", "Doe", "01/01/1980", "john.doe@example.com",
+                        "123 Main St", "Anytown", "CA", "12345", "555-555-1234")
+    buffer = io.StringIO()
+    render_contacts([entry], buffer, "table")
+    header, rule, row = buffer.getvalue().splitlines()
+    assert len(rule) == len(row)
+    assert [position for position, char in enumerate(rule) if char == "+"] == \
+        [position for position, char in enumerate(header) if char == "|"]
+
+
+def test_nested_read_lock_fails_fast():
+    """Nesting a lookup inside reading() raises instead of deadlocking behind a writer."""
+    entry = AddressBook("John", "Doe", "01/01/1980", "john.doe@example.com",
+                        "123 Main St", "Anytown", "CA", "12345", "555-555-1234")
+    store = ConcurrentAddressBookStore([entry])
+    with store.reading() as snapshot:
+        assert snapshot.find_by_email("john.doe@example.com") == [entry]
+        try:
+            store.find_by_email("john.doe@example.com")
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("nested read lock was allowed")
+    assert len(store.find_by_email("john.doe@example.com")) == 1
+    
+    # Other threads still share the read lock
+    with store.reading():
+        results = []
+        reader = threading.Thread(target=lambda: results.append(len(store)))
+        reader.start()
+        reader.join(timeout=5)
+        assert results == [1]
+
+
+def test_memory_report_separates_listener_overhead():
+    """The per-contact memory figures report the _listeners list on its own."""
+    object_bytes, listener_bytes, columnar_bytes = measure_memory_per_contact(1000)
+    assert listener_bytes == sys.getsizeof([])
+    assert columnar_bytes < object_bytes - listener_bytes
+
+
+def test_columnar_extend_accepts_non_string_values():
+    """Bulk loads keep non-string values as append() does instead of failing to intern them."""
+    record = dict(zip(CONTACT_FIELD_NAMES, next(_sample_contact_values(1))), zip=12345)
+    store = load_records(iter_jsonl_records(io.StringIO(json.dumps(record) + "\n")))
+    single = ColumnarAddressBookStore()
+    single.append(*record.values())
+    assert list(store.records()) == list(single.records())
+    assert store[0].get_zip() == 12345 and store[0].get_city() is sys.intern(record["city"])
+
+
+def test_columnar_rows_share_listeners():
+    """A change through any lookup of a row reaches the stores indexing that row."""
+    columnar = load_records(_sample_contact_values(5))
+    store = AddressBookStore(columnar[1:3])
+    columnar[1].set_email("new@example.com")
+    assert store.find_by_email("new@example.com") == [columnar[1]]
+    assert [row._row for row in columnar[::2]] == [0, 2, 4]
+    assert columnar[-1] is columnar[4]
+    for bad in ("1", 1.5):
+        try:
+            columnar[bad]
+        except TypeError:
+            pass
+        else:
+            raise AssertionError(f"row {bad!r} was accepted")
+
+
+def test_database_round_trip_update_and_compaction():
+    """Records survive reopening, updates and compaction keep ids, and a failed update changes nothing."""
+    entries = [AddressBook(*values) for values in _sample_contact_values(20)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "contacts.db")
+        with AddressBookDatabase(path, compaction_ratio=None) as database:
+            ids = database.extend(entries)
+            database.delete(ids[3])
+            entries[5].set_phone("555-000-0000")
+            database.update(ids[5], entries[5])
+        
+        with AddressBookDatabase(path, compaction_ratio=None) as database:
+            assert len(database) == 19 and ids[3] not in database
+            assert database[ids[5]].get_phone() == "555-000-0000"
+            assert [entry for _, entry in database.items()] == entries[:3] + entries[4:]
+            garbage = database.garbage_bytes
+            assert garbage > 0
+            
+            too_long = AddressBook(*next(_sample_contact_values(1)))
+            too_long.set_street_address("x" * 65536)
+            try:
+                database.update(ids[0], too_long)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("an oversized field was stored")
+            assert database.garbage_bytes == garbage and database[ids[0]] == entries[0]
+            
+            size = os.path.getsize(path)
+            database.compact()
+            assert database.garbage_bytes == 0 and os.path.getsize(path) < size
+            assert database[ids[5]] == entries[5] and len(database) == 19
+
+
+def test_validate_records_flags_non_string_fields():
+    """A non-string field marks that record invalid instead of aborting the run."""
+    good = next(_sample_contact_values(1))
+    bad = list(good)
+    bad[_EMAIL] = None
+    bad[_ZIP] = 12345
+    bad[_PHONE] = None
+    bad[_BIRTHDAY] = ["01/01/1980"]
+    normalized, report = validate_records([good, tuple(bad)], workers=1)
+    assert report.invalid_count == 1 and len(normalized) == 2
+    assert sorted(report.field_counts()) == ["birthday", "email", "phone", "zip"]
+
+
+def test_store_lookups_duplicates_and_remove():
+    """The store finds entries by each key, keeps shared keys apart and forgets removed entries."""
+    john = AddressBook("John", "Doe", "01/01/1980", "shared@example.com",
+                       "123 Main St", "Anytown", "CA", "12345", "555-555-1234")
+    jane = AddressBook("Jane", "Doe", "02/02/1985", "shared@example.com",
+                       "123 Main St", "Anytown", "CA", "12345", "555-555-9876")
+    store = AddressBookStore([john, jane])
+    assert store.find_by_email("shared@example.com") == [john, jane]
+    assert store.find_by_phone("555-555-9876") == [jane]
+    assert store.find_by_name("Doe", "John") == [john]
+    try:
+        store.add(john)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("the same entry was added twice")
+    
+    store.remove(john)
+    assert store.find_by_email("shared@example.com") == [jane] and john not in store
+    john.set_email("john@example.com")
+    assert store.find_by_email("john@example.com") == [] and len(store) == 1
+    try:
+        store.remove(john)
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("a removed entry was removed again")
+
+
+def test_store_add_rolls_back_when_an_index_fails():
+    """An entry an attached index rejects is not left behind in the store's own indexes."""
+    store = AddressBookStore()
+    store.add_index(ContactSearchIndex())
+    nameless = AddressBook(None, "Doe", "01/01/1980", "nameless@example.com",
+                           "123 Main St", "Anytown", "CA", "12345", "555-555-1234")
+    try:
+        store.add(nameless)
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("the search index accepted a None name")
+    assert len(store) == 0 and nameless not in store and not nameless._listeners
+    assert store.find_by_email("nameless@example.com") == []
+    assert store.find_by_phone("555-555-1234") == []
+
+
+def test_location_reports_use_public_field_names():
+    """Location reports take "state", "city" and "zip", return copies and roll up zip prefixes."""
+    entries = [AddressBook("Ann", "Lee", "01/01/1980", f"ann{number}@example.com", "1 Main St",
+                           city, state, zip_code, "555-555-1234")
+               for number, (city, state, zip_code) in enumerate(
+                   [("Anytown", "CA", "90210"), ("Anytown", "CA", "90211"),
+                    ("Othertown", "NY", "10001"), ("Nowhere", "NY", "n/a")])]
+    index = LocationIndex()
+    store = AddressBookStore(entries)
+    store.add_index(index)
+    assert index.count_by("state") == {"CA": 2, "NY": 2}
+    assert index.entries_with("city", "Othertown") == [entries[2]]
+    assert index.zip_prefix_counts(1) == {"1": 1, "9": 2, "other": 1}
+    assert index.zip_prefix_counts(5) == {"10001": 1, "90210": 1, "90211": 1, "other": 1}
+    
+    groups = index.group_by("city")
+    groups["Anytown"].clear()
+    groups.clear()
+    assert len(index.group_by("city")["Anytown"]) == 2
+    
+    entries[0].set_zip("10002")
+    assert index.zip_prefix_counts(3) == {"100": 2, "902": 1, "other": 1}
+    store.remove(entries[3])
+    assert index.count_by("zip") == {"10001": 1, "10002": 1, "90211": 1}
+    assert "other" not in index.zip_prefix_counts(2)
+    try:
+        index.count_by("_state")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a private attribute name was accepted")
+
+
+def test_search_prefix_and_fuzzy():
+    """Prefix and typo-tolerant search by public field name, kept current through setters."""
+    entries = [AddressBook(first, last, "01/01/1980", f"{first.lower()}@example.com", "1 Main St",
+                           city, "CA", "12345", "555-555-1234")
+               for first, last, city in [("John", "Johnson", "Springfield"),
+                                         ("Joan", "Smith", "Riverside"),
+                                         ("Mary", "Jones", "Springdale")]]
+    index = ContactSearchIndex()
+    store = AddressBookStore(entries)
+    store.add_index(index)
+    assert index.search_prefix("JO") == [entries[1], entries[0], entries[2]]
+    assert index.search_prefix("jo", field="first_name") == [entries[1], entries[0]]
+    assert index.search_prefix("spr", field="city", limit=1) == [entries[2]]
+    assert index.search_fuzzy("Jonson", field="last_name")[0] is entries[0]
+    assert entries[1] in index.search_fuzzy("Smiht")
+    
+    entries[1].set_city("Springvale")
+    assert entries[1] in index.search_prefix("spring", field="city")
+    assert index.search_prefix("riv", field="city") == []
+    for bad_field in ("_city", "email"):
+        try:
+            index.search_prefix("a", field=bad_field)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"field {bad_field!r} was searched")
+
+
+def test_equality_ignores_cached_fingerprints():
+    """== gives the same answer whether or not fingerprints have been computed."""
+    fields = ["John", "Doe", "01/01/1980", "john.doe@example.com",
+              "123 Main St", "Anytown", "CA", "12345", "555-555-1234"]
+    first = AddressBook(*fields[:7], 12345, fields[8])
+    second = AddressBook(*fields[:7], 12345.0, fields[8])
+    assert first == second
+    assert first.fingerprint() != second.fingerprint()
+    assert first == second
+    
+    second.set_phone("555-555-9999")
+    assert first != second
+
+
+def test_change_journal_baseline_and_merging():
+    """A journal attached to a populated store starts empty and merges later changes per entry."""
+    def contact(first_name):
+        return AddressBook(first_name, "Doe", "01/01/1980", f"{first_name.lower()}@example.com",
+                           "123 Main St", "Anytown", "CA", "12345", "555-555-1234")
+    
+    existing = contact("Ann")
+    store = AddressBookStore([existing, contact("Bob")])
+    journal = ChangeJournal()
+    store.add_index(journal)
+    assert journal.sequence == 0 and len(journal) == 0
+    assert journal.changes_since(journal.sequence) == (0, [])
+    
+    existing.set_city("Newtown")
+    existing.set_zip("54321")
+    added = contact("Cal")
+    store.add(added)
+    added.set_phone("555-555-0000")
+    checkpoint, changes = journal.changes_since(0)
+    assert checkpoint == 4
+    assert changes == [ContactChange(existing, "updated", ["city", "zip"]),
+                       ContactChange(added, "added", list(CONTACT_FIELD_NAMES))]
+    
+    store.remove(existing)
+    assert journal.changes_since(checkpoint)[1] == [ContactChange(existing, "removed", [])]
+    journal.truncate(checkpoint)
+    assert len(journal) == 1
+    try:
+        journal.changes_since(0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("changes_since() read truncated changes")
+
+
+def test_change_journal_lets_removed_entries_go():
+    """Removed entries are not kept alive by the journal."""
+    def contact(first_name):
+        return AddressBook(first_name, "Doe", "01/01/1980", f"{first_name.lower()}@example.com",
+                           "123 Main St", "Anytown", "CA", "12345", "555-555-1234")
+    
+    store = AddressBookStore([contact("Ann")])
+    journal = ChangeJournal()
+    store.add_index(journal)
+    removed = next(iter(store))
+    transient = contact("Bob")
+    store.add(transient)
+    store.remove(removed)
+    store.remove(transient)
+    reference = weakref.ref(removed)
+    del removed, transient
+    gc.collect()
+    assert reference() is None
+    assert journal.changes_since(0) == (3, [ContactChange(None, "removed", [])])
+
+
+def test_birthday_index_removals_and_updates():
+    """Removed and re-filed entries are never reported twice or after removal."""
+    entries = [AddressBook(f"Person{number}", "Doe", f"{number % 12 + 1:02d}/15/1980",
+                           f"person{number}@example.com", "123 Main St", "Anytown", "CA",
+                           "12345", "555-555-1234")
+               for number in range(100)]
+    index = BirthdayIndex()
+    store = AddressBookStore(entries)
+    store.add_index(index)
+    assert len(index.in_month(1)) == 9
+    
+    january = index.in_month(1)
+    store.remove(january[0])
+    january[1].set_birthday("01/20/1981")
+    january[2].set_birthday("not a date")
+    assert index.in_month(1) == [january[3], *january[4:], january[1]]
+    assert len(index) == 98
+    
+    # Remove enough entries to trigger compaction, then re-add one
+    for entry in entries[:80]:
+        if entry in store:
+            store.remove(entry)
+    assert len(index) == 20
+    assert sorted(map(id, index.between(1, 366))) == sorted(map(id, entries[80:]))
+    store.add(entries[0])
+    assert index.in_month(1) == [entries[84], entries[96], entries[0]]
+    assert len(index.between(1, 366)) == 21
+
+
+def test_concurrent_store_setters_take_the_write_lock():
+    """set_* on a held entry waits for readers and keeps the store's indexes consistent."""
+    entry = AddressBook("John", "Doe", "01/01/1980", "john.doe@example.com",
+                        "123 Main St", "Anytown", "CA", "12345", "555-555-1234")
+    store = ConcurrentAddressBookStore([entry])
+    writer = threading.Thread(target=entry.set_email, args=("john@example.com",))
+    with store.reading() as snapshot:
+        writer.start()
+        writer.join(timeout=0.2)
+        assert writer.is_alive()
+        assert snapshot.find_by_email("john.doe@example.com") == [entry]
+        try:
+            entry.set_phone("555-555-0000")
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("set_phone() changed an entry inside reading()")
+    writer.join(timeout=5)
+    assert entry.get_email() == "john@example.com"
+    assert store.find_by_email("john.doe@example.com") == []
+    assert len(store.find_by_email("john@example.com")) == 1
+    
+    try:
+        ConcurrentAddressBookStore([entry])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("entry was added to a second concurrent store")
+    store.remove(entry)
+    entry.set_phone("555-555-0000")
+    assert len(ConcurrentAddressBookStore([entry])) == 1
+
+
+def run_tests():
+    """
+    Run every test_* function in this module and print the results.
+    
+    Returns:
+        bool: True if every test passed
+    """
+    tests = [(name, function) for name, function in globals().items()
+             if name.startswith("test_") and callable(function)]
+    failures = 0
+    for name, function in tests:
+        try:
+            function()
+        except Exception as error:
+            failures += 1
+            print(f"FAIL {name}: {type(error).__name__}: {error}")
+        else:
+            print(f"ok   {name}")
+    print(f"{len(tests) - failures} of {len(tests)} tests passed")
+    return failures == 0
+
+
+def main():
+    """
+    Main function to demonstrate the AddressBook class functionality.
+    
+    Creates four sample AddressBook instances and displays their information
+    to demonstrate the class features.
+    """
+    # Create four instances of AddressBook
+    person1 = AddressBook("John", "Doe", "01/01/1990", "john.doe@example.com", 
+                         "123 Main St", "Anytown", "NY", "12345", "555-555-5555")
+    
+    person2 = AddressBook("Jane", "Smith", "02/02/1985", "jane.smith@example.com", 
+                         "456 Elm St", "Othertown", "CA", "67890", "555-555-1234")
+    
+    person3 = AddressBook("Emily", "Johnson", "03/03/1975", "emily.johnson@example.com", 
+                         "789 Oak St", "Sometown", "TX", "11111", "555-555-6789")
+    
+    person4 = AddressBook("Michael", "Brown", "04/04/1965", "michael.brown@example.com", 
+                         "101 Pine St", "Anycity", "FL", "22222", "555-555-2468")
+    
+    # Display information for each person
+    print("Address Book Entries:")
+    print("=" * 50)
+    
+    person1.display_info()
+    person2.display_info()
+    person3.display_info()
+    person4.display_info()
+    
+    # Demonstrate magic methods
+    print("Demonstrating Magic Methods:")
+    print("=" * 50)
+    
+    print("String representation (__str__):")
+    print(person1)
+    print()
+    
+    print("Official representation (__repr__):")
+    print(repr(person1))
+    print()
+    
+    print("Equality comparison (__eq__):")
+    person1_copy = AddressBook("John", "Doe", "01/01/1990", "john.doe@example.com", 
+                              "123 Main St", "Anytown", "NY", "12345", "555-555-5555")
+    print(f"person1 == person1_copy: {person1 == person1_copy}")
+    print(f"person1 == person2: {person1 == person2}")
+    print()
+    
+    # Demonstrate getter and setter methods
+    print("Demonstrating Getter and Setter Methods:")
+    print("=" * 50)
+    
+    print(f"Original email: {person1.get_email()}")
+    person1.set_email("john.doe.updated@example.com")
+    print(f"Updated email: {person1.get_email()}")
+    print()
+    
+    print(f"Original phone: {person1.get_phone()}")
+    person1.set_phone("555-123-4567")
+    print(f"Updated phone: {person1.get_phone()}")
+    print()
+    
+    # Demonstrate indexed lookups with AddressBookStore
+    print("Demonstrating AddressBookStore Lookups:")
+    print("=" * 50)
+    
+    store = AddressBookStore([person1, person2, person3, person4])
+    print(f"Entries in store: {len(store)}")
+    print(f"Find by email: {[str(entry) for entry in store.find_by_email('jane.smith@example.com')]}")
+    print(f"Find by name: {[str(entry) for entry in store.find_by_name('Johnson', 'Emily')]}")
+    
+    # The store follows changes made through the setters
+    person4.set_phone("555-000-1111")
+    print(f"Find by old phone: {[str(entry) for entry in store.find_by_phone('555-555-2468')]}")
+    print(f"Find by new phone: {[str(entry) for entry in store.find_by_phone('555-000-1111')]}")
+    print()
+    
+    # Demonstrate type-ahead and typo-tolerant search
+    print("Demonstrating Contact Search:")
+    print("=" * 50)
+    
+    search_index = ContactSearchIndex()
+    store.add_index(search_index)
+    print(f"Prefix 'jo': {[str(entry) for entry in search_index.search_prefix('jo')]}")
+    print(f"Fuzzy 'Jonson': {[str(entry) for entry in search_index.search_fuzzy('Jonson')]}")
+    person2.set_city("Springfield")
+    print(f"City prefix 'spr': {[str(entry) for entry in search_index.search_prefix('spr', field='city')]}")
+    print()
+    
+    # Demonstrate the thread-safe store
+    print("Demonstrating ConcurrentAddressBookStore:")
+    print("=" * 50)
+    
+    concurrent_store = ConcurrentAddressBookStore([person1, person2])
+    concurrent_store.update(person2, email="jane.smith@example.org", phone="555-555-4321")
+    print(f"Find by email: {[str(entry) for entry in concurrent_store.find_by_email('jane.smith@example.org')]}")
+    print()
+    
+    # Demonstrate the persistent memory-mapped database
+    print("Demonstrating AddressBookDatabase:")
+    print("=" * 50)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "contacts.db")
+        with AddressBookDatabase(path) as database:
+            record_ids = database.extend([person1, person2, person3, person4])
+            database.update(record_ids[1], person3)
+            database.delete(record_ids[2])
+        with AddressBookDatabase(path) as database:
+            print(f"Records after reopening: {len(database)}")
+            print(f"Record {record_ids[1]}: {database.get(record_ids[1])}")
+            print(f"Stale bytes before compaction: {database.garbage_bytes}")
+            database.compact()
+            print(f"Stale bytes after compaction: {database.garbage_bytes}")
+    print()
+    
+    # Demonstrate buffered bulk rendering
+    print("Demonstrating Bulk Rendering:")
+    print("=" * 50)
+    
+    render_contacts([person1, person2, person3, person4], output_format="table")
+    print()
+    buffer = io.StringIO()
+    render_contacts([person1], buffer, output_format="json")
+    print(buffer.getvalue())
+    
+    # Demonstrate birthday range queries
+    print("Demonstrating Birthday Index:")
+    print("=" * 50)
+    
+    birthday_index = BirthdayIndex()
+    store.add_index(birthday_index)
+    person4.set_birthday("12/30/1965")
+    new_years_eve = datetime.date(2024, 12, 28)
+    print(f"Birthdays in the 7 days from 12/28: {[str(entry) for entry in birthday_index.upcoming(7, new_years_eve)]}")
+    print(f"Birthdays in March: {[str(entry) for entry in birthday_index.in_month(3)]}")
+    print()
+    
+    # Demonstrate location reports
+    print("Demonstrating Location Reports:")
+    print("=" * 50)
+    
+    location_index = LocationIndex()
+    store.add_index(location_index)
+    print(f"Contacts per state: {location_index.count_by('state')}")
+    print(f"Contacts per zip prefix: {location_index.zip_prefix_counts(1)}")
+    person2.set_zip("12999")
+    print(f"After moving a contact: {location_index.zip_prefix_counts(1)}")
+    print()
+    
+    # Demonstrate change tracking for incremental sync
+    print("Demonstrating Change Tracking:")
+    print("=" * 50)
+    
+    journal = ChangeJournal()
+    store.add_index(journal)
+    checkpoint = journal.sequence
+    person1.set_city("Newtown")
+    person1.set_zip("54321")
+    person2.set_email("jane.s@example.com")
+    print(f"Dirty fields of person1: {person1.dirty_fields()}")
+    checkpoint, changes = journal.changes_since(checkpoint)
+    for change in changes:
+        print(f"  {change.kind}: {change.entry} {change.fields}")
+    print(f"New checkpoint: {checkpoint}")
+    print()
+    
+    # Demonstrate validation and normalization
+    print("Demonstrating Validation:")
+    print("=" * 50)
+    
+    raw_records = [("Ann", "Lee", "5/7/1980", " Ann.Lee@Example.com", "1 Bay Rd", "Bayside", "WA", "98101", "(206) 555 0100"),
+                   ("Bob", "Ray", "02/30/1990", "bob.ray@", "2 Hill Rd", "Hilltop", "OR", "9720", "555-0101")]
+    normalized_records, report = validate_records(raw_records, workers=1)
+    print(f"Normalized: {normalized_records[0]}")
+    print(f"Report: {report}")
+    for position, fields in report.errors():
+        print(f"  Record {position} has invalid {', '.join(fields)}")
+    print()
+    
+    # Demonstrate fingerprint-based deduplication
+    print("Demonstrating Deduplication:")
+    print("=" * 50)
+    
+    person3_copy = AddressBook("Emily", "Johnson", "03/03/1975", "emily.johnson@example.com",
+                               "789 Oak St", "Sometown", "TX", "11111", "555-555-6789")
+    person3_variant = AddressBook("emily", "JOHNSON", "03/03/1975", " Emily.Johnson@Example.com",
+                                  "789 Oak Street", "Sometown", "TX", "11111", "(555) 555-6789")
+    contacts = [person1, person2, person3, person4, person3_copy, person3_variant]
+    print(f"Exact duplicate groups: {[[str(entry) for entry in group] for group in find_exact_duplicates(contacts)]}")
+    print(f"Near-duplicate groups: {[[str(entry) for entry in group] for group in find_near_duplicates(contacts)]}")
+    print()
+    
+    # Demonstrate the memory-compact columnar store
+    print("Demonstrating Columnar Storage:")
+    print("=" * 50)
+    
+    columnar = ColumnarAddressBookStore([person1, person2, person3, person4])
+    print(f"Row 0 (__repr__): {columnar[0]!r}")
+    print(f"Row 0 == person1: {columnar[0] == person1}")
+    
+    object_bytes, listener_bytes, columnar_bytes = measure_memory_per_contact(10000)
+    print(f"Bytes per AddressBook object: {object_bytes:.0f} "
+          f"(of which _listeners list: {listener_bytes:.0f})")
+    print(f"Bytes per columnar row: {columnar_bytes:.0f}")
+    print(f"Bytes saved per contact: {object_bytes - columnar_bytes:.0f} "
+          f"({object_bytes - listener_bytes - columnar_bytes:.0f} without listeners)")
 
 
 if __name__ == "__main__":
-    main()
+    # Pass --benchmark to run the (slow) performance benchmarks, --test to
+    # run the self-checks, --serve to run the address book service, or
+    # --load-test to measure its latency
+    if "--benchmark" in sys.argv:
+        run_benchmarks()
+    elif "--test" in sys.argv:
+        sys.exit(0 if run_tests() else 1)
+    elif "--serve" in sys.argv:
+        try:
+            asyncio.run(_serve(port=8765))
+        except KeyboardInterrupt:
+            pass
+    elif "--load-test" in sys.argv:
+        client_results, server_stats = asyncio.run(_load_test())
+        print(f"Load generator: {client_results}")
+        print(f"Server stats: {server_stats}")
+    else:
+        main()
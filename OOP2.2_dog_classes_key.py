@@ -9,8 +9,168 @@ Classes:
     Dog: Base class for all dogs with common attributes
     SportingDog: Inherits from Dog, represents sporting/hunting dogs
     WorkingDog: Inherits from Dog, represents working/guard dogs
+    CompactDog, CompactSportingDog, CompactWorkingDog: Slot-based dogs sharing BreedProfiles
+    DogRegistry: Columnar storage and vectorized queries for many dogs
 """
 
+import array
+import bisect
+import collections
+import concurrent.futures
+import copy
+import enum
+import functools
+import gc
+import heapq
+import io
+import itertools
+import json
+import mmap
+import operator
+import os
+import pickle
+import random
+import re
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+import weakref
+
+
+# Conversion factors to the units used for parsed ranges: inches for
+# heights and years for life spans
+LENGTH_UNITS = {"in": 1.0, "inch": 1.0, "inches": 1.0, '"': 1.0,
+                "ft": 12.0, "foot": 12.0, "feet": 12.0,
+                "cm": 1 / 2.54, "centimeter": 1 / 2.54, "centimeters": 1 / 2.54}
+TIME_UNITS = {"yr": 1.0, "yrs": 1.0, "year": 1.0, "years": 1.0,
+              "month": 1 / 12, "months": 1 / 12}
+
+_RANGE_PATTERN = re.compile(
+    r"\s*(\d+(?:\.\d+)?)\s*(?:(?:-|–|to)\s*(\d+(?:\.\d+)?))?\s*([a-zA-Z\"]*)\s*")
+
+
+def parse_range(text, units, default_unit):
+    """
+    Parse a range such as "21.5-24 inches" or "10 to 12 years" into numbers.
+    
+    A single value ("24 inches") gives a range with equal ends. The ends
+    are converted into a common unit using the units table.
+    
+    Args:
+        text (str): The range description
+        units (dict): Unit name -> factor converting it to the common unit
+        default_unit (str): Unit assumed when the text has none
+    
+    Returns:
+        tuple: (low, high) as floats in the common unit, or None if the
+        text cannot be parsed
+    
+    Example:
+        >>> parse_range("21.5-24 inches", LENGTH_UNITS, "inches")
+        (21.5, 24.0)
+    """
+    match = _RANGE_PATTERN.fullmatch(str(text))
+    if match is None:
+        return None
+    low, high, unit = match.groups()
+    factor = units.get((unit or default_unit).lower())
+    if factor is None:
+        return None
+    low = float(low) * factor
+    high = low if high is None else float(high) * factor
+    return (min(low, high), max(low, high))
+
+
+class _OrdinalEnum(enum.IntEnum):
+    """
+    Ordered levels for a free-text dog attribute.
+    
+    parse() maps text such as "Very Strong" or "very-strong" to a member,
+    so the levels compare consistently. UNKNOWN (0) ranks below every level.
+    """
+    
+    @classmethod
+    def parse(cls, text):
+        """
+        Convert a free-text level into a member of the enum.
+        
+        Args:
+            text (str): Level description, e.g. "very good"
+        
+        Returns:
+            _OrdinalEnum: The matching member, or UNKNOWN
+        """
+        if isinstance(text, cls):
+            return text
+        return _parse_ordinal(cls, text)
+    
+    def __str__(self):
+        """Returns the level as written in dog data, e.g. "very strong"."""
+        return self.name.replace("_", " ").lower()
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_ordinal(enum_type, text):
+    """Looks up a level by its normalized name; results are cached per distinct text."""
+    if not isinstance(text, str):
+        return enum_type.UNKNOWN
+    name = "_".join(text.replace("-", " ").replace("_", " ").split()).upper()
+    return enum_type.__members__.get(name, enum_type.UNKNOWN)
+
+
+class HuntingAbility(_OrdinalEnum):
+    """Ordered levels of a sporting dog's hunting_ability."""
+    
+    UNKNOWN = 0
+    POOR = 1
+    FAIR = 2
+    GOOD = 3
+    VERY_GOOD = 4
+    EXCELLENT = 5
+
+
+class StrengthLevel(_OrdinalEnum):
+    """Ordered levels of a working dog's strength_level."""
+    
+    UNKNOWN = 0
+    WEAK = 1
+    MODERATE = 2
+    STRONG = 3
+    VERY_STRONG = 4
+
+
+def _cached_info(method):
+    """
+    Memoize a get_info() implementation per instance.
+    
+    Each class in the hierarchy caches its own level under the undecorated
+    method, so super().get_info() still returns the base class text.
+    Dog.__setattr__ drops the cache whenever an attribute is assigned.
+    Classes that set _cache_info to False build the text on every call.
+    
+    Args:
+        method (function): The get_info() implementation to wrap
+    
+    Returns:
+        function: The memoizing get_info()
+    """
+    @functools.wraps(method)
+    def get_info(self):
+        if not self._cache_info:
+            return method(self)
+        cache = self.__dict__.get("_info_cache")
+        if cache is None:
+            cache = {}
+            object.__setattr__(self, "_info_cache", cache)
+        info = cache.get(method)
+        if info is None:
+            info = cache[method] = method(self)
+        return info
+    return get_info
+
+
 class Dog:
     """
     Base class representing a generic dog.
@@ -23,8 +183,40 @@ class Dog:
         height_range (str): Height range of the dog
         life_span (str): Expected life span of the dog
         color (str): Color(s) of the dog's coat
+        height_interval (tuple): height_range parsed into (low, high) inches
+        life_span_interval (tuple): life_span parsed into (low, high) years
+        type_tag (int): Small integer identifying the dog's class, assigned
+            when the class is defined
     """
     
+    # Every Dog class, indexed by its type tag; Dog itself is tag 0. The
+    # list holds strong references, so a Dog subclass is never released,
+    # even one defined inside a function: tags must stay valid for the
+    # lifetime of the process because dispatch tables index them
+    type_tag = 0
+    _types_by_tag = []
+    
+    # Whether get_info() keeps its text in the instance __dict__
+    _cache_info = True
+    
+    def __init_subclass__(cls, **kwargs):
+        """Registers a new Dog subclass and gives it the next type tag."""
+        super().__init_subclass__(**kwargs)
+        cls.type_tag = len(Dog._types_by_tag)
+        Dog._types_by_tag.append(cls)
+    
+    @staticmethod
+    def registered_types():
+        """
+        Get every Dog class defined so far.
+        
+        Classes are never removed, so the result only grows.
+        
+        Returns:
+            tuple: The classes, indexed by type tag
+        """
+        return tuple(Dog._types_by_tag)
+    
     def __init__(self, average_weight, height_range, life_span, color):
         """
         Initialize a Dog object with basic attributes.
@@ -40,6 +232,39 @@ class Dog:
         self.life_span = life_span
         self.color = color
     
+    def __setattr__(self, name, value):
+        """Assign an attribute and drop the cached get_info() text."""
+        object.__setattr__(self, name, value)
+        self.__dict__.pop("_info_cache", None)
+    
+    def __getstate__(self):
+        """Pickle the attributes without the cached get_info() text."""
+        state = self.__dict__.copy()
+        state.pop("_info_cache", None)
+        return state
+    
+    @property
+    def height_range(self):
+        """Height range description, e.g. "21.5-24 inches"."""
+        return self._height_range
+    
+    @height_range.setter
+    def height_range(self, value):
+        """Sets the height range and parses it into height_interval."""
+        self._height_range = value
+        self.height_interval = parse_range(value, LENGTH_UNITS, "inches")
+    
+    @property
+    def life_span(self):
+        """Life span description, e.g. "10-12 years"."""
+        return self._life_span
+    
+    @life_span.setter
+    def life_span(self, value):
+        """Sets the life span and parses it into life_span_interval."""
+        self._life_span = value
+        self.life_span_interval = parse_range(value, TIME_UNITS, "years")
+    
     def bark(self):
         """
         Basic barking behavior for all dogs.
@@ -67,6 +292,7 @@ class Dog:
         """
         return f"This {self.average_weight} pound dog is taking a nap."
     
+    @_cached_info
     def get_info(self):
         """
         Get comprehensive information about the dog.
@@ -81,6 +307,9 @@ class Dog:
                 f"  Color: {self.color}")
 
 
+Dog._types_by_tag.append(Dog)
+
+
 class SportingDog(Dog):
     """
     Class representing sporting/hunting dogs.
@@ -113,6 +342,11 @@ class SportingDog(Dog):
         self.hunting_ability = hunting_ability
         self.water_resistance = water_resistance
     
+    @property
+    def hunting_rank(self):
+        """hunting_ability as an ordered HuntingAbility level."""
+        return HuntingAbility.parse(self.hunting_ability)
+    
     def hunt(self):
         """
         Sporting dogs' specialized hunting behavior.
@@ -143,6 +377,7 @@ class SportingDog(Dog):
         else:
             return f"This {self.color} sporting dog prefers to stay on land."
     
+    @_cached_info
     def get_info(self):
         """
         Get comprehensive information about the sporting dog.
@@ -188,6 +423,11 @@ class WorkingDog(Dog):
         self.work_type = work_type
         self.strength_level = strength_level
     
+    @property
+    def strength_rank(self):
+        """strength_level as an ordered StrengthLevel level."""
+        return StrengthLevel.parse(self.strength_level)
+    
     def guard(self):
         """
         Working dogs' guarding behavior.
@@ -215,6 +455,7 @@ class WorkingDog(Dog):
         """
         return f"This {self.work_type} dog is searching for survivors."
     
+    @_cached_info
     def get_info(self):
         """
         Get comprehensive information about the working dog.
@@ -228,91 +469,2890 @@ class WorkingDog(Dog):
                 f"  Strength Level: {self.strength_level}")
 
 
-def main():
+def render_info(dogs, file=None, separator="\n\n"):
     """
-    Main function to demonstrate the Dog classes and their functionality.
+    Format the get_info() text of many dogs in one pass.
     
-    Creates instances of each dog class and demonstrates their
-    attributes, methods, and inheritance relationships.
+    The texts (cached per dog by get_info()) are joined into a single
+    string, which is written with one call when a file is given.
+    
+    Args:
+        dogs (iterable): Dog objects to render
+        file (file object): Optional text stream to write the output to
+        separator (str): Text placed between two dogs
+    
+    Returns:
+        str: The rendered text
+    
+    Example:
+        >>> print(render_info([golden_retriever, german_shepherd]))
     """
-    print("Dog Classes Demonstration")
-    print("=" * 50)
+    text = separator.join([dog.get_info() for dog in dogs])
+    if file is not None:
+        file.write(text)
+    return text
+
+
+class TypeDispatcher:
+    """
+    Routes dogs to handlers through a table indexed by Dog.type_tag.
     
-    # Create instances of each dog class
-    print("1. Creating a Sporting Dog (Golden Retriever):")
-    golden_retriever = SportingDog(
-        average_weight=65,
-        height_range="21.5-24 inches",
-        life_span="10-12 years",
-        color="golden",
-        hunting_ability="excellent",
-        water_resistance=True
-    )
+    Handlers are registered per class. A class without its own handler
+    uses the handler of its nearest registered base class, so new breed
+    groups work with existing dispatchers without editing them. Routing a
+    dog is a single list lookup by its type tag instead of a chain of
+    isinstance() checks.
     
-    print("2. Creating a Working Dog (German Shepherd):")
-    german_shepherd = WorkingDog(
-        average_weight=75,
-        height_range="22-26 inches",
-        life_span="7-10 years",
-        color="black and tan",
-        work_type="police work",
-        strength_level="very strong"
-    )
+    Example:
+        >>> describe = TypeDispatcher(default=lambda dog: "a dog")
+        >>> describe.register(SportingDog, lambda dog: "a sporting dog")
+        >>> describe(golden_retriever)
+        'a sporting dog'
+    """
     
-    # Demonstrate basic Dog methods (inherited by all)
-    print("\n3. Demonstrating Basic Dog Behaviors (Inherited):")
-    print("-" * 40)
+    def __init__(self, default=None):
+        """
+        Initialize a dispatcher.
+        
+        Args:
+            default (callable): Handler for dogs whose class has no registered
+                handler (None makes such dogs raise TypeError)
+        """
+        self._handlers = {}
+        self._table = []
+        self.default = default
     
-    print("Golden Retriever basic behaviors:")
-    print(f"  Bark: {golden_retriever.bark()}")
-    print(f"  Eat: {golden_retriever.eat()}")
-    print(f"  Sleep: {golden_retriever.sleep()}")
+    def register(self, dog_type, handler=None):
+        """
+        Register the handler for a class and its unregistered subclasses.
+        
+        Can also be used as a decorator: @dispatcher.register(WorkingDog)
+        
+        Args:
+            dog_type (type): Dog or a Dog subclass
+            handler (callable): Function called with the dog (and any extra
+                arguments passed to the dispatcher)
+        
+        Returns:
+            callable: The handler, or a decorator when handler is omitted
+        """
+        if handler is None:
+            return functools.partial(self.register, dog_type)
+        self._handlers[dog_type] = handler
+        self._table = []
+        return handler
     
-    print("\nGerman Shepherd basic behaviors:")
-    print(f"  Bark: {german_shepherd.bark()}")
-    print(f"  Eat: {german_shepherd.eat()}")
-    print(f"  Sleep: {german_shepherd.sleep()}")
+    def _resolve(self, dog_type):
+        """Returns the handler for a class, searching its bases in MRO order."""
+        for base in dog_type.__mro__:
+            handler = self._handlers.get(base)
+            if handler is not None:
+                return handler
+        return self.default
     
-    # Demonstrate specialized methods for SportingDog
-    print("\n4. Demonstrating Sporting Dog Specialized Behaviors:")
-    print("-" * 40)
-    print(f"  Hunt: {golden_retriever.hunt()}")
-    print(f"  Retrieve: {golden_retriever.retrieve()}")
-    print(f"  Swim: {golden_retriever.swim()}")
+    def _build_table(self):
+        """Rebuilds the tag -> handler table for every registered Dog class."""
+        self._table = [self._resolve(dog_type) for dog_type in Dog.registered_types()]
     
-    # Demonstrate specialized methods for WorkingDog
-    print("\n5. Demonstrating Working Dog Specialized Behaviors:")
-    print("-" * 40)
-    print(f"  Guard: {german_shepherd.guard()}")
-    print(f"  Pull Sled: {german_shepherd.pull_sled()}")
-    print(f"  Search & Rescue: {german_shepherd.search_rescue()}")
+    def handler_for(self, dog):
+        """
+        Look up the handler for a dog.
+        
+        Returns:
+            callable: The handler, or None if there is none
+        """
+        try:
+            return self._table[type(dog).type_tag]
+        except IndexError:
+            # A class was defined after the table was built
+            self._build_table()
+            return self._table[type(dog).type_tag]
     
-    # Demonstrate polymorphism with get_info method
-    print("\n6. Demonstrating Polymorphism (get_info method):")
-    print("-" * 40)
+    def __call__(self, dog, *args, **kwargs):
+        """
+        Call the handler for a dog.
+        
+        Raises:
+            TypeError: If no handler applies to the dog's class
+        """
+        try:
+            handler = self._table[type(dog).type_tag]
+        except IndexError:
+            handler = self.handler_for(dog)
+        if handler is None:
+            raise TypeError(f"No handler registered for {type(dog).__name__}")
+        return handler(dog, *args, **kwargs)
     
-    print("Golden Retriever Information:")
-    print(golden_retriever.get_info())
+    def map(self, dogs, *args, **kwargs):
+        """Returns a list of the handler results for every dog."""
+        table = self._table
+        results = []
+        append = results.append
+        for dog in dogs:
+            try:
+                handler = table[type(dog).type_tag]
+            except IndexError:
+                handler = self.handler_for(dog)
+                table = self._table
+            if handler is None:
+                raise TypeError(f"No handler registered for {type(dog).__name__}")
+            append(handler(dog, *args, **kwargs))
+        return results
+
+
+def partition_by_type(dogs):
+    """
+    Split dogs into one list per class in a single pass, without isinstance().
     
-    print("\nGerman Shepherd Information:")
-    print(german_shepherd.get_info())
+    Args:
+        dogs (iterable): Dog objects
     
-    # Demonstrate inheritance relationships
-    print("\n7. Demonstrating Inheritance Relationships:")
-    print("-" * 40)
-    print(f"Is Golden Retriever a Dog? {isinstance(golden_retriever, Dog)}")
-    print(f"Is German Shepherd a Dog? {isinstance(german_shepherd, Dog)}")
-    print(f"Is Golden Retriever a SportingDog? {isinstance(golden_retriever, SportingDog)}")
-    print(f"Is German Shepherd a WorkingDog? {isinstance(german_shepherd, WorkingDog)}")
+    Returns:
+        dict: Class -> list of dogs of exactly that class, for classes that
+        have at least one dog
+    """
+    buckets = [[] for _ in Dog.registered_types()]
+    for dog in dogs:
+        buckets[dog.type_tag].append(dog)
+    return {dog_type: bucket for dog_type, bucket in zip(Dog.registered_types(), buckets) if bucket}
+
+
+# Behaviors run for every dog on a simulation tick. DogBatch accepts any
+# method name; a dog whose class lacks the method yields None
+BEHAVIORS = ("bark", "eat", "sleep", "hunt", "guard")
+
+
+def _run_behavior(task):
+    """
+    Run one behavior over a chunk of same-class dogs; this is the unit of work sent to each worker process.
     
-    # Create a list of dogs to demonstrate polymorphism
-    print("\n8. Demonstrating Polymorphism with a List of Dogs:")
-    print("-" * 40)
-    dogs = [golden_retriever, german_shepherd]
+    Args:
+        task (tuple): (dog class, behavior name, list of dogs)
     
-    for i, dog in enumerate(dogs, 1):
-        print(f"Dog {i} ({type(dog).__name__}): {dog.bark()}")
+    Returns:
+        list: The behavior's result for each dog
+    """
+    dog_type, action, dogs = task
+    return list(map(getattr(dog_type, action), dogs))
+
+
+class DogBatch:
+    """
+    Runs behaviors over many dogs, grouped by concrete class.
+    
+    Each method is looked up once per class and then mapped over the
+    whole group, instead of being looked up on every dog. The dogs are
+    kept in class order, and run() returns results in that same order.
+    
+    Attributes:
+        dogs (list): The dogs, grouped by class
+    
+    Example:
+        >>> batch = DogBatch([golden_retriever, german_shepherd])
+        >>> batch.run("hunt")
+        ['This excellent hunting dog is tracking game!', None]
+    """
+    
+    def __init__(self, dogs=()):
+        """
+        Initialize the batch and group the dogs by class.
+        
+        Args:
+            dogs (iterable): Dog objects to run behaviors on
+        """
+        groups = {}
+        for dog in dogs:
+            group = groups.get(type(dog))
+            if group is None:
+                group = groups[type(dog)] = []
+            group.append(dog)
+        self._groups = groups
+        self._methods = {}
+        self.dogs = list(itertools.chain.from_iterable(groups.values()))
+    
+    def __len__(self):
+        """Returns the number of dogs in the batch."""
+        return len(self.dogs)
+    
+    def counts(self):
+        """
+        Count the dogs of each class.
+        
+        Returns:
+            dict: Class name -> number of dogs
+        """
+        return {dog_type.__name__: len(group) for dog_type, group in self._groups.items()}
+    
+    def _method(self, dog_type, action):
+        """Resolve a behavior on a class once; None if the class lacks it."""
+        key = (dog_type, action)
+        try:
+            return self._methods[key]
+        except KeyError:
+            method = self._methods[key] = getattr(dog_type, action, None)
+            return method
+    
+    def run(self, action, workers=1, chunk_size=100000):
+        """
+        Run a behavior on every dog.
+        
+        Groups larger than chunk_size are split into chunks and spread
+        across a pool of worker processes when workers is more than 1.
+        
+        Args:
+            action (str): Name of the behavior method, e.g. "bark"
+            workers (int): Number of worker processes; None means one per
+                CPU and 1 runs everything in the current process
+            chunk_size (int): Number of dogs sent to a worker at a time
+        
+        Returns:
+            list: The result for each dog in self.dogs, or None where the
+            dog's class lacks the behavior
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        results = []
+        pooled = []
+        for dog_type, group in self._groups.items():
+            method = self._method(dog_type, action)
+            if method is None:
+                results.extend(itertools.repeat(None, len(group)))
+            elif workers > 1 and len(group) > chunk_size:
+                # Reserve the group's slots and fill them in once the pool is done
+                pooled.append((len(results), group))
+                results.extend(itertools.repeat(None, len(group)))
+            else:
+                results.extend(map(method, group))
+        
+        if pooled:
+            tasks = [(type(group[0]), action, group[start:start + chunk_size])
+                     for _, group in pooled for start in range(0, len(group), chunk_size)]
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                chunks = executor.map(_run_behavior, tasks)
+                for offset, group in pooled:
+                    for start in range(0, len(group), chunk_size):
+                        chunk = next(chunks)
+                        results[offset + start:offset + start + len(chunk)] = chunk
+        return results
+    
+    def run_all(self, actions=BEHAVIORS, workers=1, chunk_size=100000):
+        """
+        Run several behaviors on every dog, e.g. one simulation tick.
+        
+        Args:
+            actions (iterable): Names of the behavior methods
+            workers (int): Number of worker processes, as for run()
+            chunk_size (int): Number of dogs sent to a worker at a time
+        
+        Returns:
+            dict: Behavior name -> list of results, as returned by run()
+        """
+        return {action: self.run(action, workers, chunk_size) for action in actions}
+
+
+# Attributes shared by many dogs of the same breed, stored once per
+# BreedProfile. Fields that do not apply to a dog's class are None
+BREED_PROFILE_FIELDS = ("height_range", "life_span", "color", "hunting_ability",
+                        "water_resistance", "work_type", "strength_level")
+
+
+class BreedProfile:
+    """
+    Immutable, interned set of the attributes shared by dogs of a breed.
+    
+    intern() returns the existing profile for a combination of values, so
+    thousands of compact dogs refer to one profile object (and one copy of
+    each string) instead of holding their own copies. The parsed height
+    and life span intervals are computed once per profile.
+    
+    Profiles are held weakly and disappear when no dog refers to them.
+    
+    Example:
+        >>> BreedProfile.intern("21.5-24 inches", "10-12 years", "golden") is \\
+        ...     BreedProfile.intern("21.5-24 inches", "10-12 years", "golden")
+        True
+    """
+    
+    __slots__ = BREED_PROFILE_FIELDS + ("height_interval", "life_span_interval", "__weakref__")
+    
+    _interned = weakref.WeakValueDictionary()
+    
+    @classmethod
+    def intern(cls, height_range=None, life_span=None, color=None, hunting_ability=None,
+               water_resistance=None, work_type=None, strength_level=None):
+        """
+        Get the shared profile for a combination of attribute values.
+        
+        Args:
+            height_range (str): Height range description
+            life_span (str): Life span description
+            color (str): Coat color description
+            hunting_ability (str): Level of hunting ability (sporting dogs)
+            water_resistance (bool): Whether the dog is water-resistant (sporting dogs)
+            work_type (str): Type of work the dog performs (working dogs)
+            strength_level (str): Level of physical strength (working dogs)
+        
+        Returns:
+            BreedProfile: The existing profile with these values, or a new one
+        """
+        key = (height_range, life_span, color, hunting_ability,
+               water_resistance, work_type, strength_level)
+        profile = cls._interned.get(key)
+        if profile is None:
+            profile = object.__new__(cls)
+            for name, value in zip(BREED_PROFILE_FIELDS, key):
+                object.__setattr__(profile, name, value)
+            object.__setattr__(profile, "height_interval",
+                               parse_range(height_range, LENGTH_UNITS, "inches"))
+            object.__setattr__(profile, "life_span_interval",
+                               parse_range(life_span, TIME_UNITS, "years"))
+            cls._interned[key] = profile
+        return profile
+    
+    @classmethod
+    def count(cls):
+        """Returns the number of profiles currently in use."""
+        return len(cls._interned)
+    
+    def __setattr__(self, name, value):
+        """Refuses every assignment; profiles are shared and must not change."""
+        raise AttributeError("BreedProfile is immutable; use replace() instead")
+    
+    def values(self):
+        """Returns the profile's values in BREED_PROFILE_FIELDS order."""
+        return tuple(getattr(self, name) for name in BREED_PROFILE_FIELDS)
+    
+    def replace(self, **changes):
+        """
+        Get the shared profile with some values changed.
+        
+        Args:
+            **changes: New values for fields in BREED_PROFILE_FIELDS
+        
+        Returns:
+            BreedProfile: The interned profile with the changed values
+        """
+        values = dict(zip(BREED_PROFILE_FIELDS, self.values()))
+        values.update(changes)
+        return BreedProfile.intern(**values)
+    
+    def __reduce__(self):
+        """Pickles the profile as a call to intern() with its values."""
+        # Unpickled profiles are interned again rather than duplicated
+        return (BreedProfile.intern, self.values())
+    
+    def __repr__(self):
+        """Returns the profile's non-None values, e.g. BreedProfile(color='golden')."""
+        fields = ", ".join(f"{name}={value!r}" for name, value
+                           in zip(BREED_PROFILE_FIELDS, self.values()) if value is not None)
+        return f"BreedProfile({fields})"
+
+
+def _profile_property(name):
+    """
+    Build a property that reads a shared attribute from a compact dog's profile.
+    
+    Assigning the property switches the dog to the interned profile with
+    that one value changed; other dogs sharing the old profile are unaffected.
+    
+    Args:
+        name (str): Attribute name, e.g. "color"
+    
+    Returns:
+        property: Property backed by the dog's BreedProfile
+    """
+    get = operator.attrgetter(name)
+    
+    def getter(self):
+        return get(self._profile)
+    
+    def setter(self, value):
+        try:
+            profile = self._profile
+        except AttributeError:
+            profile = BreedProfile.intern()
+        self._profile = profile.replace(**{name: value})
+    
+    return property(getter, setter)
+
+
+class _CompactDogMixin:
+    """
+    Slot-based storage for the compact dog classes.
+    
+    Each dog stores only its average_weight and a reference to a shared
+    BreedProfile; every other attribute is a property that reads from the
+    profile. Because Dog itself has no __slots__, the compact classes still
+    inherit a __dict__ (and __weakref__) slot: each instance carries those
+    two extra pointers, and a real dictionary of a few hundred bytes is
+    created the first time an attribute outside the slots is assigned or
+    __dict__ is read. The compact classes never do either themselves; in
+    particular they set _cache_info to False so get_info() builds its text
+    on each call instead of caching it in a __dict__.
+    """
+    
+    __slots__ = ("average_weight", "_profile")
+    
+    _cache_info = False
+    
+    __setattr__ = object.__setattr__
+    
+    height_range = _profile_property("height_range")
+    life_span = _profile_property("life_span")
+    color = _profile_property("color")
+    height_interval = property(lambda self: self._profile.height_interval)
+    life_span_interval = property(lambda self: self._profile.life_span_interval)
+    
+    @property
+    def profile(self):
+        """The BreedProfile holding the dog's shared attributes."""
+        return self._profile
+    
+    def __getstate__(self):
+        """Pickle the weight and the profile; the unused __dict__ is left out."""
+        return (None, {"average_weight": self.average_weight, "_profile": self._profile})
+
+
+class CompactDog(_CompactDogMixin, Dog):
+    """
+    Memory-compact Dog whose shared attributes live in a BreedProfile.
+    
+    Behaves exactly like a Dog (and is one, for isinstance()), with the
+    same methods and get_info() output. get_info() is not cached.
+    """
+    
+    __slots__ = ()
+    
+    def __init__(self, average_weight, height_range, life_span, color):
+        """
+        Initialize a CompactDog object; the arguments are the same as Dog's.
+        
+        Args:
+            average_weight (int): Average weight in pounds
+            height_range (str): Height range description
+            life_span (str): Life span description
+            color (str): Coat color description
+        """
+        self.average_weight = average_weight
+        self._profile = BreedProfile.intern(height_range, life_span, color)
+
+
+class CompactSportingDog(_CompactDogMixin, SportingDog):
+    """
+    Memory-compact SportingDog whose shared attributes live in a BreedProfile.
+    
+    Behaves exactly like a SportingDog (and is one, for isinstance()),
+    with the same methods and get_info() output. get_info() is not cached.
+    """
+    
+    __slots__ = ()
+    
+    hunting_ability = _profile_property("hunting_ability")
+    water_resistance = _profile_property("water_resistance")
+    
+    def __init__(self, average_weight, height_range, life_span, color, hunting_ability, water_resistance=True):
+        """
+        Initialize a CompactSportingDog object; the arguments are the same as SportingDog's.
+        
+        Args:
+            average_weight (int): Average weight in pounds
+            height_range (str): Height range description
+            life_span (str): Life span description
+            color (str): Coat color description
+            hunting_ability (str): Level of hunting ability
+            water_resistance (bool): Whether dog is water-resistant (default: True)
+        """
+        self.average_weight = average_weight
+        self._profile = BreedProfile.intern(height_range, life_span, color,
+                                            hunting_ability, water_resistance)
+
+
+class CompactWorkingDog(_CompactDogMixin, WorkingDog):
+    """
+    Memory-compact WorkingDog whose shared attributes live in a BreedProfile.
+    
+    Behaves exactly like a WorkingDog (and is one, for isinstance()),
+    with the same methods and get_info() output. get_info() is not cached.
+    """
+    
+    __slots__ = ()
+    
+    work_type = _profile_property("work_type")
+    strength_level = _profile_property("strength_level")
+    
+    def __init__(self, average_weight, height_range, life_span, color, work_type, strength_level):
+        """
+        Initialize a CompactWorkingDog object; the arguments are the same as WorkingDog's.
+        
+        Args:
+            average_weight (int): Average weight in pounds
+            height_range (str): Height range description
+            life_span (str): Life span description
+            color (str): Coat color description
+            work_type (str): Type of work the dog performs
+            strength_level (str): Level of physical strength
+        """
+        self.average_weight = average_weight
+        self._profile = BreedProfile.intern(height_range, life_span, color,
+                                            work_type=work_type, strength_level=strength_level)
+
+
+# Compact class used for each regular dog class by compact_dog()
+_COMPACT_TYPES = {Dog: CompactDog, SportingDog: CompactSportingDog,
+                  WorkingDog: CompactWorkingDog}
+
+
+def compact_dog(dog):
+    """
+    Create the compact equivalent of a regular dog.
+    
+    Args:
+        dog (Dog): A Dog, SportingDog or WorkingDog object
+    
+    Returns:
+        Dog: A CompactDog, CompactSportingDog or CompactWorkingDog object
+    
+    Raises:
+        TypeError: If the dog's class has no compact equivalent
+    """
+    if isinstance(dog, _CompactDogMixin):
+        return dog
+    compact_type = _COMPACT_TYPES.get(type(dog))
+    if compact_type is None:
+        raise TypeError(f"No compact class for {type(dog).__name__}")
+    compact = compact_type.__new__(compact_type)
+    compact.average_weight = dog.average_weight
+    compact._profile = BreedProfile.intern(*(getattr(dog, name, None)
+                                            for name in BREED_PROFILE_FIELDS))
+    return compact
+
+
+# Dog file formats. Both record a dog's concrete class by name plus the
+# attributes in DOG_FIELDS; other attributes of custom subclasses are not saved
+DOG_FIELDS = ("average_weight",) + BREED_PROFILE_FIELDS
+DOG_FILE_VERSION = 1
+
+# Binary layout: a header, fixed-size records, a JSON table of every
+# distinct class name and value, and a trailer that locates the table.
+# Each record is a class number followed by one value number per field
+_DOG_FILE_MAGIC = b"DOGF"
+_DOG_FILE_HEADER = struct.Struct("<4sH")
+_DOG_FILE_TRAILER = struct.Struct("<QQ4s")
+_DOG_RECORD = struct.Struct("<H" + "I" * len(DOG_FIELDS))
+
+# Value types the JSON table can hold and give back unchanged
+_TABLE_VALUE_TYPES = (str, int, float, bool, type(None))
+
+
+def _dog_types():
+    """
+    Map the name dog files use for each registered Dog class to the class.
+    
+    Files name a class by its __qualname__. A name shared by several
+    registered classes maps to None, since a file could not tell them apart.
+    
+    Returns:
+        dict: Class name -> class, or None for an ambiguous name
+    """
+    types = {}
+    for dog_type in Dog.registered_types():
+        name = dog_type.__qualname__
+        types[name] = None if name in types else dog_type
+    return types
+
+
+def _dog_type_name(dog_type):
+    """
+    Returns the name a dog file stores for a class.
+    
+    Raises:
+        ValueError: If another registered Dog class has the same name
+    """
+    name = dog_type.__qualname__
+    if _dog_types().get(name) is not dog_type:
+        raise ValueError(f"Cannot save {name}: another Dog class has the same name")
+    return name
+
+
+def _resolve_dog_type(known_types, name):
+    """
+    Look up a class name read from a dog file.
+    
+    Args:
+        known_types (dict): The result of _dog_types()
+        name (str): Class name from the file
+    
+    Raises:
+        KeyError: If no registered class has the name
+        ValueError: If several registered classes have the name
+    """
+    dog_type = known_types[name]
+    if dog_type is None:
+        raise ValueError(f"Several Dog classes are named {name!r}")
+    return dog_type
+
+
+def _dog_values(dog):
+    """Returns a dog's DOG_FIELDS values, with None for missing attributes."""
+    if isinstance(dog, _CompactDogMixin):
+        return (dog.average_weight,) + dog.profile.values()
+    return tuple(getattr(dog, name, None) for name in DOG_FIELDS)
+
+
+def _restore_dog(dog_type, values, intervals=None):
+    """
+    Recreate a dog from its DOG_FIELDS values without calling __init__.
+    
+    Args:
+        dog_type (type): The dog's class
+        values (tuple): The dog's values in DOG_FIELDS order
+        intervals (tuple): Optional already parsed (height_interval,
+            life_span_interval) pair
+    
+    Returns:
+        Dog: The restored dog
+    """
+    dog = dog_type.__new__(dog_type)
+    if isinstance(dog, _CompactDogMixin):
+        dog.average_weight = values[0]
+        dog._profile = BreedProfile.intern(*values[1:])
+        return dog
+    
+    average_weight, height_range, life_span, color = values[:4]
+    if intervals is None:
+        intervals = (parse_range(height_range, LENGTH_UNITS, "inches"),
+                     parse_range(life_span, TIME_UNITS, "years"))
+    state = {"average_weight": average_weight, "_height_range": height_range,
+             "height_interval": intervals[0], "_life_span": life_span,
+             "life_span_interval": intervals[1], "color": color}
+    # Subclass attributes are only set when present, as __init__ would
+    for name, value in zip(DOG_FIELDS[4:], values[4:]):
+        if value is not None:
+            state[name] = value
+    dog.__dict__.update(state)
+    return dog
+
+
+class DogFileWriter:
+    """
+    Streams dogs into a versioned binary dog file.
+    
+    Records are written as they arrive; each distinct class name and value
+    is kept once in memory and written to the table at the end of the file
+    by close().
+    
+    Example:
+        >>> with DogFileWriter("kennel.dogs") as writer:
+        ...     writer.extend(dogs)
+    """
+    
+    def __init__(self, path):
+        """
+        Create (or overwrite) a dog file.
+        
+        Args:
+            path (str): Path of the file to write
+        """
+        self._file = open(path, "wb")
+        self._file.write(_DOG_FILE_HEADER.pack(_DOG_FILE_MAGIC, DOG_FILE_VERSION))
+        self._types = {}
+        self._values = {}
+        self._count = 0
+    
+    def __enter__(self):
+        """Returns the writer for use in a with statement."""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Finishes the file at the end of a with statement."""
+        self.close()
+    
+    def __len__(self):
+        """Returns the number of dogs written so far."""
+        return self._count
+    
+    def _value_number(self, value):
+        """Returns the table position of a value, adding it if it is new."""
+        # The type is part of the key so that True, 1 and 1.0 stay distinct
+        key = (type(value), value)
+        number = self._values.get(key)
+        if number is None:
+            # Checked here, once per distinct value, so close() cannot fail
+            if type(value) not in _TABLE_VALUE_TYPES:
+                raise TypeError(f"Cannot save {value!r}: dog files hold only "
+                                f"str, int, float, bool and None values")
+            number = self._values[key] = len(self._values)
+        return number
+    
+    def write(self, dog):
+        """
+        Append a dog to the file.
+        
+        Args:
+            dog (Dog): A Dog or Dog subclass object
+        
+        Raises:
+            TypeError: If one of the dog's values cannot be stored
+            ValueError: If another Dog class has the same name as the dog's
+        """
+        numbers = list(map(self._value_number, _dog_values(dog)))
+        type_number = self._types.get(type(dog))
+        if type_number is None:
+            _dog_type_name(type(dog))
+            type_number = self._types[type(dog)] = len(self._types)
+        self._file.write(_DOG_RECORD.pack(type_number, *numbers))
+        self._count += 1
+    
+    def extend(self, dogs):
+        """Append every dog in an iterable."""
+        for dog in dogs:
+            self.write(dog)
+    
+    def close(self):
+        """Writes the class and value table and the trailer, and closes the file."""
+        if self._file.closed:
+            return
+        table = {"types": [dog_type.__qualname__ for dog_type in self._types],
+                 "fields": list(DOG_FIELDS),
+                 "values": [value for _, value in self._values]}
+        table_offset = self._file.tell()
+        self._file.write(json.dumps(table, separators=(",", ":")).encode("utf-8"))
+        self._file.write(_DOG_FILE_TRAILER.pack(self._count, table_offset, _DOG_FILE_MAGIC))
+        self._file.close()
+
+
+def save_dogs(dogs, path):
+    """
+    Write dogs to a binary dog file.
+    
+    Args:
+        dogs (iterable): Dog objects to save
+        path (str): Path of the file to write
+    
+    Returns:
+        int: Number of dogs written
+    """
+    with DogFileWriter(path) as writer:
+        writer.extend(dogs)
+    return len(writer)
+
+
+class DogFile:
+    """
+    Read-only, memory-mapped view of a binary dog file.
+    
+    Opening the file reads only the trailer and the class and value table;
+    dogs are created lazily when indexed or iterated, as objects of their
+    original class and without calling __init__.
+    
+    Example:
+        >>> with DogFile("kennel.dogs") as kennel:
+        ...     print(len(kennel), kennel[0].get_info())
+    """
+    
+    def __init__(self, path):
+        """
+        Open a dog file.
+        
+        Args:
+            path (str): Path of the file to read
+        
+        Raises:
+            ValueError: If the file is not a dog file, has an unsupported
+                version, or names a class that several Dog classes share
+            KeyError: If the file uses a class that has not been defined
+        """
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is not a dog file") from None
+        
+        if len(self._map) < _DOG_FILE_HEADER.size + _DOG_FILE_TRAILER.size:
+            self.close()
+            raise ValueError(f"{path} is not a dog file")
+        magic, version = _DOG_FILE_HEADER.unpack_from(self._map)
+        count, table_offset, end_magic = _DOG_FILE_TRAILER.unpack_from(
+            self._map, len(self._map) - _DOG_FILE_TRAILER.size)
+        if magic != _DOG_FILE_MAGIC or end_magic != _DOG_FILE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a dog file")
+        if version != DOG_FILE_VERSION:
+            self.close()
+            raise ValueError(f"{path} has unsupported dog file version {version}")
+        
+        table = json.loads(self._map[table_offset:len(self._map) - _DOG_FILE_TRAILER.size])
+        known_types = _dog_types()
+        try:
+            self._types = [_resolve_dog_type(known_types, name) for name in table["types"]]
+        except (KeyError, ValueError):
+            self.close()
+            raise
+        self._values = table["values"]
+        self._count = count
+        # Intervals are parsed once per distinct value rather than once per dog
+        self._height_intervals = {}
+        self._life_span_intervals = {}
+    
+    def __enter__(self):
+        """Returns the file for use in a with statement."""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Closes the file at the end of a with statement."""
+        self.close()
+    
+    def __len__(self):
+        """Returns the number of dogs in the file."""
+        return self._count
+    
+    def _dog(self, numbers):
+        """Restores a dog from an unpacked record."""
+        values = self._values
+        field_values = [values[number] for number in numbers[1:]]
+        height_number, life_span_number = numbers[2], numbers[3]
+        height_interval = self._height_intervals.get(height_number)
+        if height_interval is None:
+            height_interval = self._height_intervals[height_number] = \
+                parse_range(values[height_number], LENGTH_UNITS, "inches")
+        life_span_interval = self._life_span_intervals.get(life_span_number)
+        if life_span_interval is None:
+            life_span_interval = self._life_span_intervals[life_span_number] = \
+                parse_range(values[life_span_number], TIME_UNITS, "years")
+        return _restore_dog(self._types[numbers[0]], field_values,
+                            (height_interval, life_span_interval))
+    
+    def __getitem__(self, position):
+        """
+        Read one dog.
+        
+        Args:
+            position (int): Position of the dog in the file
+        
+        Returns:
+            Dog: A new object of the dog's original class
+        
+        Raises:
+            IndexError: If the position is out of range
+        """
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError("dog file position out of range")
+        offset = _DOG_FILE_HEADER.size + position * _DOG_RECORD.size
+        return self._dog(_DOG_RECORD.unpack_from(self._map, offset))
+    
+    def __iter__(self):
+        """Yields every dog in file order, decoding the records in blocks."""
+        start = _DOG_FILE_HEADER.size
+        end = start + self._count * _DOG_RECORD.size
+        block_size = _DOG_RECORD.size * 10000
+        for block_start in range(start, end, block_size):
+            block = self._map[block_start:min(block_start + block_size, end)]
+            for numbers in _DOG_RECORD.iter_unpack(block):
+                yield self._dog(numbers)
+    
+    def close(self):
+        """Unmaps and closes the file."""
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def load_dogs(path):
+    """
+    Read every dog from a binary dog file into a list.
+    
+    Args:
+        path (str): Path of the file to read
+    
+    Returns:
+        list: The dogs, as objects of their original classes
+    """
+    # The restored dogs cannot form reference cycles, so the cyclic garbage
+    # collector is paused while they are created
+    collector_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with DogFile(path) as kennel:
+            return list(kennel)
+    finally:
+        if collector_was_enabled:
+            gc.enable()
+
+
+def write_dogs_jsonl(dogs, file):
+    """
+    Write dogs as JSON Lines: a version header, then one object per dog.
+    
+    Each object holds the dog's class name under "type" and its non-None
+    DOG_FIELDS values.
+    
+    Args:
+        dogs (iterable): Dog objects to write
+        file (file object): Text stream to write to
+    
+    Returns:
+        int: Number of dogs written
+    
+    Raises:
+        ValueError: If another Dog class has the same name as a dog's class
+    """
+    encode = json.JSONEncoder(separators=(",", ":")).encode
+    type_names = {}
+    file.write(encode({"format": "dogs", "version": DOG_FILE_VERSION}) + "\n")
+    count = 0
+    lines = []
+    for dog in dogs:
+        type_name = type_names.get(type(dog))
+        if type_name is None:
+            type_name = type_names[type(dog)] = _dog_type_name(type(dog))
+        record = {"type": type_name}
+        for name, value in zip(DOG_FIELDS, _dog_values(dog)):
+            if value is not None:
+                record[name] = value
+        lines.append(encode(record))
+        count += 1
+        if len(lines) == 10000:
+            file.write("\n".join(lines) + "\n")
+            lines = []
+    if lines:
+        file.write("\n".join(lines) + "\n")
+    return count
+
+
+def iter_dogs_jsonl(file):
+    """
+    Stream dogs from a JSON Lines file written by write_dogs_jsonl().
+    
+    Args:
+        file (file object): Text stream to read from
+    
+    Yields:
+        Dog: Each dog, as an object of its original class
+    
+    Raises:
+        ValueError: If the header is missing or has an unsupported version,
+            or a record names a class that several Dog classes share
+        KeyError: If a record uses a class that has not been defined
+    """
+    header = json.loads(file.readline() or "null")
+    if not isinstance(header, dict) or header.get("format") != "dogs":
+        raise ValueError("not a dog JSON Lines file")
+    if header.get("version") != DOG_FILE_VERSION:
+        raise ValueError(f"unsupported dog file version {header.get('version')}")
+    known_types = _dog_types()
+    height_intervals = {}
+    life_span_intervals = {}
+    for line in file:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        values = tuple(record.get(name) for name in DOG_FIELDS)
+        # Intervals are parsed once per distinct string rather than once per dog
+        height_range, life_span = values[1], values[2]
+        height_interval = height_intervals.get(height_range)
+        if height_interval is None:
+            height_interval = height_intervals[height_range] = \
+                parse_range(height_range, LENGTH_UNITS, "inches")
+        life_span_interval = life_span_intervals.get(life_span)
+        if life_span_interval is None:
+            life_span_interval = life_span_intervals[life_span] = \
+                parse_range(life_span, TIME_UNITS, "years")
+        yield _restore_dog(_resolve_dog_type(known_types, record["type"]), values,
+                           (height_interval, life_span_interval))
+
+
+# A behavior in the kennel simulation: how many ticks it lasts and how it
+# changes the dog's energy and hunger (both kept between 0 and 100)
+SimulatedBehavior = collections.namedtuple("SimulatedBehavior",
+                                           ["name", "duration", "energy", "hunger"])
+
+SIMULATED_BEHAVIORS = (
+    SimulatedBehavior("eat", 2, 5.0, -60.0),
+    SimulatedBehavior("sleep", 8, 60.0, 10.0),
+    SimulatedBehavior("swim", 4, -25.0, 20.0),
+    SimulatedBehavior("pull_sled", 6, -35.0, 25.0),
+    SimulatedBehavior("search_rescue", 5, -30.0, 20.0),
+    SimulatedBehavior("bark", 3, -5.0, 6.0),
+)
+
+# Behaviors a dog chooses when it is neither hungry nor tired; a class
+# that has none of them barks instead
+_ACTIVITIES = ("swim", "pull_sled", "search_rescue")
+_HUNGRY = 70.0
+_TIRED = 30.0
+
+
+class KennelSimulation:
+    """
+    Time-stepped simulation of a large kennel.
+    
+    Dog state (energy, hunger and current behavior) lives in per-dog
+    arrays rather than on the dog objects. Each dog is only stepped when
+    its current behavior ends: a calendar event queue maps every future
+    tick to the array of dogs due then, so a tick touches only the dogs
+    whose behavior finishes on it. Due dogs choose their next behavior
+    and are then stepped in batches, one batch per behavior, with each
+    behavior method resolved once per class. Dogs can join a running
+    simulation through add_dog().
+    
+    Example:
+        >>> simulation = KennelSimulation(dogs)
+        >>> report = simulation.run(100)
+        >>> report["ticks per second"]
+    """
+    
+    def __init__(self, dogs, behaviors=SIMULATED_BEHAVIORS, message_log_size=0):
+        """
+        Initialize the simulation.
+        
+        Args:
+            dogs (iterable): Dog objects to simulate
+            behaviors (tuple): SimulatedBehavior entries; must include
+                "eat", "sleep" and "bark"
+            message_log_size (int): Number of recent behavior messages to keep
+                in self.messages (0 discards them)
+        """
+        self.dogs = list(dogs)
+        self.behaviors = tuple(behaviors)
+        self.tick = 0
+        self._codes = {behavior.name: code for code, behavior in enumerate(self.behaviors)}
+        self._eat, self._sleep, self._bark = (self._codes["eat"], self._codes["sleep"],
+                                              self._codes["bark"])
+        
+        # Per-dog state, indexed like self.dogs, with a repeatable spread of starting values
+        count = len(self.dogs)
+        self.energy = array.array("d", (100.0 - (i * 37) % 50 for i in range(count)))
+        self.hunger = array.array("d", (float((i * 53) % 50) for i in range(count)))
+        self.activity = array.array("B", bytes(count))
+        self._tags = array.array("H", (dog.type_tag for dog in self.dogs))
+        
+        # Per-class tables indexed by type tag: the activities each class can
+        # choose from and each behavior's method (resolved once per class).
+        # add_dog() extends them when a dog of a class defined later joins
+        self._choices = []
+        self._methods = [[] for _ in self.behaviors]
+        self._add_class_tables()
+        
+        # Event queue: tick -> dogs whose current behavior ends on that tick.
+        # Starting decisions are spread over the first few ticks
+        self._schedule = {}
+        for start in range(8):
+            self._schedule[start] = array.array("L", range(start, count, 8))
+        
+        self.messages = collections.deque(maxlen=message_log_size) if message_log_size else None
+        self.action_counts = [0] * len(self.behaviors)
+        self.behavior_seconds = [0.0] * len(self.behaviors)
+        self.decision_seconds = 0.0
+    
+    def __len__(self):
+        """Returns the number of dogs in the simulation."""
+        return len(self.dogs)
+    
+    def add_dog(self, dog):
+        """
+        Add a dog to the simulation; it chooses its first behavior on the next tick.
+        
+        Args:
+            dog (Dog): The dog to add, of any Dog class including ones
+                defined after the simulation was created
+        
+        Returns:
+            int: The dog's index in self.dogs and the per-dog arrays
+        """
+        i = len(self.dogs)
+        if dog.type_tag >= len(self._choices):
+            self._add_class_tables()
+        self.dogs.append(dog)
+        self.energy.append(100.0 - (i * 37) % 50)
+        self.hunger.append(float((i * 53) % 50))
+        self.activity.append(0)
+        self._tags.append(dog.type_tag)
+        queued = self._schedule.get(self.tick)
+        if queued is None:
+            self._schedule[self.tick] = array.array("L", [i])
+        else:
+            queued.append(i)
+        return i
+    
+    def _add_class_tables(self):
+        """Extends the per-class tables to every Dog class defined so far."""
+        codes = self._codes
+        for dog_type in Dog.registered_types()[len(self._choices):]:
+            choices = tuple(codes[name] for name in _ACTIVITIES
+                            if name in codes and hasattr(dog_type, name))
+            self._choices.append(choices or (self._bark,))
+            for code, behavior in enumerate(self.behaviors):
+                self._methods[code].append(getattr(dog_type, behavior.name, None))
+    
+    def _choose(self, due, tick):
+        """Returns one array of due dogs per behavior code, by each dog's next behavior."""
+        energy, hunger, tags, choices = self.energy, self.hunger, self._tags, self._choices
+        eat, sleep = self._eat, self._sleep
+        chosen = [array.array("L") for _ in self.behaviors]
+        appends = [indices.append for indices in chosen]
+        for i in due:
+            if hunger[i] >= _HUNGRY:
+                appends[eat](i)
+            elif energy[i] <= _TIRED:
+                appends[sleep](i)
+            else:
+                # A cheap, repeatable pseudo-random pick among the class's activities
+                options = choices[tags[i]]
+                appends[options[((i + tick) * 2654435761 >> 16) % len(options)]](i)
+        return chosen
+    
+    def _run_behavior(self, code, indices, tick):
+        """Steps a batch of dogs through one behavior and schedules their next decision."""
+        behavior = self.behaviors[code]
+        methods = self._methods[code]
+        dogs, tags, energy, hunger, activity = (self.dogs, self._tags, self.energy,
+                                                self.hunger, self.activity)
+        energy_change, hunger_change = behavior.energy, behavior.hunger
+        messages = self.messages
+        for i in indices:
+            message = methods[tags[i]](dogs[i])
+            if messages is not None:
+                messages.append((tick, i, message))
+            value = energy[i] + energy_change
+            energy[i] = 100.0 if value > 100.0 else 0.0 if value < 0.0 else value
+            value = hunger[i] + hunger_change
+            hunger[i] = 100.0 if value > 100.0 else 0.0 if value < 0.0 else value
+            activity[i] = code
+        
+        # Every dog in the batch finishes at the same tick, so they are queued together
+        end = tick + behavior.duration
+        queued = self._schedule.get(end)
+        if queued is None:
+            self._schedule[end] = indices
+        else:
+            queued.extend(indices)
+    
+    def step(self):
+        """
+        Advance the simulation by one tick.
+        
+        Returns:
+            int: Number of dogs that started a new behavior on this tick
+        """
+        tick = self.tick
+        due = self._schedule.pop(tick, None)
+        self.tick += 1
+        if not due:
+            return 0
+        
+        start = time.perf_counter()
+        chosen = self._choose(due, tick)
+        self.decision_seconds += time.perf_counter() - start
+        
+        for code, indices in enumerate(chosen):
+            if indices:
+                start = time.perf_counter()
+                self._run_behavior(code, indices, tick)
+                self.behavior_seconds[code] += time.perf_counter() - start
+                self.action_counts[code] += len(indices)
+        return len(due)
+    
+    def run(self, ticks):
+        """
+        Advance the simulation by a number of ticks.
+        
+        Args:
+            ticks (int): Number of ticks to run
+        
+        Returns:
+            dict: The report() for this run
+        """
+        start = time.perf_counter()
+        for _ in range(ticks):
+            self.step()
+        return self.report(ticks, time.perf_counter() - start)
+    
+    def report(self, ticks, seconds):
+        """
+        Summarize a run.
+        
+        Args:
+            ticks (int): Number of ticks that were run
+            seconds (float): Wall-clock time they took
+        
+        Returns:
+            dict: Dogs, ticks, seconds, ticks per second, and per-behavior
+            action counts and seconds
+        """
+        return {"dogs": len(self), "ticks": ticks, "seconds": seconds,
+                "ticks per second": ticks / seconds if seconds else float("inf"),
+                "decision seconds": self.decision_seconds,
+                "actions": {behavior.name: count for behavior, count
+                            in zip(self.behaviors, self.action_counts)},
+                "behavior seconds": {behavior.name: seconds for behavior, seconds
+                                     in zip(self.behaviors, self.behavior_seconds)}}
+
+
+def _simulate_shard(task):
+    """
+    Run a simulation of one shard of dogs; this is the unit of work sent to each worker process.
+    
+    Args:
+        task (tuple): (list of dogs, number of ticks)
+    
+    Returns:
+        dict: The shard's KennelSimulation report
+    """
+    dogs, ticks = task
+    return KennelSimulation(dogs).run(ticks)
+
+
+def run_sharded_simulation(dogs, ticks, shards=None):
+    """
+    Simulate a kennel split into shards that run in separate processes.
+    
+    The dogs do not interact, so each shard runs all of its ticks
+    independently and the reports are merged at the end.
+    
+    Args:
+        dogs (list): Dog objects to simulate
+        ticks (int): Number of ticks to run
+        shards (int): Number of shards and worker processes (default: one
+            per CPU); 1 runs the simulation in the current process
+    
+    Returns:
+        dict: A report like KennelSimulation.report(), with wall-clock time
+        for seconds and behavior seconds summed over the shards
+    """
+    if shards is None:
+        shards = os.cpu_count() or 1
+    if shards == 1:
+        return KennelSimulation(dogs).run(ticks)
+    
+    shard_size = -(-len(dogs) // shards)
+    tasks = [(dogs[start:start + shard_size], ticks) for start in range(0, len(dogs), shard_size)]
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=shards) as executor:
+        reports = list(executor.map(_simulate_shard, tasks))
+    seconds = time.perf_counter() - start
+    
+    merged = {"dogs": len(dogs), "ticks": ticks, "seconds": seconds,
+              "ticks per second": ticks / seconds if seconds else float("inf"),
+              "decision seconds": sum(report["decision seconds"] for report in reports),
+              "actions": collections.Counter(), "behavior seconds": collections.Counter()}
+    for report in reports:
+        merged["actions"].update(report["actions"])
+        merged["behavior seconds"].update(report["behavior seconds"])
+    merged["actions"] = dict(merged["actions"])
+    merged["behavior seconds"] = dict(merged["behavior seconds"])
+    return merged
+
+
+def _scaled(value, scale, bits):
+    """Returns value * scale rounded into the range of an unsigned field of bits bits."""
+    if value is None:
+        return 0
+    scaled = int(round(value * scale))
+    return 0 if scaled < 0 else min(scaled, (1 << bits) - 1)
+
+
+def _midpoint(interval):
+    """Returns the middle of a (low, high) interval, or None."""
+    return None if interval is None else (interval[0] + interval[1]) / 2
+
+
+# Fields a DogSortKey can pack: name -> (bits, function returning the
+# field's unsigned integer code for a dog). Weights are packed to 0.01 lb,
+# parsed ranges by their midpoint to 0.01 inch or year
+SORT_FIELDS = {
+    "average_weight": (24, lambda dog: _scaled(dog.average_weight, 100, 24)),
+    "height": (16, lambda dog: _scaled(_midpoint(dog.height_interval), 100, 16)),
+    "life_span": (16, lambda dog: _scaled(_midpoint(dog.life_span_interval), 100, 16)),
+    "hunting_ability": (4, lambda dog: HuntingAbility.parse(getattr(dog, "hunting_ability", None))),
+    "strength_level": (4, lambda dog: StrengthLevel.parse(getattr(dog, "strength_level", None))),
+}
+
+
+class DogSortKey:
+    """
+    Packs several dog attributes into one integer that sorts like their tuple.
+    
+    Each field is encoded as an unsigned integer of fixed width and the
+    fields are concatenated, the first field in the most significant bits.
+    Comparing two packed keys is a single integer comparison, with no
+    attribute reads or tuple comparisons. A field name prefixed with "-"
+    is packed in descending order.
+    
+    Example:
+        >>> heaviest_first = DogSortKey("-average_weight", "life_span")
+        >>> sorted(dogs, key=heaviest_first)
+    """
+    
+    def __init__(self, *fields):
+        """
+        Initialize a sort key.
+        
+        Args:
+            *fields: Names from SORT_FIELDS, most significant first
+        
+        Raises:
+            ValueError: If no fields are given or a field is not recognised
+        """
+        if not fields:
+            raise ValueError("DogSortKey needs at least one field")
+        self.fields = fields
+        self.bits = 0
+        self._parts = []
+        for field in reversed(fields):
+            name = field.lstrip("-")
+            if name not in SORT_FIELDS:
+                raise ValueError(f"Cannot sort dogs by {name!r}")
+            bits, encode = SORT_FIELDS[name]
+            descending_mask = (1 << bits) - 1 if field.startswith("-") else 0
+            self._parts.append((self.bits, descending_mask, encode))
+            self.bits += bits
+    
+    def __call__(self, dog):
+        """
+        Compute a dog's packed key.
+        
+        Returns:
+            int: The key; a larger key sorts later
+        """
+        key = 0
+        for shift, descending_mask, encode in self._parts:
+            key |= (encode(dog) ^ descending_mask) << shift
+        return key
+
+
+def top_dogs(dogs, k, *fields):
+    """
+    Find the k highest-ranked dogs without sorting them all.
+    
+    Uses a heap of size k, so it takes O(n log k) time.
+    
+    Args:
+        dogs (iterable): Dog objects to rank
+        k (int): Number of dogs to return
+        *fields: Ranking fields from SORT_FIELDS, most significant first
+    
+    Returns:
+        list: The top k dogs, highest first; ties keep their input order
+    
+    Example:
+        >>> top_dogs(dogs, 10, "strength_level", "average_weight")
+    """
+    return heapq.nlargest(k, dogs, key=DogSortKey(*fields))
+
+
+class RankedDogIndex:
+    """
+    Dogs kept in order of a DogSortKey as they are added.
+    
+    Keys are computed once per dog. The keys and dogs are kept sorted in
+    buckets of at most 2 * _BUCKET_SIZE, with the largest key of each bucket
+    in a separate list, so adding or removing a dog is two binary searches
+    and an insert into one small bucket rather than into one list of every
+    dog. A Fenwick tree of the bucket sizes gives a dog's rank in O(log n).
+    Leaderboards never need a full re-sort. Ties rank in the order the dogs
+    were added. A dog whose ranked attributes change must be passed to
+    update().
+    
+    Example:
+        >>> leaderboard = RankedDogIndex("-average_weight", dogs=kennel)
+        >>> leaderboard.add(new_dog)
+        >>> leaderboard.top(3)
+    """
+    
+    # Low bits of every stored key hold a sequence number that breaks ties
+    _SEQUENCE_BITS = 32
+    _BUCKET_SIZE = 512
+    
+    def __init__(self, *fields, dogs=()):
+        """
+        Initialize the index.
+        
+        Args:
+            *fields: Ranking fields from SORT_FIELDS, most significant first
+            dogs (iterable): Dogs to add initially
+        """
+        self.sort_key = DogSortKey(*fields)
+        self._key_buckets = []
+        self._dog_buckets = []
+        self._maxes = []
+        self._sizes = []
+        self._key_of = {}
+        self._sequence = itertools.count()
+        self.extend(dogs)
+    
+    def __len__(self):
+        """Returns the number of dogs in the index."""
+        return len(self._key_of)
+    
+    def __iter__(self):
+        """Yields the dogs from highest to lowest rank."""
+        return itertools.chain.from_iterable(map(reversed, reversed(self._dog_buckets)))
+    
+    def _key(self, dog):
+        """Returns a dog's stored key: its packed key plus a tie-breaking sequence number."""
+        # Earlier dogs get larger tie-breakers so that they rank first
+        sequence = (1 << self._SEQUENCE_BITS) - 1 - next(self._sequence)
+        return (self.sort_key(dog) << self._SEQUENCE_BITS) | sequence
+    
+    def _rebuild_sizes(self):
+        """Rebuilds the Fenwick tree of bucket sizes after buckets are split or dropped."""
+        sizes = [len(bucket) for bucket in self._key_buckets]
+        for bucket in range(len(sizes)):
+            parent = bucket | (bucket + 1)
+            if parent < len(sizes):
+                sizes[parent] += sizes[bucket]
+        self._sizes = sizes
+    
+    def _resize(self, bucket, change):
+        """Adds change to one bucket's size in the Fenwick tree."""
+        sizes = self._sizes
+        while bucket < len(sizes):
+            sizes[bucket] += change
+            bucket |= bucket + 1
+    
+    def _offset(self, bucket):
+        """Returns the number of dogs in the buckets before the given one."""
+        sizes = self._sizes
+        total = 0
+        bucket -= 1
+        while bucket >= 0:
+            total += sizes[bucket]
+            bucket = (bucket & (bucket + 1)) - 1
+        return total
+    
+    def _set_sorted(self, keys, dogs):
+        """Replaces the contents with sorted keys and dogs, cut into full buckets."""
+        size = self._BUCKET_SIZE
+        self._key_buckets = [keys[start:start + size] for start in range(0, len(keys), size)]
+        self._dog_buckets = [dogs[start:start + size] for start in range(0, len(dogs), size)]
+        self._maxes = [bucket[-1] for bucket in self._key_buckets]
+        self._rebuild_sizes()
+    
+    def add(self, dog):
+        """
+        Add a dog in its ranked position.
+        
+        Raises:
+            ValueError: If the dog is already in the index
+        """
+        if id(dog) in self._key_of:
+            raise ValueError("dog is already in the index")
+        key = self._key_of[id(dog)] = self._key(dog)
+        if not self._maxes:
+            self._set_sorted([key], [dog])
+            return
+        # Keys above every bucket's maximum go at the end of the last bucket
+        bucket = min(bisect.bisect_left(self._maxes, key), len(self._maxes) - 1)
+        keys, dogs = self._key_buckets[bucket], self._dog_buckets[bucket]
+        position = bisect.bisect(keys, key)
+        keys.insert(position, key)
+        dogs.insert(position, dog)
+        self._maxes[bucket] = keys[-1]
+        if len(keys) > 2 * self._BUCKET_SIZE:
+            half = len(keys) // 2
+            self._key_buckets[bucket:bucket + 1] = [keys[:half], keys[half:]]
+            self._dog_buckets[bucket:bucket + 1] = [dogs[:half], dogs[half:]]
+            self._maxes[bucket:bucket + 1] = [keys[half - 1], keys[-1]]
+            self._rebuild_sizes()
+        else:
+            self._resize(bucket, 1)
+    
+    def extend(self, dogs):
+        """
+        Add many dogs.
+        
+        Small batches are inserted one by one; a batch larger than the
+        index is merged with a single sort instead.
+        """
+        dogs = list(dogs)
+        if len(dogs) <= len(self):
+            for dog in dogs:
+                self.add(dog)
+            return
+        if any(id(dog) in self._key_of for dog in dogs) or len({id(dog) for dog in dogs}) < len(dogs):
+            raise ValueError("dog is already in the index")
+        keys = [self._key(dog) for dog in dogs]
+        self._key_of.update(zip(map(id, dogs), keys))
+        pairs = sorted(zip(itertools.chain(itertools.chain.from_iterable(self._key_buckets), keys),
+                           itertools.chain(itertools.chain.from_iterable(self._dog_buckets), dogs)),
+                       key=operator.itemgetter(0))
+        self._set_sorted([key for key, _ in pairs], [dog for _, dog in pairs])
+    
+    def _locate(self, dog):
+        """Returns the bucket and position within it of a dog."""
+        key = self._key_of[id(dog)]
+        bucket = bisect.bisect_left(self._maxes, key)
+        return bucket, bisect.bisect_left(self._key_buckets[bucket], key)
+    
+    def remove(self, dog):
+        """
+        Remove a dog.
+        
+        Raises:
+            KeyError: If the dog is not in the index
+        """
+        bucket, position = self._locate(dog)
+        del self._key_of[id(dog)]
+        keys, dogs = self._key_buckets[bucket], self._dog_buckets[bucket]
+        del keys[position]
+        del dogs[position]
+        if keys:
+            self._maxes[bucket] = keys[-1]
+            self._resize(bucket, -1)
+        else:
+            del self._key_buckets[bucket]
+            del self._dog_buckets[bucket]
+            del self._maxes[bucket]
+            self._rebuild_sizes()
+    
+    def update(self, dog):
+        """Re-rank a dog after its ranked attributes have changed."""
+        self.remove(dog)
+        self.add(dog)
+    
+    def rank(self, dog):
+        """
+        Get a dog's rank.
+        
+        Returns:
+            int: 0 for the highest-ranked dog
+        
+        Raises:
+            KeyError: If the dog is not in the index
+        """
+        bucket, position = self._locate(dog)
+        return len(self) - 1 - self._offset(bucket) - position
+    
+    def top(self, k):
+        """Returns the k highest-ranked dogs, highest first."""
+        return list(itertools.islice(self, max(k, 0)))
+    
+    def bottom(self, k):
+        """Returns the k lowest-ranked dogs, lowest first."""
+        return list(itertools.islice(itertools.chain.from_iterable(self._dog_buckets), max(k, 0)))
+
+
+# Attributes stored by DogRegistry. average_weight is kept as a float array;
+# the others are dictionary-encoded: each distinct value is stored once and
+# every row holds a small integer code. Attributes a dog type does not have
+# are stored as None.
+NUMERIC_ATTRIBUTES = ("average_weight",)
+CATEGORICAL_ATTRIBUTES = ("height_range", "life_span", "color", "hunting_ability",
+                          "water_resistance", "work_type", "strength_level")
+
+# Range attributes indexed by DogRegistry, mapped to their parsed form
+INTERVAL_ATTRIBUTES = {"height_range": "height_interval", "life_span": "life_span_interval"}
+
+# Comparison operators accepted by DogRegistry.select()
+_OPERATORS = {
+    "==": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le,
+    ">": operator.gt, ">=": operator.ge,
+    "in": lambda value, options: value in options,
+}
+
+# For a numeric column x and a constant v, "x OP v" is evaluated as the
+# reflected comparison method of v, so that map() runs it in C
+_REFLECTED_METHODS = {"==": "__eq__", "!=": "__ne__", "<": "__gt__",
+                      "<=": "__ge__", ">": "__lt__", ">=": "__le__"}
+
+
+class _CategoricalColumn:
+    """
+    Dictionary-encoded column: distinct values plus an array of codes.
+    
+    Codes are single bytes while the column has at most 256 distinct
+    values, which lets masks be built with bytes.translate().
+    
+    Attributes:
+        values (list): Distinct values, indexed by code
+        codes (array): Code of the value in each row
+    """
+    
+    def __init__(self):
+        """Initialize an empty column."""
+        self.values = []
+        self._code_of = {}
+        self.codes = array.array("B")
+    
+    def append(self, value):
+        """Adds a value to the end of the column."""
+        code = self._code_of.get(value)
+        if code is None:
+            code = self._code_of[value] = len(self.values)
+            self.values.append(value)
+            if code == 256:
+                self.codes = array.array("I", self.codes)
+        self.codes.append(code)
+    
+    def __getitem__(self, row):
+        """Returns the value stored in a row."""
+        return self.values[self.codes[row]]
+    
+    def mask(self, op, operand):
+        """
+        Evaluate a comparison over the whole column.
+        
+        The comparison is run once per distinct value; rows are then matched
+        by code with a C-level membership test.
+        
+        Returns:
+            bytearray: 1 for each row that matches, 0 otherwise
+        """
+        compare = _OPERATORS[op]
+        matching = set()
+        for code, value in enumerate(self.values):
+            if value is None:
+                continue
+            try:
+                if compare(value, operand):
+                    matching.add(code)
+            except TypeError:
+                pass
+        return _code_mask(self.codes, matching)
+
+
+def _code_mask(codes, matching):
+    """
+    Build a 0/1 byte mask marking the rows whose code is in matching.
+    
+    Args:
+        codes (array): Per-row codes
+        matching (set): Codes to mark
+    
+    Returns:
+        bytearray: 1 for each row whose code is in matching, 0 otherwise
+    """
+    if codes.typecode == "B":
+        table = bytes(code in matching for code in range(256))
+        return bytearray(codes).translate(table)
+    return bytearray(map(frozenset(matching).__contains__, codes))
+
+
+def _and_masks(first, second):
+    """Returns the element-wise AND of two 0/1 byte masks of equal length."""
+    combined = int.from_bytes(first, "little") & int.from_bytes(second, "little")
+    return bytearray(combined.to_bytes(len(first), "little"))
+
+
+class _IntervalNode:
+    """
+    Node of a centered interval tree.
+    
+    The node holds every interval that contains its center point, sorted
+    once by low end and once by high end; intervals entirely to the left
+    or right of the center go to the child nodes.
+    """
+    
+    def __init__(self, intervals):
+        """
+        Build the subtree for a non-empty list of (low, high, row) intervals.
+        
+        Args:
+            intervals (list): Intervals sorted by low end
+        """
+        self.center = intervals[len(intervals) // 2][0]
+        left, here, right = [], [], []
+        for interval in intervals:
+            if interval[1] < self.center:
+                left.append(interval)
+            elif interval[0] > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        self.by_low = here
+        self.by_high = sorted(here, key=operator.itemgetter(1), reverse=True)
+        self.lows = [low for low, _, _ in self.by_low]
+        self.negated_highs = [-high for _, high, _ in self.by_high]
+        self.left = _IntervalNode(left) if left else None
+        self.right = _IntervalNode(right) if right else None
+    
+    def stab(self, point, found):
+        """Appends to found every interval in the subtree that contains point."""
+        node = self
+        while node is not None:
+            if point < node.center:
+                found.extend(node.by_low[:bisect.bisect_right(node.lows, point)])
+                node = node.left
+            elif point > node.center:
+                found.extend(node.by_high[:bisect.bisect_right(node.negated_highs, -point)])
+                node = node.right
+            else:
+                found.extend(node.by_low)
+                return
+
+
+class IntervalIndex:
+    """
+    Index of numeric (low, high) intervals for overlap and containment queries.
+    
+    The intervals are kept in a few sorted runs, each with its own centered
+    interval tree for point queries ("which intervals contain 23?") and a
+    bisectable list of low ends for range queries. Each run is at least
+    twice the size of the next, so there are at most log2(n) + 1 runs and
+    every query takes O(log^2 n + k) for k results. New intervals are
+    buffered until the next query, which sorts them into a run of their own
+    and merges it with any earlier runs less than twice its size, as in a
+    binary counter. Each interval is merged O(log n) times, so adding dogs
+    one at a time between queries costs O(log^2 n) each, amortized, rather
+    than a rebuild of the whole index.
+    
+    Methods:
+        add(low, high, row): Adds an interval
+        containing(point): Rows whose interval contains a point
+        overlapping(low, high): Rows whose interval overlaps a range
+        within(low, high): Rows whose interval lies entirely inside a range
+        covering(low, high): Rows whose interval contains an entire range
+    """
+    
+    def __init__(self):
+        """Initialize an empty index."""
+        # (intervals sorted by low end, their low ends, interval tree),
+        # largest run first
+        self._runs = []
+        self._pending = []
+    
+    def add(self, low, high, row):
+        """Adds the interval [low, high] for a row."""
+        self._pending.append((low, high, row))
+    
+    def __len__(self):
+        """Returns the number of intervals in the index."""
+        return sum(len(intervals) for intervals, _, _ in self._runs) + len(self._pending)
+    
+    def _build(self):
+        """Turns the buffered intervals into a run, merging it with smaller runs."""
+        if not self._pending:
+            return
+        intervals = sorted(self._pending)
+        self._pending = []
+        while self._runs and len(self._runs[-1][0]) < 2 * len(intervals):
+            # Both lists are sorted, so sorting their concatenation is a merge
+            intervals = sorted(self._runs.pop()[0] + intervals)
+        self._runs.append((intervals, [low for low, _, _ in intervals], _IntervalNode(intervals)))
+    
+    def _stab(self, point):
+        """Returns the (low, high, row) intervals that contain point."""
+        self._build()
+        found = []
+        for _, _, tree in self._runs:
+            tree.stab(point, found)
+        return found
+    
+    def containing(self, point):
+        """Returns a list of the rows whose interval contains point."""
+        return [row for _, _, row in self._stab(point)]
+    
+    def overlapping(self, low, high):
+        """Returns a list of the rows whose interval shares any point with [low, high]."""
+        # Overlapping intervals either contain low or start inside (low, high]
+        rows = self.containing(low)
+        for intervals, lows, _ in self._runs:
+            start = bisect.bisect_right(lows, low)
+            end = bisect.bisect_right(lows, high)
+            rows.extend(row for _, _, row in intervals[start:end])
+        return rows
+    
+    def within(self, low, high):
+        """Returns a list of the rows whose interval lies entirely inside [low, high]."""
+        self._build()
+        rows = []
+        for intervals, lows, _ in self._runs:
+            start = bisect.bisect_left(lows, low)
+            end = bisect.bisect_right(lows, high)
+            rows.extend(row for _, interval_high, row in intervals[start:end] if interval_high <= high)
+        return rows
+    
+    def covering(self, low, high):
+        """Returns a list of the rows whose interval contains all of [low, high]."""
+        return [row for _, interval_high, row in self._stab(low) if interval_high >= high]
+
+
+class DogView:
+    """
+    Lightweight, read-only view of one dog stored in a DogRegistry.
+    
+    Attribute reads (view.color, view.average_weight, ...) go straight to
+    the registry's columns; no Dog object is created unless to_dog() is
+    called.
+    """
+    
+    __slots__ = ("_registry", "_row")
+    
+    def __init__(self, registry, row):
+        """
+        Initialize a view of a single row.
+        
+        Args:
+            registry (DogRegistry): The registry holding the data
+            row (int): Row number within the registry
+        """
+        self._registry = registry
+        self._row = row
+    
+    def __getattr__(self, name):
+        """Reads an attribute from the registry's columns."""
+        # Private names are never columns. copy and pickle probe them on a
+        # view whose slots are not filled in yet, where reading
+        # self._registry would call __getattr__ again without end
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._registry._value(name, self._row)
+    
+    @property
+    def row(self):
+        """Row number of this dog in the registry."""
+        return self._row
+    
+    @property
+    def dog_type(self):
+        """The class (Dog, SportingDog, WorkingDog, ...) of this dog."""
+        return self._registry._types[self._registry._type_codes[self._row]]
+    
+    def to_dog(self):
+        """Creates a regular Dog (or subclass) object from this row."""
+        return self._registry.to_dog(self._row)
+    
+    def __repr__(self):
+        """Returns a short description of the view."""
+        return f"DogView(row={self._row}, type={self.dog_type.__name__})"
+
+
+class DogSelection:
+    """
+    Result of a DogRegistry query: an array of row numbers.
+    
+    Iterating yields DogView objects; column() reads a single attribute
+    for every selected dog without creating views.
+    """
+    
+    def __init__(self, registry, rows):
+        """
+        Initialize a selection.
+        
+        Args:
+            registry (DogRegistry): The registry the rows belong to
+            rows (array): Selected row numbers, in ascending order
+        """
+        self._registry = registry
+        self.rows = rows
+    
+    def __len__(self):
+        """Returns the number of selected dogs."""
+        return len(self.rows)
+    
+    def __iter__(self):
+        """Yields a DogView for each selected dog."""
+        for row in self.rows:
+            yield DogView(self._registry, row)
+    
+    def __getitem__(self, position):
+        """Returns a DogView for the dog at a position in the selection."""
+        return DogView(self._registry, self.rows[position])
+    
+    def column(self, name):
+        """Returns a list with the value of one attribute for each selected dog."""
+        return [self._registry._value(name, row) for row in self.rows]
+    
+    def to_dogs(self):
+        """Creates regular Dog objects for every selected dog."""
+        return [self._registry.to_dog(row) for row in self.rows]
+
+
+class DogRegistry:
+    """
+    Columnar storage for a large number of dogs.
+    
+    Instead of one object per dog, the registry keeps one compact array per
+    attribute. Queries run column-at-a-time: each condition produces a 0/1
+    byte mask over all rows (built in C with bytes.translate() or map()),
+    masks are combined with big-integer AND, and the result is a
+    DogSelection of row numbers rather than a list of objects.
+    
+    Example:
+        >>> registry.select(WorkingDog, average_weight=(">", 70),
+        ...                 strength_level="very strong")
+    
+    Methods:
+        add(dog): Stores a dog and returns its row number
+        extend(dogs): Stores many dogs
+        select(dog_type, **conditions): Returns the dogs matching all conditions
+        overlapping(name, low, high): Returns dogs whose height or life span overlaps a range
+        within(name, low, high): Returns dogs whose height or life span lies inside a range
+        covering(name, low, high): Returns dogs whose height or life span contains a range
+        to_dog(row): Creates a regular Dog object for a row
+    """
+    
+    def __init__(self, dogs=()):
+        """
+        Initialize the registry, optionally with some dogs.
+        
+        Args:
+            dogs (iterable): Dog objects to store
+        """
+        self._types = []
+        self._type_code_of = {}
+        self._type_codes = array.array("B")
+        self._numeric = {name: array.array("d") for name in NUMERIC_ATTRIBUTES}
+        self._categorical = {name: _CategoricalColumn() for name in CATEGORICAL_ATTRIBUTES}
+        self._interval_indexes = {name: IntervalIndex() for name in INTERVAL_ATTRIBUTES}
+        self.extend(dogs)
+    
+    def add(self, dog):
+        """
+        Stores a dog.
+        
+        Args:
+            dog (Dog): A Dog, SportingDog, WorkingDog or other Dog subclass
+        
+        Returns:
+            int: The row number of the dog
+        """
+        dog_type = type(dog)
+        type_code = self._type_code_of.get(dog_type)
+        if type_code is None:
+            type_code = self._type_code_of[dog_type] = len(self._types)
+            self._types.append(dog_type)
+        self._type_codes.append(type_code)
+        for name, column in self._numeric.items():
+            column.append(float(getattr(dog, name)))
+        for name, column in self._categorical.items():
+            column.append(getattr(dog, name, None))
+        row = len(self) - 1
+        for name, index in self._interval_indexes.items():
+            interval = getattr(dog, INTERVAL_ATTRIBUTES[name])
+            if interval is not None:
+                index.add(interval[0], interval[1], row)
+        return row
+    
+    def extend(self, dogs):
+        """Stores every dog in an iterable."""
+        for dog in dogs:
+            self.add(dog)
+    
+    def __len__(self):
+        """Returns the number of dogs in the registry."""
+        return len(self._type_codes)
+    
+    def __getitem__(self, row):
+        """Returns a DogView of a row."""
+        if not 0 <= row < len(self):
+            raise IndexError("Row out of range")
+        return DogView(self, row)
+    
+    def _value(self, name, row):
+        """Returns the value of one attribute in one row."""
+        if name in self._numeric:
+            return self._numeric[name][row]
+        if name in self._categorical:
+            return self._categorical[name][row]
+        raise AttributeError(name)
+    
+    def to_dog(self, row):
+        """
+        Creates a regular object of the dog's original class for a row.
+        
+        Returns:
+            Dog: A new Dog, SportingDog or WorkingDog object
+        """
+        dog_type = self._types[self._type_codes[row]]
+        dog = dog_type.__new__(dog_type)
+        for name in NUMERIC_ATTRIBUTES + CATEGORICAL_ATTRIBUTES:
+            value = self._value(name, row)
+            if name in self._categorical and value is None:
+                continue
+            if name == "average_weight" and value.is_integer():
+                value = int(value)
+            setattr(dog, name, value)
+        return dog
+    
+    def _type_mask(self, dog_type):
+        """Returns a mask of the rows whose class is dog_type or a subclass of it."""
+        codes = {code for code, stored_type in enumerate(self._types)
+                 if issubclass(stored_type, dog_type)}
+        return _code_mask(self._type_codes, codes)
+    
+    def _condition_mask(self, name, condition):
+        """Returns the mask for one keyword condition passed to select()."""
+        op, operand = condition if isinstance(condition, tuple) else ("==", condition)
+        if op not in _OPERATORS:
+            raise ValueError(f"Unknown operator: {op!r}")
+        if name in self._categorical:
+            return self._categorical[name].mask(op, operand)
+        if name not in self._numeric:
+            raise ValueError(f"Unknown attribute: {name!r}")
+        column = self._numeric[name]
+        if op == "in":
+            return bytearray(map(frozenset(map(float, operand)).__contains__, column))
+        method = getattr(float(operand), _REFLECTED_METHODS[op])
+        return bytearray(map(method, column))
+    
+    def _interval_index(self, name):
+        """Returns the interval index for "height_range" or "life_span"."""
+        if name not in self._interval_indexes:
+            raise ValueError(f"No interval index for {name!r}")
+        return self._interval_indexes[name]
+    
+    def _selection(self, rows):
+        """Returns a DogSelection of rows in ascending order."""
+        return DogSelection(self, array.array("L", sorted(rows)))
+    
+    def overlapping(self, name, low, high=None):
+        """
+        Select dogs whose parsed range overlaps [low, high].
+        
+        With high omitted this answers point queries such as "dogs that can
+        be 23 inches tall": registry.overlapping("height_range", 23).
+        
+        Args:
+            name (str): "height_range" (inches) or "life_span" (years)
+            low (float): Start of the query range
+            high (float): End of the query range (default: same as low)
+        
+        Returns:
+            DogSelection: The matching dogs
+        """
+        index = self._interval_index(name)
+        if high is None or high == low:
+            return self._selection(index.containing(low))
+        return self._selection(index.overlapping(low, high))
+    
+    def within(self, name, low, high):
+        """Select dogs whose parsed range lies entirely inside [low, high]."""
+        return self._selection(self._interval_index(name).within(low, high))
+    
+    def covering(self, name, low, high):
+        """Select dogs whose parsed range contains all of [low, high]."""
+        return self._selection(self._interval_index(name).covering(low, high))
+    
+    def select(self, dog_type=None, **conditions):
+        """
+        Select the dogs matching every condition.
+        
+        Each keyword names an attribute. Its value is either a value to
+        compare for equality or an (operator, value) tuple, where the
+        operator is one of "==", "!=", "<", "<=", ">", ">=" or "in".
+        
+        Args:
+            dog_type (type): Only include dogs of this class or its subclasses
+            **conditions: Attribute conditions, e.g. average_weight=(">", 70)
+        
+        Returns:
+            DogSelection: The matching rows
+        
+        Raises:
+            ValueError: If an attribute or operator is not recognised
+        """
+        mask = None
+        if dog_type is not None:
+            mask = self._type_mask(dog_type)
+        for name, condition in conditions.items():
+            condition_mask = self._condition_mask(name, condition)
+            mask = condition_mask if mask is None else _and_masks(mask, condition_mask)
+        if mask is None:
+            return DogSelection(self, array.array("L", range(len(self))))
+        return DogSelection(self, array.array("L", itertools.compress(range(len(self)), mask)))
+
+
+def _sample_dogs(count, compact=False):
+    """
+    Build a repeatable mix of synthetic dogs for benchmarks.
+    
+    Args:
+        count (int): Number of dogs to create
+        compact (bool): Create the compact classes instead of the regular ones
+    
+    Returns:
+        list: Dog, SportingDog and WorkingDog objects
+    """
+    colors = ("golden", "black", "yellow", "chocolate", "black and tan", "gray", "white")
+    hunting = ("poor", "fair", "good", "very good", "excellent")
+    work = ("police work", "guarding", "sled pulling", "search and rescue", "herding")
+    strength = ("moderate", "strong", "very strong")
+    dog_type, sporting_type, working_type = ((CompactDog, CompactSportingDog, CompactWorkingDog)
+                                             if compact else (Dog, SportingDog, WorkingDog))
+    dogs = []
+    for i in range(count):
+        weight = 20 + i % 100
+        height = f"{10 + i % 20}-{12 + i % 20} inches"
+        life_span = f"{8 + i % 5}-{11 + i % 5} years"
+        color = colors[i % len(colors)]
+        kind = i % 3
+        if kind == 0:
+            dogs.append(dog_type(weight, height, life_span, color))
+        elif kind == 1:
+            dogs.append(sporting_type(weight, height, life_span, color,
+                                      hunting[i % len(hunting)], i % 2 == 0))
+        else:
+            dogs.append(working_type(weight, height, life_span, color,
+                                     work[i % len(work)], strength[i % len(strength)]))
+    return dogs
+
+
+def measure_memory_per_dog(count=100000):
+    """
+    Compare the memory used per dog by the regular and the compact classes.
+    
+    Args:
+        count (int): Number of synthetic dogs to create of each kind
+    
+    Returns:
+        tuple: (bytes per regular dog, bytes per compact dog)
+    """
+    tracemalloc.start()
+    
+    baseline = tracemalloc.get_traced_memory()[0]
+    dogs = _sample_dogs(count)
+    regular_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    del dogs
+    
+    baseline = tracemalloc.get_traced_memory()[0]
+    dogs = _sample_dogs(count, compact=True)
+    compact_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    del dogs
+    
+    tracemalloc.stop()
+    return regular_bytes / count, compact_bytes / count
+
+
+def benchmark_serialization(count=1000000):
+    """
+    Time saving and loading dogs in the binary and JSON Lines formats.
+    
+    Args:
+        count (int): Number of synthetic dogs
+    
+    Returns:
+        dict: Seconds taken by each step
+    """
+    dogs = _sample_dogs(count)
+    timings = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "kennel.dogs")
+        start = time.perf_counter()
+        save_dogs(dogs, path)
+        timings["binary save (s)"] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        with DogFile(path) as kennel:
+            kennel[len(kennel) // 2]
+        timings["binary open + one lazy read (s)"] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        load_dogs(path)
+        timings["binary load all (s)"] = time.perf_counter() - start
+        
+        jsonl_path = os.path.join(directory, "kennel.jsonl")
+        start = time.perf_counter()
+        with open(jsonl_path, "w", encoding="utf-8") as file:
+            write_dogs_jsonl(dogs, file)
+        timings["JSON Lines save (s)"] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        with open(jsonl_path, encoding="utf-8") as file:
+            list(iter_dogs_jsonl(file))
+        timings["JSON Lines load all (s)"] = time.perf_counter() - start
+    return timings
+
+
+def benchmark_type_dispatch(count=1000000):
+    """
+    Compare routing dogs with an isinstance() chain and with TypeDispatcher.
+    
+    Args:
+        count (int): Number of synthetic dogs
+    
+    Returns:
+        dict: Dogs routed per second by each approach
+    """
+    dogs = _sample_dogs(count)
+    rates = {}
+    
+    start = time.perf_counter()
+    for dog in dogs:
+        if isinstance(dog, SportingDog):
+            route = "sporting"
+        elif isinstance(dog, WorkingDog):
+            route = "working"
+        else:
+            route = "other"
+    rates["isinstance chain (dogs/s)"] = count / (time.perf_counter() - start)
+    
+    table = [("sporting" if issubclass(dog_type, SportingDog) else
+              "working" if issubclass(dog_type, WorkingDog) else "other")
+             for dog_type in Dog.registered_types()]
+    start = time.perf_counter()
+    for dog in dogs:
+        route = table[dog.type_tag]
+    rates["type tag table (dogs/s)"] = count / (time.perf_counter() - start)
+    
+    dispatcher = TypeDispatcher(default=lambda dog: "other")
+    dispatcher.register(SportingDog, lambda dog: "sporting")
+    dispatcher.register(WorkingDog, lambda dog: "working")
+    start = time.perf_counter()
+    for dog in dogs:
+        route = dispatcher(dog)
+    rates["TypeDispatcher call (dogs/s)"] = count / (time.perf_counter() - start)
+    return rates
+
+
+def benchmark_simulation(count=1000000, ticks=16, shards=None):
+    """
+    Run the kennel simulation in one process and sharded across processes.
+    
+    Args:
+        count (int): Number of synthetic dogs
+        ticks (int): Number of ticks to simulate
+        shards (int): Shards for the sharded run (default: one per CPU)
+    
+    Returns:
+        dict: Report of each run, keyed by the kind of run
+    """
+    dogs = _sample_dogs(count)
+    return {"single process": KennelSimulation(dogs).run(ticks),
+            "sharded": run_sharded_simulation(dogs, ticks, shards)}
+
+
+def benchmark_ranking(count=1000000, k=10):
+    """
+    Compare tuple-key sorting with packed keys, heap-based top-k and RankedDogIndex.
+    
+    Args:
+        count (int): Number of synthetic dogs
+        k (int): Size of the leaderboard
+    
+    Returns:
+        dict: Seconds taken by each approach
+    """
+    dogs = _sample_dogs(count)
+    timings = {}
+    
+    start = time.perf_counter()
+    sorted(dogs, key=lambda dog: (StrengthLevel.parse(getattr(dog, "strength_level", None)),
+                                  dog.average_weight, dog.life_span_interval))
+    timings["sort, tuple key (s)"] = time.perf_counter() - start
+    
+    sort_key = DogSortKey("strength_level", "average_weight", "life_span")
+    start = time.perf_counter()
+    sorted(dogs, key=sort_key)
+    timings["sort, packed key (s)"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    top_dogs(dogs, k, "strength_level", "average_weight", "life_span")
+    timings[f"top_dogs, k={k} (s)"] = time.perf_counter() - start
+    
+    index = RankedDogIndex("strength_level", "average_weight", "life_span", dogs=dogs)
+    added = _sample_dogs(1000)
+    start = time.perf_counter()
+    for dog in added:
+        index.add(dog)
+        index.top(k)
+    timings["RankedDogIndex add + top per dog (s/1000)"] = time.perf_counter() - start
+    return timings
+
+
+def benchmark_rendering(count=100000):
+    """
+    Compare per-object get_info() calls with render_info().
+    
+    Args:
+        count (int): Number of synthetic dogs to render
+    
+    Returns:
+        dict: Seconds taken by each approach
+    """
+    dogs = _sample_dogs(count)
+    timings = {}
+    
+    start = time.perf_counter()
+    expected = "\n\n".join([dog.get_info() for dog in dogs])
+    timings["get_info() loop, cold (s)"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    "\n\n".join([dog.get_info() for dog in dogs])
+    timings["get_info() loop, cached (s)"] = time.perf_counter() - start
+    
+    with open(os.devnull, "w") as devnull:
+        start = time.perf_counter()
+        rendered = render_info(dogs, devnull)
+        timings["render_info (s)"] = time.perf_counter() - start
+    if rendered != expected:
+        raise AssertionError("render_info() output differs from get_info()")
+    return timings
+
+
+def benchmark_dispatch(count=1000000, workers=None):
+    """
+    Compare per-object behavior calls with DogBatch, in actions per second.
+    
+    Args:
+        count (int): Number of synthetic dogs
+        workers (int): Worker processes for the pooled run (default: one per CPU)
+    
+    Returns:
+        dict: Actions per second for each approach
+    """
+    dogs = _sample_dogs(count)
+    actions = len(BEHAVIORS) * count
+    rates = {}
+    
+    start = time.perf_counter()
+    for action in BEHAVIORS:
+        results = []
+        for dog in dogs:
+            method = getattr(dog, action, None)
+            results.append(None if method is None else method())
+    rates["per-object calls (actions/s)"] = actions / (time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    batch = DogBatch(dogs)
+    rates["DogBatch grouping (dogs/s)"] = count / (time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    batch.run_all()
+    rates["DogBatch.run_all (actions/s)"] = actions / (time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    batch.run_all(workers=workers)
+    rates["DogBatch.run_all, process pool (actions/s)"] = actions / (time.perf_counter() - start)
+    return rates
+
+
+def run_benchmarks(count=1000000):
+    """
+    Run the performance benchmarks and print their results.
+    
+    Args:
+        count (int): Number of synthetic dogs each benchmark uses
+    """
+    print(f"Dog Benchmarks ({count} dogs):")
+    print("=" * 50)
+    
+    for step, seconds in benchmark_rendering(count // 10).items():
+        print(f"rendering {step}: {seconds:.3f}")
+    for step, rate in benchmark_dispatch(count).items():
+        print(f"dispatch {step}: {rate:,.0f}")
+    for step, rate in benchmark_type_dispatch(count).items():
+        print(f"routing {step}: {rate:,.0f}")
+    for step, seconds in benchmark_serialization(count).items():
+        print(f"serialization {step}: {seconds:.3f}")
+    for step, seconds in benchmark_ranking(count).items():
+        print(f"ranking {step}: {seconds:.3f}")
+    for run, report in benchmark_simulation(count).items():
+        print(f"simulation {run}: {report['ticks per second']:.2f} ticks/s "
+              f"({sum(report['actions'].values()):,} actions in {report['seconds']:.2f} s)")
+        print(f"  decisions: {report['decision seconds']:.2f} s")
+        for behavior, seconds in report["behavior seconds"].items():
+            print(f"  {behavior}: {report['actions'][behavior]:,} actions in {seconds:.2f} s")
+    regular_bytes, compact_bytes = measure_memory_per_dog(count // 10)
+    print(f"memory per regular dog: {regular_bytes:.0f} bytes")
+    print(f"memory per compact dog: {compact_bytes:.0f} bytes")
+
+
+def test_compact_dogs_render_without_a_dict():
+    """Compact dogs give the regular get_info() text without creating an instance __dict__."""
+    regular = SportingDog(65, "21.5-24 inches", "10-12 years", "golden", "excellent")
+    compact = compact_dog(regular)
+    assert compact.get_info() == regular.get_info()
+    assert compact.get_info() is not compact.get_info()
+    assert not any(isinstance(referent, dict) for referent in gc.get_referents(compact))
+    
+    working = compact_dog(WorkingDog(75, "22-26 inches", "9-13 years", "black and tan",
+                                     "police", "very strong"))
+    assert working.get_info() == WorkingDog.get_info.__wrapped__(working)
+    assert not any(isinstance(referent, dict) for referent in gc.get_referents(working))
+
+
+def test_render_info_matches_get_info():
+    """render_info() joins each dog's own get_info(), including subclasses and compact dogs."""
+    class ShowDog(SportingDog):
+        @_cached_info
+        def get_info(self):
+            return f"{super().get_info()}\n  Ribbons: 3"
+    
+    dogs = [Dog(30, "15-18 inches", "12-15 years", "brown"),
+            SportingDog(65, "21.5-24 inches", "10-12 years", "golden", "excellent"),
+            WorkingDog(75, "22-26 inches", "9-13 years", "black", "police", "very strong"),
+            ShowDog(60, "20-22 inches", "10-12 years", "red", "good")]
+    dogs += [compact_dog(dog) for dog in dogs[:3]]
+    buffer = io.StringIO()
+    text = render_info(dogs, buffer, separator="\n--\n")
+    assert text == buffer.getvalue() == "\n--\n".join(dog.get_info() for dog in dogs)
+    assert text.count("Ribbons: 3") == 1
+
+
+def test_type_dispatcher_handles_late_classes():
+    """Dispatch uses the tag table and rebuilds it for classes defined after it was built."""
+    describe = TypeDispatcher()
+    describe.register(Dog, lambda dog: "dog")
+    describe.register(SportingDog, lambda dog, suffix="": "sporting" + suffix)
+    retriever = SportingDog(65, "21.5-24 inches", "10-12 years", "golden", "excellent")
+    assert describe(retriever, suffix="!") == "sporting!"
+    
+    class Retriever(SportingDog):
+        pass
+    
+    late = Retriever(60, "20-22 inches", "10-12 years", "yellow", "good")
+    plain = Dog(30, "15-18 inches", "12-15 years", "brown")
+    assert describe.map([plain, late, retriever]) == ["dog", "sporting", "sporting"]
+    
+    strict = TypeDispatcher()
+    strict.register(WorkingDog, lambda dog: "working")
+    try:
+        strict.map([plain])
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("a dog without a handler was dispatched")
+
+
+def test_interval_index_answers_between_adds():
+    """Queries stay exact in bulk and when intervals are added one at a time between them."""
+    rng = random.Random(15)
+    index = IntervalIndex()
+    intervals = []
+    
+    def check():
+        for _ in range(20):
+            low = rng.uniform(0, 100)
+            high = low + rng.uniform(0, 10)
+            assert sorted(index.containing(low)) == [row for row, (a, b) in enumerate(intervals)
+                                                     if a <= low <= b]
+            assert sorted(index.overlapping(low, high)) == [row for row, (a, b) in enumerate(intervals)
+                                                            if a <= high and b >= low]
+            assert sorted(index.within(low, high)) == [row for row, (a, b) in enumerate(intervals)
+                                                       if low <= a and b <= high]
+            assert sorted(index.covering(low, high)) == [row for row, (a, b) in enumerate(intervals)
+                                                         if a <= low and b >= high]
+    
+    check()
+    for row in range(1000):
+        low = rng.uniform(0, 100)
+        intervals.append((low, low + rng.uniform(0, 20)))
+        index.add(*intervals[-1], row)
+    check()
+    for row in range(1000, 1100):
+        low = rng.uniform(0, 100)
+        intervals.append((low, low + rng.uniform(0, 20)))
+        index.add(*intervals[-1], row)
+        check()
+    assert len(index) == 1100
+    
+    # Shared end points count as overlapping and containing
+    index = IntervalIndex()
+    index.add(1, 2, "a")
+    index.containing(0)
+    index.add(2, 3, "b")
+    assert sorted(index.containing(2)) == ["a", "b"]
+    assert index.overlapping(3, 4) == ["b"]
+    assert index.within(1, 2) == ["a"]
+    assert index.covering(2.5, 3) == ["b"]
+
+
+def test_dog_view_copies_and_pickles():
+    """DogView survives copy and pickle instead of recursing in __getattr__."""
+    registry = DogRegistry([SportingDog(65, "21.5-24 inches", "10-12 years", "golden", "excellent")])
+    view = registry[0]
+    duplicate = copy.copy(view)
+    assert duplicate.color == "golden" and duplicate.row == 0
+    restored = pickle.loads(pickle.dumps(view))
+    assert restored.hunting_ability == "excellent"
+    assert restored.to_dog().get_info() == view.to_dog().get_info()
+    try:
+        view._missing
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("a private name was read from the registry")
+
+
+def test_simulation_adds_dogs_of_late_classes():
+    """add_dog() lets a dog whose class was defined after the simulation started join it."""
+    dogs = [WorkingDog(75, "22-26 inches", "9-13 years", "black", "rescue", "strong")
+            for _ in range(16)]
+    simulation = KennelSimulation(dogs, message_log_size=1000)
+    simulation.run(5)
+    
+    class Lapdog(Dog):
+        def bark(self):
+            return "Yip!"
+    
+    index = simulation.add_dog(Lapdog(8, "8-10 inches", "12-16 years", "white"))
+    assert index == 16 and len(simulation) == 17
+    simulation.step()
+    assert (5, 16, "Yip!") in simulation.messages
+    report = simulation.run(40)
+    assert report["dogs"] == 17
+    assert "This 8 pound dog is taking a nap." in {message for _, dog, message in simulation.messages
+                                                   if dog == 16}
+
+
+def test_dog_batch_groups_by_class_and_keeps_order():
+    """DogBatch results line up with batch.dogs, in process and through a worker pool."""
+    golden = SportingDog(65, "21.5-24 inches", "10-12 years", "golden", "excellent")
+    shepherd = WorkingDog(75, "22-26 inches", "9-13 years", "black", "guarding", "strong")
+    mutt = Dog(30, "15-18 inches", "12-15 years", "brown")
+    dogs = [golden, shepherd, mutt, golden, shepherd]
+    batch = DogBatch(dogs)
+    assert len(batch) == 5
+    assert batch.dogs == [golden, golden, shepherd, shepherd, mutt]
+    assert batch.counts() == {"SportingDog": 2, "WorkingDog": 2, "Dog": 1}
+    assert batch.run("bark") == [dog.bark() for dog in batch.dogs]
+    assert batch.run("hunt") == [golden.hunt(), golden.hunt(), None, None, None]
+    results = batch.run_all(("guard", "sleep"))
+    assert results["guard"] == [None, None, shepherd.guard(), shepherd.guard(), None]
+    assert results["sleep"] == [dog.sleep() for dog in batch.dogs]
+    
+    pooled = DogBatch([golden] * 5 + [mutt])
+    assert pooled.run("eat", workers=2, chunk_size=2) == [dog.eat() for dog in pooled.dogs]
+    assert DogBatch().run("bark") == []
+
+
+def test_dog_files_round_trip():
+    """Binary and JSON Lines dog files give back dogs of the same class and values."""
+    dogs = [SportingDog(65, "21.5-24 inches", "10-12 years", "golden", "excellent"),
+            WorkingDog(75, "22-26 inches", "9-13 years", "black", "guarding", "strong"),
+            Dog(30.5, "15-18 inches", "12-15 years", "brown")]
+    dogs.append(compact_dog(dogs[0]))
+    
+    def check(loaded):
+        assert [type(dog) for dog in loaded] == [type(dog) for dog in dogs]
+        assert [dog.get_info() for dog in loaded] == [dog.get_info() for dog in dogs]
+        assert loaded[1].height_interval == dogs[1].height_interval
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "kennel.dogs")
+        assert save_dogs(dogs, path) == 4
+        check(load_dogs(path))
+        with DogFile(path) as kennel:
+            assert len(kennel) == 4
+            check([kennel[0], kennel[1], kennel[-2], kennel[3]])
+            try:
+                kennel[4]
+            except IndexError:
+                pass
+            else:
+                raise AssertionError("read past the last dog")
+        
+        # A value the table cannot hold is rejected by write(), not close()
+        odd = Dog(30, "15-18 inches", "12-15 years", ["brown", "white"])
+        with DogFileWriter(path) as writer:
+            writer.write(dogs[2])
+            try:
+                writer.write(odd)
+            except TypeError:
+                pass
+            else:
+                raise AssertionError("a list value was written")
+        assert len(load_dogs(path)) == 1
+    
+    buffer = io.StringIO()
+    assert write_dogs_jsonl(dogs, buffer) == 4
+    buffer.seek(0)
+    check(list(iter_dogs_jsonl(buffer)))
+
+
+def test_dog_files_reject_ambiguous_class_names():
+    """A class name shared by two Dog classes is refused instead of loading the wrong class."""
+    def make_class():
+        class Twin(Dog):
+            pass
+        return Twin
+    
+    first = make_class()
+    dog = first(20, "10-12 inches", "12-14 years", "white")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "twins.dogs")
+        save_dogs([dog], path)
+        assert type(load_dogs(path)[0]) is first
+        second = make_class()
+        for action in (lambda: load_dogs(path), lambda: save_dogs([second(20, "10-12 inches", "12-14 years", "white")], path),
+                       lambda: write_dogs_jsonl([dog], io.StringIO())):
+            try:
+                action()
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("an ambiguous class name was accepted")
+
+
+def test_top_dogs_and_ranked_index_match_sorting():
+    """top_dogs() and RankedDogIndex agree with a full stable sort through adds, removes and updates."""
+    class SmallBucketIndex(RankedDogIndex):
+        _BUCKET_SIZE = 4
+    
+    rng = random.Random(22)
+    dogs = _sample_dogs(300)
+    rng.shuffle(dogs)
+    fields = ("strength_level", "-average_weight")
+    sort_key = DogSortKey(*fields)
+    
+    def ranked(members):
+        # Highest key first; ties keep their order in members
+        order = {id(dog): position for position, dog in enumerate(members)}
+        return sorted(members, key=lambda dog: (-sort_key(dog), order[id(dog)]))
+    
+    assert top_dogs(dogs, 10, *fields) == ranked(dogs)[:10]
+    assert top_dogs(dogs, 0, *fields) == []
+    
+    index = SmallBucketIndex(*fields, dogs=dogs[:100])
+    members = dogs[:100]
+    for dog in dogs[100:200]:
+        index.add(dog)
+        members.append(dog)
+    for dog in rng.sample(members, 60):
+        index.remove(dog)
+        members.remove(dog)
+    for dog in rng.sample(members, 20):
+        dog.average_weight = rng.uniform(10, 130)
+        index.update(dog)
+        members.remove(dog)
+        members.append(dog)
+    expected = ranked(members)
+    assert len(index) == len(members) == 140
+    assert list(index) == expected
+    assert index.top(5) == expected[:5] and index.bottom(3) == expected[:-4:-1]
+    assert [index.rank(dog) for dog in expected] == list(range(len(expected)))
+    try:
+        index.add(expected[0])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a dog was added twice")
+    try:
+        index.rank(dogs[250])
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("a dog outside the index was ranked")
+
+
+def run_tests():
+    """
+    Run every test_* function in this module and print the results.
+    
+    Returns:
+        bool: True if every test passed
+    """
+    tests = [(name, function) for name, function in globals().items()
+             if name.startswith("test_") and callable(function)]
+    failures = 0
+    for name, function in tests:
+        try:
+            function()
+        except Exception as error:
+            failures += 1
+            print(f"FAIL {name}: {type(error).__name__}: {error}")
+        else:
+            print(f"ok   {name}")
+    print(f"{len(tests) - failures} of {len(tests)} tests passed")
+    return failures == 0
+
+
+def main():
+    """
+    Main function to demonstrate the Dog classes and their functionality.
+    
+    Creates instances of each dog class and demonstrates their
+    attributes, methods, and inheritance relationships.
+    """
+    print("Dog Classes Demonstration")
+    print("=" * 50)
+    
+    # Create instances of each dog class
+    print("1. Creating a Sporting Dog (Golden Retriever):")
+    golden_retriever = SportingDog(
+        average_weight=65,
+        height_range="21.5-24 inches",
+        life_span="10-12 years",
+        color="golden",
+        hunting_ability="excellent",
+        water_resistance=True
+    )
+    
+    print("2. Creating a Working Dog (German Shepherd):")
+    german_shepherd = WorkingDog(
+        average_weight=75,
+        height_range="22-26 inches",
+        life_span="7-10 years",
+        color="black and tan",
+        work_type="police work",
+        strength_level="very strong"
+    )
+    
+    # Demonstrate basic Dog methods (inherited by all)
+    print("\n3. Demonstrating Basic Dog Behaviors (Inherited):")
+    print("-" * 40)
+    
+    print("Golden Retriever basic behaviors:")
+    print(f"  Bark: {golden_retriever.bark()}")
+    print(f"  Eat: {golden_retriever.eat()}")
+    print(f"  Sleep: {golden_retriever.sleep()}")
+    
+    print("\nGerman Shepherd basic behaviors:")
+    print(f"  Bark: {german_shepherd.bark()}")
+    print(f"  Eat: {german_shepherd.eat()}")
+    print(f"  Sleep: {german_shepherd.sleep()}")
+    
+    # Demonstrate specialized methods for SportingDog
+    print("\n4. Demonstrating Sporting Dog Specialized Behaviors:")
+    print("-" * 40)
+    print(f"  Hunt: {golden_retriever.hunt()}")
+    print(f"  Retrieve: {golden_retriever.retrieve()}")
+    print(f"  Swim: {golden_retriever.swim()}")
+    
+    # Demonstrate specialized methods for WorkingDog
+    print("\n5. Demonstrating Working Dog Specialized Behaviors:")
+    print("-" * 40)
+    print(f"  Guard: {german_shepherd.guard()}")
+    print(f"  Pull Sled: {german_shepherd.pull_sled()}")
+    print(f"  Search & Rescue: {german_shepherd.search_rescue()}")
+    
+    # Demonstrate polymorphism with get_info method
+    print("\n6. Demonstrating Polymorphism (get_info method):")
+    print("-" * 40)
+    
+    print("Golden Retriever Information:")
+    print(golden_retriever.get_info())
+    
+    print("\nGerman Shepherd Information:")
+    print(german_shepherd.get_info())
+    
+    # Demonstrate inheritance relationships
+    print("\n7. Demonstrating Inheritance Relationships:")
+    print("-" * 40)
+    print(f"Is Golden Retriever a Dog? {isinstance(golden_retriever, Dog)}")
+    print(f"Is German Shepherd a Dog? {isinstance(german_shepherd, Dog)}")
+    print(f"Is Golden Retriever a SportingDog? {isinstance(golden_retriever, SportingDog)}")
+    print(f"Is German Shepherd a WorkingDog? {isinstance(german_shepherd, WorkingDog)}")
+    
+    # Create a list of dogs to demonstrate polymorphism
+    print("\n8. Demonstrating Polymorphism with a List of Dogs:")
+    print("-" * 40)
+    dogs = [golden_retriever, german_shepherd]
+    
+    for i, dog in enumerate(dogs, 1):
+        print(f"Dog {i} ({type(dog).__name__}): {dog.bark()}")
+    
+    # Store the dogs in a columnar registry and query it
+    print("\n9. Demonstrating the Columnar DogRegistry:")
+    print("-" * 40)
+    registry = DogRegistry(dogs)
+    registry.add(WorkingDog(110, "25.5-27.5 inches", "8-10 years", "black", "guarding", "very strong"))
+    registry.add(WorkingDog(60, "23-26 inches", "12-15 years", "gray", "sled pulling", "strong"))
+    strong_working_dogs = registry.select(WorkingDog, average_weight=(">", 70),
+                                          strength_level="very strong")
+    print(f"WorkingDogs over 70 lbs that are very strong: {len(strong_working_dogs)}")
+    for view in strong_working_dogs:
+        print(f"  Row {view.row}: {view.average_weight:g} lbs, {view.color}, {view.work_type}")
+    
+    # Parsed height and life span ranges
+    print("\n10. Demonstrating Parsed Ranges and the Interval Index:")
+    print("-" * 40)
+    print(f"Golden Retriever height: {golden_retriever.height_interval} inches")
+    print(f"German Shepherd life span: {german_shepherd.life_span_interval} years")
+    can_be_23_inches = registry.overlapping("height_range", 23)
+    print(f"Dogs that can be 23 inches tall: rows {list(can_be_23_inches.rows)}")
+    long_lived = registry.covering("life_span", 10, 12)
+    print(f"Dogs expected to live 10-12 years: rows {list(long_lived.rows)}")
+    
+    # Cached get_info() text and the bulk renderer
+    print("\n11. Demonstrating Cached and Bulk Rendering:")
+    print("-" * 40)
+    print(f"get_info() is cached: {golden_retriever.get_info() is golden_retriever.get_info()}")
+    golden_retriever.color = "dark golden"
+    print(f"After recoloring: {golden_retriever.get_info().splitlines()[-3]}")
+    print(render_info(dogs))
+    
+    # Run behaviors for a whole group of dogs at once
+    print("\n12. Demonstrating Batch Behavior Dispatch:")
+    print("-" * 40)
+    batch = DogBatch(registry.select().to_dogs())
+    print(f"Dogs per class: {batch.counts()}")
+    for action, results in batch.run_all().items():
+        print(f"  {action}: {results}")
+    
+    # Compact dogs share their breed attributes through a BreedProfile
+    print("\n13. Demonstrating Compact Dogs with Shared Breed Profiles:")
+    print("-" * 40)
+    compact_golden = compact_dog(golden_retriever)
+    litter = [CompactSportingDog(60 + pup, "21.5-24 inches", "10-12 years", "dark golden",
+                                 "excellent", True) for pup in range(3)]
+    print(f"Same get_info() as the original: {compact_golden.get_info() == golden_retriever.get_info()}")
+    print(f"  Swim: {compact_golden.swim()}")
+    print(f"Litter shares one profile: {all(pup.profile is compact_golden.profile for pup in litter)}")
+    print(f"Is a compact dog a SportingDog? {isinstance(compact_golden, SportingDog)}")
+    regular_bytes, compact_bytes = measure_memory_per_dog(10000)
+    print(f"Bytes per regular dog: {regular_bytes:.0f}")
+    print(f"Bytes per compact dog: {compact_bytes:.0f}")
+    
+    # Save the kennel and load it back
+    print("\n14. Demonstrating Saving and Loading Dogs:")
+    print("-" * 40)
+    kennel = [golden_retriever, german_shepherd, compact_golden]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "kennel.dogs")
+        print(f"Saved {save_dogs(kennel, path)} dogs to a binary dog file")
+        with DogFile(path) as loaded:
+            print(f"Loaded lazily: {[type(dog).__name__ for dog in loaded]}")
+            print(f"Round trip matches: {[dog.get_info() for dog in loaded] == [dog.get_info() for dog in kennel]}")
+    buffer = io.StringIO()
+    write_dogs_jsonl(kennel[:1], buffer)
+    print(f"JSON Lines:\n{buffer.getvalue().rstrip()}")
+    
+    # Route dogs through a type-tag table; a new group plugs in by subclassing
+    print("\n15. Demonstrating Type Tags and Table-Driven Dispatch:")
+    print("-" * 40)
+    job = TypeDispatcher(default=lambda dog: "companion")
+    job.register(SportingDog, lambda dog: dog.hunt())
+    job.register(WorkingDog, lambda dog: dog.guard())
+    
+    class HerdingDog(Dog):
+        """A breed group added after the dispatcher was built."""
+        
+        def herd(self):
+            return f"This {self.color} herding dog is rounding up the sheep."
+    
+    job.register(HerdingDog, HerdingDog.herd)
+    border_collie = HerdingDog(45, "18-22 inches", "12-15 years", "black and white")
+    for dog in (golden_retriever, german_shepherd, compact_golden, border_collie):
+        print(f"  {type(dog).__name__} (tag {dog.type_tag}): {job(dog)}")
+    print(f"Dogs per class: {[(dog_type.__name__, len(group)) for dog_type, group in partition_by_type(kennel + [border_collie]).items()]}")
+    
+    # Step a small kennel through a few simulated ticks
+    print("\n16. Demonstrating the Kennel Simulation:")
+    print("-" * 40)
+    simulation = KennelSimulation(registry.select().to_dogs() + [border_collie], message_log_size=5)
+    report = simulation.run(24)
+    print(f"Simulated {report['dogs']} dogs for {report['ticks']} ticks")
+    print(f"Actions: {report['actions']}")
+    print("Last messages:")
+    for tick, i, message in simulation.messages:
+        print(f"  Tick {tick}, dog {i}: {message}")
+    
+    # Rank dogs with ordinal levels and packed sort keys
+    print("\n17. Demonstrating Ranking and Leaderboards:")
+    print("-" * 40)
+    print(f"Strength levels compare in order: {StrengthLevel.parse('Very Strong') > StrengthLevel.parse('strong')}")
+    print(f"German Shepherd strength rank: {german_shepherd.strength_rank!r}")
+    working_dogs = registry.select(WorkingDog).to_dogs()
+    for dog in top_dogs(working_dogs, 2, "strength_level", "average_weight"):
+        print(f"  Top working dog: {dog.strength_level}, {dog.average_weight} lbs")
+    leaderboard = RankedDogIndex("-average_weight", dogs=working_dogs)
+    leaderboard.add(WorkingDog(40, "20-22 inches", "12-14 years", "brown", "herding", "moderate"))
+    print(f"Lightest first: {[dog.average_weight for dog in leaderboard.top(len(leaderboard))]}")
 
 
 if __name__ == "__main__":
-    main()
+    # Pass --benchmark to run the (slow) performance benchmarks or --test
+    # to run the self-checks
+    if "--benchmark" in sys.argv:
+        run_benchmarks()
+    elif "--test" in sys.argv:
+        sys.exit(0 if run_tests() else 1)
+    else:
+        main()
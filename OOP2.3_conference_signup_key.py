@@ -4,11 +4,351 @@ Assignment: Create a Python function that simulates a conference sign-up process
 
 This module implements a conference sign-up function that accepts participant names
 and their contact details, then prints a summary in an organized format.
+Registration and ConferenceRoster store each participant's own contact
+details and index them by name and email, and SessionAllocator seats
+participants in capacity-limited sessions with waitlists.
 
 Author: Student
 Date: 2024
 """
 
+import contextlib
+import csv
+import heapq
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+
+class Registration:
+    """
+    One participant's sign-up with their own contact details.
+    
+    Uses __slots__ so that tens of thousands of registrations stay compact.
+    
+    Attributes:
+        name (str): Participant name
+        email (str): Participant email address, or None if not provided
+        phone (str): Participant phone number, or None if not provided
+    """
+    
+    __slots__ = ("name", "email", "phone")
+    
+    def __init__(self, name, email=None, phone=None):
+        """
+        Initialize a Registration.
+        
+        Args:
+            name (str): Participant name
+            email (str): Email address (optional)
+            phone (str): Phone number (optional)
+        """
+        self.name = name
+        self.email = email
+        self.phone = phone
+    
+    def __repr__(self):
+        """Returns the registration as a constructor call."""
+        return f"Registration({self.name!r}, email={self.email!r}, phone={self.phone!r})"
+    
+    def __eq__(self, other):
+        """Registrations are equal when their name, email and phone are."""
+        if not isinstance(other, Registration):
+            return NotImplemented
+        return (self.name, self.email, self.phone) == (other.name, other.email, other.phone)
+    
+    __hash__ = None
+
+
+def _name_key(name):
+    """Normalizes a name for lookups: case-folded with single spaces."""
+    return " ".join(str(name).split()).casefold()
+
+
+def _email_key(email):
+    """Normalizes an email address for lookups: trimmed and case-folded."""
+    return str(email).strip().casefold()
+
+
+class ConferenceRoster:
+    """
+    Collection of conference registrations indexed by name and email.
+    
+    Registrations are kept in sign-up order. The name and email indexes
+    are dictionaries of lists, so adding a registration and looking one up
+    take O(1) time and a roster of n sign-ups is built in O(n). Several
+    registrations may share a name or an email address (for example a
+    group signed up with one organizer's contact details).
+    
+    Example:
+        >>> roster = ConferenceRoster()
+        >>> roster.add("Alice", email="alice@example.com", phone="123-456-7890")
+        >>> roster.add("Bob", email="bob@example.com")
+        >>> roster.find_by_email("ALICE@example.com")
+        [Registration('Alice', email='alice@example.com', phone='123-456-7890')]
+    """
+    
+    def __init__(self, registrations=()):
+        """
+        Initialize a roster.
+        
+        Args:
+            registrations (iterable): Initial sign-ups, in any form accepted by extend()
+        """
+        self._registrations = []
+        self._by_name = {}
+        self._by_email = {}
+        self.extend(registrations)
+    
+    def __len__(self):
+        """Returns the number of registrations."""
+        return len(self._registrations)
+    
+    def __iter__(self):
+        """Yields the registrations in sign-up order."""
+        return iter(self._registrations)
+    
+    def __contains__(self, name):
+        """Returns True if someone with this name has registered."""
+        return _name_key(name) in self._by_name
+    
+    def add_registration(self, registration):
+        """
+        Add a Registration and index it.
+        
+        Args:
+            registration (Registration): The sign-up to add
+        
+        Returns:
+            Registration: The registration that was added
+        """
+        self._registrations.append(registration)
+        self._by_name.setdefault(_name_key(registration.name), []).append(registration)
+        if registration.email is not None:
+            self._by_email.setdefault(_email_key(registration.email), []).append(registration)
+        return registration
+    
+    def add(self, name, email=None, phone=None):
+        """
+        Register a participant with their own contact details.
+        
+        Args:
+            name (str): Participant name
+            email (str): Email address (optional)
+            phone (str): Phone number (optional)
+        
+        Returns:
+            Registration: The new registration
+        """
+        return self.add_registration(Registration(name, email, phone))
+    
+    def extend(self, registrations):
+        """
+        Add many sign-ups.
+        
+        Args:
+            registrations (iterable): Registration objects, (name, email, phone)
+                tuples, dicts with "name", "email" and "phone" keys, or plain
+                names; see _as_registration()
+        
+        Raises:
+            TypeError: If an item is not one of the accepted forms
+        """
+        for item in registrations:
+            self.add_registration(_as_registration(item))
+    
+    def remove(self, registration):
+        """
+        Remove a registration.
+        
+        Removing from the sign-up order takes O(n); index updates only
+        touch the registrations sharing the name or email.
+        
+        Args:
+            registration (Registration): A registration from this roster
+        
+        Raises:
+            ValueError: If the registration is not in the roster
+        """
+        # Compare by identity: two people may register with identical details
+        for position, stored in enumerate(self._registrations):
+            if stored is registration:
+                break
+        else:
+            raise ValueError(f"{registration!r} is not in the roster")
+        del self._registrations[position]
+        self._unindex(self._by_name, _name_key(registration.name), registration)
+        if registration.email is not None:
+            self._unindex(self._by_email, _email_key(registration.email), registration)
+    
+    @staticmethod
+    def _unindex(index, key, registration):
+        """Removes a registration from one index entry, dropping the entry when empty."""
+        matches = index[key]
+        matches[:] = [stored for stored in matches if stored is not registration]
+        if not matches:
+            del index[key]
+    
+    def find_by_name(self, name):
+        """
+        Find registrations by participant name (case-insensitive).
+        
+        Returns:
+            list: Matching registrations in sign-up order
+        """
+        return list(self._by_name.get(_name_key(name), ()))
+    
+    def find_by_email(self, email):
+        """
+        Find registrations by email address (case-insensitive).
+        
+        Returns:
+            list: Matching registrations in sign-up order
+        """
+        return list(self._by_email.get(_email_key(email), ()))
+
+
+def _display(value):
+    """Returns a contact detail for printing, or "N/A" if it was not provided."""
+    return "N/A" if value is None else value
+
+
+# Column names used by the CSV and JSON summary formats
+SUMMARY_FIELDS = ("name", "email", "phone")
+
+
+def _as_registration(participant, email=None, phone=None):
+    """
+    Convert one sign-up into a Registration.
+    
+    Args:
+        participant: A Registration, a (name, email, phone) tuple (email and
+            phone may be left off), a dict with a "name" key and optional
+            "email" and "phone" keys, or a plain name
+        email (str): Email address given to plain names
+        phone (str): Phone number given to plain names
+    
+    Returns:
+        Registration: The participant's registration
+    
+    Raises:
+        TypeError: If the participant is not one of the accepted forms
+    """
+    if isinstance(participant, Registration):
+        return participant
+    if isinstance(participant, str):
+        return Registration(participant, email, phone)
+    if isinstance(participant, dict) and "name" in participant:
+        return Registration(participant["name"], participant.get("email"), participant.get("phone"))
+    if isinstance(participant, tuple) and 1 <= len(participant) <= 3:
+        return Registration(*participant)
+    raise TypeError(f"Cannot register {participant!r}")
+
+
+def write_signup_summary(participants, file=None, output_format="text", email=None,
+                         phone=None, chunk_size=1000):
+    """
+    Stream a summary of the sign-ups to a file in a single buffered pass.
+    
+    Participants are read once from any iterable (a ConferenceRoster, a list
+    or a generator). Output is built a chunk at a time and each chunk is
+    sent with one write() call; the summary statistics are counted in the
+    same pass.
+    
+    Args:
+        participants (iterable): Sign-ups in any form accepted by ConferenceRoster.extend()
+        file: Object with a write() method (default: sys.stdout)
+        output_format (str): "text" (the conference_signup layout), "csv" or "json"
+        email (str): Contact email, also given to participants passed as plain names
+        phone (str): Contact phone, also given to participants passed as plain names
+        chunk_size (int): Number of participants formatted per write() call
+    
+    Returns:
+        dict: Summary statistics: total_participants, with_email, with_phone,
+        contact_email and contact_phone
+    
+    Raises:
+        ValueError: If output_format is not recognised
+    
+    Example:
+        >>> with open("roster.csv", "w", newline="") as file:
+        ...     write_signup_summary(roster, file, "csv")
+    """
+    if file is None:
+        file = sys.stdout
+    if output_format not in ("text", "csv", "json"):
+        raise ValueError(f"Unknown output format: {output_format!r}")
+    separator = "-" * 50 + "\n"
+    
+    # Output is collected in memory and sent to the file a chunk at a time
+    buffer = io.StringIO()
+    write = buffer.write
+    # Rows end in "\n" like the text and JSON formats; the csv module's
+    # default "\r\n" would be doubled to "\r\r\n" by a text-mode file
+    writerow = csv.writer(buffer, lineterminator="\n").writerow
+    
+    # Header
+    if output_format == "text":
+        write("Conference Participants and Their Contact Details:\n" + separator)
+    elif output_format == "csv":
+        writerow(SUMMARY_FIELDS)
+    else:
+        write('{"participants": [')
+    
+    total = with_email = with_phone = 0
+    for participant in participants:
+        registration = _as_registration(participant, email, phone)
+        total += 1
+        if registration.email is not None:
+            with_email += 1
+        if registration.phone is not None:
+            with_phone += 1
+        
+        if output_format == "text":
+            # The separator goes before every participant but the first,
+            # so the total is not needed up front
+            if total > 1:
+                write(separator)
+            write(f"Name: {registration.name}\n"
+                  f"Email: {_display(registration.email)}\n"
+                  f"Phone: {_display(registration.phone)}\n")
+        elif output_format == "csv":
+            writerow((registration.name, registration.email, registration.phone))
+        else:
+            write("\n" if total == 1 else ",\n")
+            write(json.dumps({"name": registration.name, "email": registration.email,
+                              "phone": registration.phone}))
+        
+        # Send a full chunk with one write() call
+        if total % chunk_size == 0:
+            file.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+    
+    summary = {"total_participants": total, "with_email": with_email, "with_phone": with_phone,
+               "contact_email": email, "contact_phone": phone}
+    
+    # Footer with the statistics counted above
+    if output_format == "text":
+        if total == 0:
+            write("No participants registered for the conference.\n")
+        else:
+            write(f"{separator}"
+                  f"Total Participants: {total}\n"
+                  f"Contact Email: {_display(email)}\n"
+                  f"Contact Phone: {_display(phone)}\n")
+    elif output_format == "json":
+        if total:
+            write("\n")
+        write(f'], "summary": {json.dumps(summary)}}}\n')
+    file.write(buffer.getvalue())
+    return summary
+
+
 def conference_signup(*args, **kwargs):
     """
     Simulates a conference sign-up process by accepting participant names and contact details.
@@ -17,47 +357,346 @@ def conference_signup(*args, **kwargs):
     and **kwargs for keyword arguments. It handles cases where no participants
     or no contact details are provided gracefully.
     
+    The function is a thin wrapper around ConferenceRoster. Participants
+    given by name share the email and phone from **kwargs; participants
+    given as Registration objects keep their own contact details.
+    
     Args:
-        *args: Variable number of participant names (strings)
+        *args: Variable number of participant names (strings) or Registration objects
         **kwargs: Keyword arguments containing contact details
                  Expected keys: 'email', 'phone'
     
     Returns:
-        None: Function prints the summary directly
+        ConferenceRoster: The registered participants (the summary is printed directly)
     
     Example:
         conference_signup("Alice", "Bob", "Charlie", 
                          email="alice@example.com", phone="123-456-7890")
     """
     
-    # Print header
-    print("Conference Participants and Their Contact Details:")
-    print("-" * 50)
+    # Get contact details from kwargs
+    email = kwargs.get('email')
+    phone = kwargs.get('phone')
     
-    # Handle case where no participants are provided
-    if not args:
-        print("No participants registered for the conference.")
-        return
+    # Register everyone; names share the contact details from kwargs
+    roster = ConferenceRoster(
+        participant if isinstance(participant, Registration) else Registration(participant, email, phone)
+        for participant in args)
     
-    # Get contact details from kwargs
-    email = kwargs.get('email', 'N/A')
-    phone = kwargs.get('phone', 'N/A')
+    # Print the header, each participant and the summary statistics in
+    # one buffered pass (a roster with no participants gets a notice instead)
+    write_signup_summary(roster, email=email, phone=phone)
+    return roster
+
+
+class Session:
+    """
+    A conference session with a seat cap and a waitlist.
+    
+    The waitlist is a heap of (priority, preference rank, sign-up number,
+    participant key) entries, so the next person to promote is always at
+    the top. Entries are never searched for and removed; an entry that is
+    no longer valid (the participant cancelled or got a better seat) is
+    counted as stale and skipped when it reaches the top. Once more than
+    half of the entries are stale the SessionAllocator drops them all, so
+    the heap stays proportional to the number of people really waiting.
+    
+    Attributes:
+        session_id: The session's identifier
+        capacity (int): Number of seats
+        seated (set): Keys of the participants holding a seat
+    """
+    
+    __slots__ = ("session_id", "capacity", "seated", "_waitlist", "_stale")
     
-    # Process each participant
-    for i, participant in enumerate(args, 1):
-        print(f"Name: {participant}")
-        print(f"Email: {email}")
-        print(f"Phone: {phone}")
+    def __init__(self, session_id, capacity):
+        """
+        Initialize a Session.
         
-        # Add separator line between participants (except for the last one)
-        if i < len(args):
-            print("-" * 50)
+        Args:
+            session_id: The session's identifier
+            capacity (int): Number of seats
+        """
+        self.session_id = session_id
+        self.capacity = capacity
+        self.seated = set()
+        self._waitlist = []
+        self._stale = 0
     
-    # Print summary statistics
-    print("-" * 50)
-    print(f"Total Participants: {len(args)}")
-    print(f"Contact Email: {email}")
-    print(f"Contact Phone: {phone}")
+    @property
+    def free_seats(self):
+        """Number of seats not yet taken."""
+        return self.capacity - len(self.seated)
+    
+    @property
+    def waitlist_entries(self):
+        """Number of entries in the waitlist heap, including stale ones not yet dropped."""
+        return len(self._waitlist)
+    
+    def __repr__(self):
+        """Returns the session id, capacity, seated count and waitlist size."""
+        return (f"Session({self.session_id!r}, capacity={self.capacity}, "
+                f"seated={len(self.seated)}, waitlist entries={self.waitlist_entries})")
+
+
+class _IdentityKey:
+    """
+    Allocator key for a Registration, equal only to a key for the same object.
+    
+    Registrations are unhashable and two people may register with identical
+    details, so they are matched by identity. Wrapping them keeps those keys
+    apart from any other hashable participant id, such as an int that
+    happens to equal a registration's id().
+    """
+    
+    __slots__ = ("registration",)
+    
+    def __init__(self, registration):
+        """Wraps a registration."""
+        self.registration = registration
+    
+    def __hash__(self):
+        """Hashes by the registration's identity."""
+        return id(self.registration)
+    
+    def __eq__(self, other):
+        """Keys are equal when they wrap the same registration object."""
+        if not isinstance(other, _IdentityKey):
+            return NotImplemented
+        return self.registration is other.registration
+
+
+class _Participant:
+    """A participant's allocation state inside a SessionAllocator."""
+    
+    __slots__ = ("registration", "preferences", "priority", "number", "seat", "seat_rank")
+    
+    def __init__(self, registration, preferences, priority, number):
+        """Records a new, not yet seated participant."""
+        self.registration = registration
+        self.preferences = preferences
+        self.priority = priority
+        self.number = number
+        self.seat = None
+        # Rank of the held seat among the preferences; len(preferences) when unseated
+        self.seat_rank = len(preferences)
+
+
+class SessionAllocator:
+    """
+    Assigns participants to capacity-limited sessions by preference.
+    
+    Each participant lists sessions in order of preference and holds at
+    most one seat: the most preferred session that had room when they
+    signed up. They are also waitlisted for every session they prefer to
+    the one they got. When a seat is released, the best waitlisted
+    participant is promoted in O(log n); if that frees a seat they held
+    elsewhere, promotion continues there.
+    
+    Waitlists are ordered by priority (lower first), then by how highly
+    the participant ranked the session, then by sign-up order.
+    
+    Example:
+        >>> allocator = SessionAllocator({"keynote": 2, "workshop": 1})
+        >>> allocator.request(alice, ["workshop", "keynote"])
+        'workshop'
+        >>> allocator.request(bob, ["workshop", "keynote"])
+        'keynote'
+        >>> allocator.cancel(alice)
+        >>> allocator.seat_of(bob)
+        'workshop'
+    """
+    
+    def __init__(self, sessions=None):
+        """
+        Initialize an allocator.
+        
+        Args:
+            sessions (dict): Optional session id -> capacity
+        """
+        self._sessions = {}
+        self._participants = {}
+        self._numbers = itertools.count()
+        for session_id, capacity in (sessions or {}).items():
+            self.add_session(session_id, capacity)
+    
+    def add_session(self, session_id, capacity):
+        """
+        Add a session.
+        
+        Raises:
+            ValueError: If the session already exists or capacity is negative
+        """
+        if session_id in self._sessions:
+            raise ValueError(f"Session {session_id!r} already exists")
+        if capacity < 0:
+            raise ValueError("capacity must not be negative")
+        self._sessions[session_id] = Session(session_id, capacity)
+    
+    def session(self, session_id):
+        """Returns the Session with this id."""
+        return self._sessions[session_id]
+    
+    def __len__(self):
+        """Returns the number of participants currently signed up."""
+        return len(self._participants)
+    
+    @staticmethod
+    def _key(participant):
+        """Returns the dictionary key of a participant."""
+        # Registrations are matched by identity; any other hashable value by equality
+        return _IdentityKey(participant) if isinstance(participant, Registration) else participant
+    
+    def _is_waiting(self, entry):
+        """Returns True if a waitlist entry still stands for someone waiting."""
+        _, rank, number, key = entry
+        state = self._participants.get(key)
+        return state is not None and state.number == number and state.seat_rank > rank
+    
+    def _mark_stale(self, session):
+        """Counts one more stale waitlist entry, dropping them all once they are the majority."""
+        session._stale += 1
+        if session._stale * 2 > len(session._waitlist):
+            session._waitlist = [entry for entry in session._waitlist if self._is_waiting(entry)]
+            heapq.heapify(session._waitlist)
+            session._stale = 0
+    
+    def request(self, participant, preferences, priority=0):
+        """
+        Sign a participant up for sessions in order of preference.
+        
+        Args:
+            participant: A Registration (or any hashable participant id)
+            preferences (iterable): Session ids, most preferred first
+            priority (int): Waitlist priority; lower numbers are promoted first
+        
+        Returns:
+            The id of the session the participant was seated in, or None if
+            every preferred session is full (they are waitlisted for all of them)
+        
+        Raises:
+            ValueError: If the participant has already requested sessions
+            KeyError: If a preferred session does not exist
+        """
+        key = self._key(participant)
+        if key in self._participants:
+            raise ValueError(f"{participant!r} has already requested sessions")
+        preferences = tuple(preferences)
+        sessions = [self._sessions[session_id] for session_id in preferences]
+        state = self._participants[key] = _Participant(participant, preferences, priority,
+                                                       next(self._numbers))
+        
+        # Take the best session with a free seat and queue for the better ones
+        for rank, session in enumerate(sessions):
+            if session.free_seats > 0:
+                self._seat(key, state, session, rank)
+                break
+            heapq.heappush(session._waitlist, (priority, rank, state.number, key))
+        return state.seat
+    
+    def _seat(self, key, state, session, rank):
+        """Gives a participant a seat in a session."""
+        session.seated.add(key)
+        state.seat = session.session_id
+        state.seat_rank = rank
+    
+    def _promote(self, session):
+        """Fills a session's free seats from its waitlist, cascading to seats vacated elsewhere."""
+        pending = [session]
+        while pending:
+            session = pending.pop()
+            while session.free_seats > 0 and session._waitlist:
+                entry = heapq.heappop(session._waitlist)
+                # Skip entries for cancelled participants and for people who
+                # already hold a seat they prefer at least as much
+                if not self._is_waiting(entry):
+                    session._stale -= 1
+                    continue
+                _, rank, _, key = entry
+                state = self._participants[key]
+                old_rank = state.seat_rank
+                if state.seat is not None:
+                    vacated = self._sessions[state.seat]
+                    vacated.seated.discard(key)
+                    pending.append(vacated)
+                self._seat(key, state, session, rank)
+                # Entries for sessions ranked between the new seat and the old
+                # one no longer stand
+                for worse_rank in range(rank + 1, old_rank):
+                    self._mark_stale(self._sessions[state.preferences[worse_rank]])
+    
+    def cancel(self, participant):
+        """
+        Withdraw a participant, releasing their seat and waitlist places.
+        
+        Raises:
+            KeyError: If the participant has not requested sessions
+        """
+        key = self._key(participant)
+        state = self._participants.pop(key)
+        for rank in range(state.seat_rank):
+            self._mark_stale(self._sessions[state.preferences[rank]])
+        if state.seat is not None:
+            session = self._sessions[state.seat]
+            session.seated.discard(key)
+            self._promote(session)
+    
+    def add_seats(self, session_id, count):
+        """
+        Increase a session's capacity and promote from its waitlist.
+        
+        Raises:
+            ValueError: If count is negative
+            KeyError: If the session does not exist
+        """
+        if count < 0:
+            raise ValueError("count must not be negative")
+        session = self._sessions[session_id]
+        session.capacity += count
+        self._promote(session)
+    
+    def seat_of(self, participant):
+        """
+        Get the session a participant is seated in.
+        
+        Returns:
+            The session id, or None if the participant is only waitlisted
+        
+        Raises:
+            KeyError: If the participant has not requested sessions
+        """
+        return self._participants[self._key(participant)].seat
+    
+    def attendees(self, session_id):
+        """Returns the participants seated in a session."""
+        participants = self._participants
+        return [participants[key].registration for key in self._sessions[session_id].seated]
+    
+    def waitlist(self, session_id):
+        """
+        Get the participants currently waiting for a session, in promotion order.
+        
+        This sorts the session's waitlist, so it takes O(n log n) time.
+        """
+        participants = self._participants
+        waiting = []
+        for entry in sorted(self._sessions[session_id]._waitlist):
+            if self._is_waiting(entry):
+                waiting.append(participants[entry[3]].registration)
+        return waiting
+    
+    def summary(self):
+        """
+        Summarize the allocation.
+        
+        Returns:
+            dict: participants, seated, unseated, seats and free_seats
+        """
+        seated = sum(len(session.seated) for session in self._sessions.values())
+        seats = sum(session.capacity for session in self._sessions.values())
+        return {"participants": len(self._participants), "seated": seated,
+                "unseated": len(self._participants) - seated, "seats": seats,
+                "free_seats": seats - seated}
 
 
 def test_conference_signup():
@@ -111,6 +750,240 @@ def test_conference_signup():
     conference_signup()
 
 
+def test_csv_summary_uses_newlines():
+    """CSV summaries end rows in "\n", so text-mode files do not get "\r\r\n"."""
+    buffer = io.StringIO()
+    summary = write_signup_summary(["Alice", ("Bob", "bob@example.com", None)], buffer, "csv")
+    assert buffer.getvalue() == "name,email,phone\nAlice,,\nBob,bob@example.com,\n"
+    assert summary["total_participants"] == 2 and summary["with_email"] == 1
+    rows = list(csv.reader(io.StringIO(buffer.getvalue())))
+    assert rows[2] == ["Bob", "bob@example.com", ""]
+
+
+def test_allocator_seats_waitlists_and_promotes():
+    """Participants get their best open session, wait for better ones and move up in order."""
+    allocator = SessionAllocator({"workshop": 1, "keynote": 1, "panel": 1})
+    alice, bob, carol, dave = (Registration(name) for name in ("Alice", "Bob", "Carol", "Dave"))
+    assert allocator.request(alice, ["workshop"]) == "workshop"
+    assert allocator.request(bob, ["workshop", "keynote"]) == "keynote"
+    assert allocator.request(carol, ["keynote", "panel"]) == "panel"
+    assert allocator.request(dave, ["panel"]) is None
+    assert allocator.waitlist("workshop") == [bob]
+    assert allocator.summary() == {"participants": 4, "seated": 3, "unseated": 1,
+                                   "seats": 3, "free_seats": 0}
+    
+    # Alice's seat goes to Bob, his keynote seat to Carol and her panel seat to Dave
+    allocator.cancel(alice)
+    assert [allocator.seat_of(person) for person in (bob, carol, dave)] == ["workshop", "keynote", "panel"]
+    assert allocator.waitlist("workshop") == allocator.waitlist("keynote") == allocator.waitlist("panel") == []
+    assert allocator.attendees("panel") == [dave]
+    
+    # Lower priority numbers are promoted first, then earlier sign-ups
+    erin, fay, gus = Registration("Erin"), Registration("Fay"), Registration("Gus")
+    assert allocator.request(erin, ["workshop"], priority=1) is None
+    assert allocator.request(fay, ["workshop"]) is None
+    assert allocator.request(gus, ["workshop"]) is None
+    assert allocator.waitlist("workshop") == [fay, gus, erin]
+    allocator.add_seats("workshop", 1)
+    assert allocator.seat_of(fay) == "workshop" and allocator.waitlist("workshop") == [gus, erin]
+    allocator.add_seats("workshop", 0)
+    assert allocator.session("workshop").capacity == 2
+    
+    for action, error in ((lambda: allocator.add_seats("workshop", -1), ValueError),
+                          (lambda: allocator.request(erin, ["panel"]), ValueError),
+                          (lambda: allocator.cancel(alice), KeyError),
+                          (lambda: allocator.request(Registration("Hal"), ["nope"]), KeyError)):
+        try:
+            action()
+        except error:
+            pass
+        else:
+            raise AssertionError(f"expected {error.__name__}")
+    assert allocator.session("workshop").capacity == 2
+
+
+def test_allocator_keys_and_stale_waitlist_entries():
+    """Registrations never collide with plain ids, and stale waitlist entries are dropped."""
+    allocator = SessionAllocator({"talk": 1, "lab": 1})
+    registration = Registration("Alice")
+    twin = Registration("Alice")
+    assert allocator.request(registration, ["talk"]) == "talk"
+    assert allocator.request(id(registration), ["lab"]) == "lab"
+    assert allocator.request(twin, ["talk"]) is None
+    assert allocator.seat_of(registration) == "talk"
+    assert allocator.seat_of(id(registration)) == "lab"
+    
+    waiting = [f"guest{number}" for number in range(100)]
+    for guest in waiting:
+        allocator.request(guest, ["talk", "lab"])
+    for guest in waiting[:90]:
+        allocator.cancel(guest)
+    assert allocator.session("talk").waitlist_entries <= 2 * (len(waiting) - 90 + 1)
+    assert allocator.waitlist("talk") == [twin] + waiting[90:]
+    allocator.cancel(registration)
+    assert allocator.seat_of(twin) == "talk"
+    assert allocator.waitlist("talk") == waiting[90:]
+
+
+def test_roster_indexes_names_and_emails():
+    """Lookups ignore case and spacing, and shared names or emails list every sign-up in order."""
+    roster = ConferenceRoster(["Alice Smith", ("Bob", "TEAM@example.com"),
+                               {"name": "Carol", "email": "team@example.com", "phone": "555-0100"},
+                               Registration("alice  smith", "alice@example.com")])
+    alice, bob, carol, other_alice = roster
+    assert len(roster) == 4
+    assert (bob.email, bob.phone, carol.phone) == ("TEAM@example.com", None, "555-0100")
+    assert roster.find_by_name(" ALICE smith ") == [alice, other_alice]
+    assert roster.find_by_email("Team@Example.com ") == [bob, carol]
+    assert roster.find_by_email("nobody@example.com") == []
+    assert "carol" in roster and "Dave" not in roster
+    
+    # The returned lists are copies
+    roster.find_by_name("bob").clear()
+    assert roster.find_by_name("bob") == [bob]
+    
+    for bad in (("Dave", "dave@example.com", "555-0101", "extra"), (), {"email": "x@example.com"}, 42):
+        try:
+            roster.extend([bad])
+        except TypeError as error:
+            assert str(error).startswith("Cannot register"), error
+        else:
+            raise AssertionError(f"{bad!r} was registered")
+    assert len(roster) == 4
+
+
+def test_roster_remove_matches_by_identity():
+    """remove() takes out one registration even when another has identical details."""
+    roster = ConferenceRoster()
+    first = roster.add("Alice", email="alice@example.com")
+    second = roster.add("Alice", email="alice@example.com")
+    bob = roster.add("Bob")
+    assert first == second and first is not second
+    roster.remove(second)
+    assert list(roster) == [first, bob]
+    assert roster.find_by_name("alice") == [first]
+    assert roster.find_by_email("alice@example.com") == [first]
+    roster.remove(first)
+    roster.remove(bob)
+    assert len(roster) == 0 and "Alice" not in roster
+    assert roster.find_by_email("alice@example.com") == []
+    try:
+        roster.remove(bob)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a registration was removed twice")
+
+
+def test_conference_signup_prints_summary():
+    """conference_signup() prints the assignment layout and returns the roster."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        roster = conference_signup("Alice", Registration("Bob", "bob@example.com"), email="team@example.com")
+    assert [registration.email for registration in roster] == ["team@example.com", "bob@example.com"]
+    text = output.getvalue()
+    assert text.startswith("Conference Participants and Their Contact Details:\n")
+    assert "Name: Alice\nEmail: team@example.com\nPhone: N/A\n" in text
+    assert "Name: Bob\nEmail: bob@example.com\nPhone: N/A\n" in text
+    assert text.endswith("Total Participants: 2\nContact Email: team@example.com\nContact Phone: N/A\n")
+    
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        assert len(conference_signup()) == 0
+    assert "No participants registered for the conference.\n" in output.getvalue()
+
+
+def run_tests():
+    """
+    Run every test_* function in this module and print the results.
+    
+    Returns:
+        bool: True if every test passed
+    """
+    tests = [(name, function) for name, function in globals().items()
+             if name.startswith("test_") and callable(function)]
+    failures = 0
+    for name, function in tests:
+        try:
+            function()
+        except Exception as error:
+            failures += 1
+            print(f"FAIL {name}: {type(error).__name__}: {error}")
+        else:
+            print(f"ok   {name}")
+    print(f"{len(tests) - failures} of {len(tests)} tests passed")
+    return failures == 0
+
+
+def benchmark_summary(count=50000):
+    """
+    Compare print() calls per participant with write_signup_summary().
+    
+    Output goes to os.devnull so that only formatting and write calls are timed.
+    
+    Args:
+        count (int): Number of synthetic participants
+    
+    Returns:
+        dict: Seconds taken by each approach
+    """
+    roster = ConferenceRoster((f"Participant {i}", f"participant{i}@example.com", f"555-{i % 10000:04d}")
+                              for i in range(count))
+    timings = {}
+    with open(os.devnull, "w") as devnull:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(devnull):
+            for registration in roster:
+                print(f"Name: {registration.name}")
+                print(f"Email: {_display(registration.email)}")
+                print(f"Phone: {_display(registration.phone)}")
+                print("-" * 50)
+        timings["print() per line (s)"] = time.perf_counter() - start
+        
+        for output_format in ("text", "csv", "json"):
+            start = time.perf_counter()
+            write_signup_summary(iter(roster), devnull, output_format)
+            timings[f"write_signup_summary {output_format} (s)"] = time.perf_counter() - start
+    return timings
+
+
+def benchmark_allocation(participants=100000, sessions=500, capacity=150, choices=3, cancellations=10000):
+    """
+    Time allocating participants to sessions and promoting from waitlists.
+    
+    Args:
+        participants (int): Number of synthetic participants
+        sessions (int): Number of sessions
+        capacity (int): Seats per session
+        choices (int): Sessions each participant ranks
+        cancellations (int): Number of participants who cancel afterwards
+    
+    Returns:
+        dict: Seconds taken by each step and the final allocation summary
+    """
+    rng = random.Random(2024)
+    allocator = SessionAllocator({session_id: capacity for session_id in range(sessions)})
+    roster = ConferenceRoster((f"Participant {i}", f"participant{i}@example.com") for i in range(participants))
+    # Popular sessions are requested more often so that their waitlists fill up
+    weights = [1 / (rank + 1) for rank in range(sessions)]
+    requests = [(registration, list(dict.fromkeys(rng.choices(range(sessions), weights, k=choices))))
+                for registration in roster]
+    timings = {}
+    
+    start = time.perf_counter()
+    for registration, preferences in requests:
+        allocator.request(registration, preferences)
+    timings["allocate (s)"] = time.perf_counter() - start
+    
+    cancelled = rng.sample([registration for registration, _ in requests], cancellations)
+    start = time.perf_counter()
+    for registration in cancelled:
+        allocator.cancel(registration)
+    timings["cancel + promote (s)"] = time.perf_counter() - start
+    timings["summary"] = allocator.summary()
+    return timings
+
+
 def main():
     """
     Main function to run the conference sign-up demonstration.
@@ -136,11 +1009,51 @@ def main():
     print("\nHandling Missing Contact Details:")
     conference_signup("Grace", "Henry", "Ivy", 
                      email="grace@example.com")  # No phone provided
+    
+    # Demonstrate per-participant contact details with a roster
+    print("\nPer-Participant Contact Details:")
+    roster = conference_signup(Registration("Jack", "jack@example.com", "555-111-2222"),
+                               Registration("Kate", "kate@example.com"),
+                               "Liam", "Mia", email="team@example.com")
+    print(f"Lookup by name 'kate': {roster.find_by_name('kate')}")
+    print(f"Lookup by email 'TEAM@example.com': {[r.name for r in roster.find_by_email('TEAM@example.com')]}")
+    
+    # Demonstrate the CSV and JSON summary formats
+    print("\nCSV Summary:")
+    write_signup_summary(roster, sys.stdout, "csv")
+    print("\nJSON Summary:")
+    write_signup_summary(roster, sys.stdout, "json")
+    
+    # Demonstrate seating participants in sessions with waitlists
+    print("\nSession Allocation:")
+    allocator = SessionAllocator({"Keynote": 3, "Python Workshop": 1, "Data Panel": 1})
+    jack, kate, liam, mia = roster
+    for registration, preferences in ((jack, ["Python Workshop", "Keynote"]),
+                                      (kate, ["Python Workshop", "Data Panel"]),
+                                      (liam, ["Data Panel", "Keynote"]),
+                                      (mia, ["Python Workshop", "Data Panel"])):
+        print(f"{registration.name} requested {preferences}: seated in {allocator.request(registration, preferences)}")
+    print(f"Python Workshop waitlist: {[r.name for r in allocator.waitlist('Python Workshop')]}")
+    allocator.cancel(jack)
+    print("Jack cancelled:")
+    for registration in (kate, liam, mia):
+        print(f"  {registration.name} is now seated in {allocator.seat_of(registration)}")
+    print(f"Allocation summary: {allocator.summary()}")
 
 
 if __name__ == "__main__":
-    # Run the main demonstration
-    main()
-    
-    # Run all test cases
-    test_conference_signup()
+    # Pass --benchmark to time the summary output formats or --test to run
+    # the self-checks
+    if "--benchmark" in sys.argv:
+        for step, seconds in benchmark_summary().items():
+            print(f"{step}: {seconds:.3f}")
+        for step, value in benchmark_allocation().items():
+            print(f"allocation {step}: {value:.3f}" if isinstance(value, float) else f"allocation {step}: {value}")
+    elif "--test" in sys.argv:
+        sys.exit(0 if run_tests() else 1)
+    else:
+        # Run the main demonstration
+        main()
+        
+        # Run all test cases
+        test_conference_signup()